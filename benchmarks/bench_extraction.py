@@ -0,0 +1,113 @@
+"""
+Benchmark of the extraction specs against per-field lookups with find().
+
+The per-field functions reproduce the extraction before the specs were
+introduced. Both run on the pages in tests/data:
+
+    $ python benchmarks/bench_extraction.py --number 200
+"""
+
+import argparse
+import timeit
+from typing import Any, Callable, Dict
+from bs4 import BeautifulSoup
+from bs4.element import Tag
+from tagesschauscraper import tagesschau
+
+TEASER_FIELDS = ["date", "topline", "headline", "shorttext"]
+
+
+def find_teaser(soup: BeautifulSoup) -> list[Dict[str, Any]]:
+    records = []
+    for teaser in soup.find_all(
+        attrs={"class": "columns teaser-xs twelve teaser-xs__wide"}
+    ):
+        record: Dict[str, Any] = {}
+        for field_name in TEASER_FIELDS:
+            tag = teaser.find(class_=f"teaser-xs__{field_name}")
+            if isinstance(tag, Tag):
+                record[field_name] = tag.get_text(strip=True, separator=" ")
+        tag = teaser.find(class_="teaser-xs__link")
+        if isinstance(tag, Tag):
+            record["link"] = tag.get("href")
+        records.append(record)
+    return records
+
+
+def find_archive(soup: BeautifulSoup) -> Dict[str, Any]:
+    record: Dict[str, Any] = {}
+    for name, class_name in [
+        ("headline", "archive__headline"),
+        ("num_teaser", "ergebnisse__anzahl"),
+    ]:
+        tag = soup.find(attrs={"class": class_name})
+        if isinstance(tag, Tag):
+            record[name] = tag.get_text(strip=True, separator="\n")
+    pagination = soup.find("ul", class_="paginierung__liste")
+    if isinstance(pagination, Tag):
+        record["pages"] = [
+            li.get_text(strip=True) for li in pagination.find_all("li")
+        ]
+    return record
+
+
+def find_article(soup: BeautifulSoup) -> Dict[str, Any]:
+    record: Dict[str, Any] = {}
+    tags_group = soup.find(class_="taglist")
+    if isinstance(tags_group, Tag):
+        record["tags"] = [
+            tag.get_text(strip=True)
+            for tag in tags_group.find_all(
+                class_="tag-btn tag-btn--light-grey"
+            )
+        ]
+    record["paragraphs"] = [
+        p.get_text(strip=True, separator=" ")
+        for p in soup.find_all("p", class_="textabsatz")
+    ]
+    return record
+
+
+def load_soup(file_name: str) -> BeautifulSoup:
+    with open(file_name, "r") as f:
+        return BeautifulSoup(f.read(), "html.parser")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=100)
+    args = parser.parse_args()
+
+    archive_soup = load_soup("tests/data/archive.html")
+    article_soup = load_soup("tests/data/article.html")
+    cases: list[tuple[str, Callable[[], Any], Callable[[], Any]]] = [
+        (
+            "teaser",
+            lambda: find_teaser(archive_soup),
+            lambda: tagesschau.TEASER_SPEC.extract_all(archive_soup),
+        ),
+        (
+            "archive",
+            lambda: find_archive(archive_soup),
+            lambda: tagesschau.ARCHIVE_SPEC.extract(archive_soup),
+        ),
+        (
+            "article",
+            lambda: find_article(article_soup),
+            lambda: tagesschau.ARTICLE_SPEC.extract(article_soup),
+        ),
+    ]
+    print(f"{'page':<10}{'find [ms]':>12}{'spec [ms]':>12}{'speedup':>10}")
+    for name, find, spec in cases:
+        if find() != spec():
+            raise AssertionError(f"Results for {name} differ.")
+        find_time = timeit.timeit(find, number=args.number) / args.number
+        spec_time = timeit.timeit(spec, number=args.number) / args.number
+        print(
+            f"{name:<10}{find_time * 1000:>12.3f}{spec_time * 1000:>12.3f}"
+            f"{find_time / spec_time:>9.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
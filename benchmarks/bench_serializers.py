@@ -0,0 +1,75 @@
+"""
+Benchmark of the record serializers against json.dump(records, fp,
+indent=4), which wrote all outputs before the serializers were introduced.
+
+The records of tests/data are repeated to a dump of --size records:
+
+    $ python benchmarks/bench_serializers.py --size 20000
+"""
+
+import argparse
+import io
+import json
+import timeit
+from typing import Any, Dict
+from tagesschauscraper import serializers
+
+FIXTURE = "tests/data/teaser-article-2023-01-01.json"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=20000)
+    parser.add_argument("--number", type=int, default=3)
+    args = parser.parse_args()
+
+    with open(FIXTURE, "r") as f:
+        fixture = json.load(f)["records"]
+    data: Dict[str, Any] = {
+        "records": [fixture[i % len(fixture)] for i in range(args.size)]
+    }
+
+    def dump_stdlib() -> bytes:
+        fp = io.StringIO()
+        json.dump(data, fp, indent=4)
+        return fp.getvalue().encode()
+
+    baseline = timeit.timeit(dump_stdlib, number=args.number) / args.number
+    print(
+        f"{'format':<10}{'write [MB/s]':>14}{'read [MB/s]':>13}"
+        f"{'size [MB]':>11}{'speedup':>10}"
+    )
+    size = len(dump_stdlib()) / 1e6
+    print(f"{'json.dump':<10}{size / baseline:>14.1f}{'':>13}{size:>11.2f}")
+    for name in serializers.SERIALIZERS:
+        try:
+            serializer = serializers.get_serializer(name)
+        except ImportError:
+            print(f"{name:<10}{'not installed':>14}")
+            continue
+
+        def dump() -> io.BytesIO:
+            fp = io.BytesIO()
+            serializer.dump(data, fp)
+            return fp
+
+        encoded = dump()
+        if serializer.load(io.BytesIO(encoded.getvalue())) != data:
+            raise AssertionError(f"Round trip of {name} failed.")
+
+        def read() -> list[Dict[str, Any]]:
+            return list(
+                serializer.iter_records(io.BytesIO(encoded.getvalue()))
+            )
+
+        write_time = timeit.timeit(dump, number=args.number) / args.number
+        read_time = timeit.timeit(read, number=args.number) / args.number
+        size = len(encoded.getvalue()) / 1e6
+        print(
+            f"{name:<10}{size / write_time:>14.1f}{size / read_time:>13.1f}"
+            f"{size:>11.2f}{baseline / write_time:>9.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
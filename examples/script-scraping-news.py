@@ -10,9 +10,13 @@ import argparse
 import logging
 import time
 import os
-import json
 from datetime import datetime
 from tagesschauscraper import helper, tagesschau
+from tagesschauscraper.serializers import (
+    SERIALIZERS,
+    get_serializer,
+    write_records,
+)
 from tagesschauscraper.tagesschau import ARCHIVE_URL
 
 # Argument parsing
@@ -45,6 +49,13 @@ parser.add_argument(
     help="Output dir",
     default="data",
 )
+parser.add_argument(
+    "--format",
+    type=str,
+    help="Output format",
+    default="json",
+    choices=list(SERIALIZERS),
+)
 parser.add_argument(
     "--logdir",
     type=str,
@@ -55,6 +66,7 @@ parser.add_argument(
     "-v", "--verbose", action="store_true", help="Enable verbose output"
 )
 args = parser.parse_args()
+serializer = get_serializer(args.format)
 
 # Set up logging
 if not os.path.exists(args.logdir):
@@ -98,12 +110,11 @@ dateDirectoryTreeCreator.make_dir_tree_from_file_path(file_path)
 file_name_and_path = os.path.join(
     file_path,
     helper.create_file_name_from_date(
-        date_, suffix="_" + args.category, extension=".json"
+        date_, suffix="_" + args.category, extension=serializer.extension
     ),
 )
 logging.info(f"Save scraped news to file {file_name_and_path}")
-with open(file_name_and_path, "w") as fp:
-    json.dump(records, fp, indent=4)
+write_records(file_name_and_path, records, serializer)
 logging.info("Done.")
 end_time = time.time()
 logging.info(f"Execution time: {end_time - start_time:.2f} seconds")
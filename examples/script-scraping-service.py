@@ -0,0 +1,136 @@
+"""
+===============================
+Scraping news data continuously
+===============================
+Polling the news archive of the current day in a fixed interval. New news
+are saved to a JSON file per poll. The process keeps running, so sessions,
+archive fingerprints and already scraped news stay in memory between polls.
+The service is controlled with a local HTTP endpoint:
+
+    curl http://127.0.0.1:8765/status
+    curl -X POST http://127.0.0.1:8765/poll
+    curl -X POST http://127.0.0.1:8765/stop
+"""
+
+import argparse
+import logging
+import os
+import signal
+from datetime import datetime
+from types import FrameType
+from typing import Union
+from tagesschauscraper import helper, tagesschau
+from tagesschauscraper.serializers import (
+    SERIALIZERS,
+    get_serializer,
+    write_records,
+)
+from tagesschauscraper.service import ControlServer, ScraperService
+
+# Argument parsing
+parser = argparse.ArgumentParser(
+    prog="TagesschauScraperService",
+    description=(
+        "This script polls the news archive of Tagesschau.de for the current"
+        " day and saves newly published news."
+    ),
+)
+parser.add_argument(
+    "--category",
+    type=str,
+    help="Filter news article by news category",
+    default="all",
+    choices=["wirtschaft", "inland", "ausland", "all"],
+)
+parser.add_argument(
+    "--interval",
+    type=float,
+    help="Seconds between two polls",
+    default=60.0,
+)
+parser.add_argument(
+    "--port",
+    type=int,
+    help="Port of the local control endpoint",
+    default=8765,
+)
+parser.add_argument(
+    "--datadir",
+    type=str,
+    help="Output dir",
+    default="data",
+)
+parser.add_argument(
+    "--format",
+    type=str,
+    help="Output format",
+    default="json",
+    choices=list(SERIALIZERS),
+)
+parser.add_argument(
+    "--logdir",
+    type=str,
+    help="Log dir",
+    default="logs",
+)
+parser.add_argument(
+    "-v", "--verbose", action="store_true", help="Enable verbose output"
+)
+args = parser.parse_args()
+serializer = get_serializer(args.format)
+
+# Set up logging
+if not os.path.exists(args.logdir):
+    os.makedirs(args.logdir)
+log_file = helper.create_file_name_from_date(
+    datetime.now(), suffix="service", extension=".log"
+)
+logging.basicConfig(
+    filename=os.path.join(args.logdir, log_file),
+    level=logging.DEBUG if args.verbose else logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+
+
+def save_records(records: list[tagesschau.NewsRecord]) -> None:
+    now = datetime.now()
+    dateDirectoryTreeCreator = helper.DateDirectoryTreeCreator(
+        now.date(), root_dir=args.datadir
+    )
+    file_path = dateDirectoryTreeCreator.create_file_path_from_date()
+    dateDirectoryTreeCreator.make_dir_tree_from_file_path(file_path)
+    file_name_and_path = os.path.join(
+        file_path,
+        helper.create_file_name_from_date(
+            now,
+            date_pattern="%Y-%m-%dT%H-%M-%S",
+            suffix="_" + args.category,
+            extension=serializer.extension,
+        ),
+    )
+    logging.info(f"Save {len(records)} news to file {file_name_and_path}")
+    write_records(file_name_and_path, records, serializer)
+
+
+service = ScraperService(
+    save_records, category=args.category, interval=args.interval
+)
+controlServer = ControlServer(service, port=args.port)
+
+
+def handle_signal(signum: int, frame: Union[FrameType, None]) -> None:
+    logging.info(f"Received signal {signum}, stopping.")
+    service.stop()
+
+
+signal.signal(signal.SIGTERM, handle_signal)
+signal.signal(signal.SIGINT, handle_signal)
+
+logging.info(
+    f"Start polling category {args.category} every {args.interval} seconds,"
+    f" control endpoint on port {controlServer.port}"
+)
+controlServer.start()
+service.run()
+controlServer.shutdown()
+logging.info("Done.")
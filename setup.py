@@ -22,6 +22,17 @@ setup(
     keywords='tagesschau scraper scraping news archive',
     packages=find_packages(),
     install_requires=required_packaes,
+    extras_require={
+        'fast': ['xxhash', 'orjson'],
+        'http2': ['httpx[http2,brotli]'],
+        'msgpack': ['msgpack'],
+        'redis': ['redis'],
+    },
+    entry_points={
+        'console_scripts': [
+            'tagesschauscraper=tagesschauscraper.cli:main',
+        ],
+    },
     project_urls={
         'Bug Reports': 'https://github.com/TheFerry10/tagesschauscraper/issues',
         'Source': 'https://github.com/TheFerry10/tagesschauscraper',
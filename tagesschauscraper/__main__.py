@@ -0,0 +1,4 @@
+import sys
+from tagesschauscraper.cli import main
+
+sys.exit(main())
@@ -0,0 +1,224 @@
+"""
+Bulk import of scraped dumps into the news database.
+"""
+
+import logging
+import multiprocessing
+import os
+import queue
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, Union
+from tagesschauscraper import helper
+from tagesschauscraper.db import (
+    NewsRecord,
+    Row,
+    get_row_hash,
+    news_record_to_row,
+)
+from tagesschauscraper.serializers import SERIALIZERS, read_records
+
+if TYPE_CHECKING:
+    from tagesschauscraper.db import TagesschauDB
+
+logger = logging.getLogger(__name__)
+
+_CHUNK_SIZE = 1 << 16
+_DUMP_EXTENSIONS = tuple(
+    sorted({serializer.extension for serializer in SERIALIZERS.values()})
+)
+
+# Queue of the worker processes, set by _init_worker
+_queue: "Union[multiprocessing.Queue[Any], None]" = None
+
+
+def iter_records(
+    file_path: str, chunk_size: int = _CHUNK_SIZE
+) -> Iterator[NewsRecord]:
+    """
+    Parse the records of a dump one by one, reading the file in chunks.
+
+    The format is chosen by the file extension, see serializers.
+
+    Raises
+    ------
+    ValueError
+        When the file has no list of records or is truncated.
+    """
+    return read_records(file_path, chunk_size)
+
+
+def record_to_row(record: NewsRecord) -> Row:
+    """
+    Map a record of a dump to the columns of the Tagesschau table.
+
+    Records of the scraper have a teaser and an article. Older teaser dumps
+    have flat records, whose id is derived from the link as by the scraper.
+    """
+    if "teaser" in record:
+        return news_record_to_row(record)
+    return {
+        "id": record.get("id") or helper.get_hash_from_string(record["link"]),
+        "date": record["date"],
+        "topline": record.get("topline", ""),
+        "headline": record.get("headline", ""),
+        "shorttext": record.get("shorttext", ""),
+        "link": record["link"],
+        "tags": record.get("tags", ""),
+    }
+
+
+def iter_rows(file_path: str) -> Iterator[Row]:
+    for record in iter_records(file_path):
+        yield record_to_row(record)
+
+
+def find_dump_files(paths: Iterable[str]) -> list[str]:
+    """
+    Dump files among the paths and, recursively, in the directories among
+    them.
+    """
+    file_paths: list[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, file_names in os.walk(path):
+                file_paths.extend(
+                    os.path.join(root, file_name)
+                    for file_name in sorted(file_names)
+                    if file_name.endswith(_DUMP_EXTENSIONS)
+                )
+        else:
+            file_paths.append(path)
+    return file_paths
+
+
+def _init_worker(rows_queue: "multiprocessing.Queue[Any]") -> None:
+    global _queue
+    _queue = rows_queue
+
+
+def _parse_file(file_path: str, chunk_rows: int) -> int:
+    # Runs in a worker process and sends the rows in chunks to the loader.
+    # The file path marks the end of the file, also when parsing failed.
+    assert _queue is not None
+    count = 0
+    try:
+        chunk: list[Row] = []
+        for row in iter_rows(file_path):
+            # Takes the hashing off the loading process
+            row["content_hash"] = get_row_hash(row)
+            chunk.append(row)
+            if len(chunk) >= chunk_rows:
+                _queue.put(chunk)
+                count += len(chunk)
+                chunk = []
+        _queue.put(chunk)
+        count += len(chunk)
+    finally:
+        _queue.put(file_path)
+    return count
+
+
+def _receive_rows(
+    rows_queue: "multiprocessing.Queue[Any]", futures: list["Future[int]"]
+) -> Iterator[Row]:
+    pending = len(futures)
+    while pending:
+        try:
+            item = rows_queue.get(timeout=1.0)
+        except queue.Empty:
+            # A crashed worker never sends its end marker
+            for future in futures:
+                if future.done() and future.exception() is not None:
+                    future.result()
+            continue
+        if isinstance(item, str):
+            pending -= 1
+        else:
+            yield from item
+
+
+def import_files(
+    tagesschauDB: "TagesschauDB",
+    paths: Iterable[str],
+    workers: Union[int, None] = None,
+    batch_size: int = 50000,
+    chunk_rows: int = 1000,
+) -> Dict[str, int]:
+    """
+    Import JSON dumps of scraped news into the database.
+
+    The files are parsed in parallel by worker processes, which stream their
+    rows to this process. Here all rows are written with
+    TagesschauDB.bulk_load(), since SQLite has a single writer.
+
+    Parameters
+    ----------
+    tagesschauDB : TagesschauDB
+        Database to import into.
+    paths : Iterable[str]
+        JSON files, or directories searched for JSON files.
+    workers : int, optional
+        Number of worker processes, by default one per CPU, but at most one
+        per file. With a single worker the files are parsed in this process.
+    batch_size : int, optional
+        Rows per transaction, by default 50000.
+    chunk_rows : int, optional
+        Rows per message from a worker to this process, by default 1000.
+
+    Returns
+    -------
+    dict
+        Number of files, of rows read and of rows inserted or changed.
+
+    Raises
+    ------
+    ValueError
+        When a file is no valid dump. Rows read before are kept.
+    """
+    file_paths = find_dump_files(paths)
+    if workers is None:
+        workers = min(os.cpu_count() or 1, len(file_paths))
+    logger.info(f"Import {len(file_paths)} files with {workers} workers.")
+    if workers <= 1:
+        read = 0
+
+        def rows() -> Iterator[Row]:
+            nonlocal read
+            for file_path in file_paths:
+                for row in iter_rows(file_path):
+                    read += 1
+                    yield row
+
+        loaded = tagesschauDB.bulk_load(rows(), batch_size)
+        return {"files": len(file_paths), "read": read, "loaded": loaded}
+
+    context = multiprocessing.get_context()
+    rows_queue: "multiprocessing.Queue[Any]" = context.Queue(
+        maxsize=4 * workers
+    )
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(rows_queue,),
+    ) as executor:
+        futures = [
+            executor.submit(_parse_file, file_path, chunk_rows)
+            for file_path in file_paths
+        ]
+        try:
+            loaded = tagesschauDB.bulk_load(
+                _receive_rows(rows_queue, futures), batch_size
+            )
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            # Unblock the workers waiting for space on the queue
+            while not all(future.done() for future in futures):
+                try:
+                    rows_queue.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            raise
+        read = sum(future.result() for future in futures)
+    return {"files": len(file_paths), "read": read, "loaded": loaded}
@@ -0,0 +1,213 @@
+"""
+Change detection for archive pages that are scraped repeatedly.
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, Iterable, Union
+import requests
+
+RequestParams = Dict[str, str]
+PageFingerprint = Dict[str, Any]
+
+
+class ArchiveChangeTracker:
+    """
+    Remember a fingerprint per archive page and the teaser links already
+    seen in the archive of a date and category.
+
+    Links are remembered across all pages of an archive, since teasers move
+    from one page to the next when new teasers are published.
+
+    A page counts as unchanged, when the server answers a conditional request
+    with 304 (ETag/Last-Modified), when the response body hashes to the same
+    value or when the list of teaser links is the same as before.
+    """
+
+    def __init__(self, file_path: Union[str, None] = None) -> None:
+        """
+        Parameters
+        ----------
+        file_path : str, optional
+            JSON file the fingerprints are loaded from and saved to. Without
+            a file path the fingerprints are kept in memory only.
+        """
+        self.file_path = file_path
+        self.pages: Dict[str, PageFingerprint] = dict()
+        self.seen_links: Dict[str, set[str]] = dict()
+        if file_path is not None and os.path.isfile(file_path):
+            self.load()
+
+    @staticmethod
+    def get_page_key(params: RequestParams) -> str:
+        return "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+
+    @staticmethod
+    def _get_params(key: str) -> RequestParams:
+        return dict(item.split("=", 1) for item in key.split("&"))
+
+    @staticmethod
+    def get_archive_key(params: RequestParams) -> str:
+        """
+        Key of the archive of the page, i.e. the page key without the page
+        index.
+        """
+        return ArchiveChangeTracker.get_page_key(
+            {k: v for k, v in params.items() if k != "pageIndex"}
+        )
+
+    @staticmethod
+    def get_hash(content: Union[str, bytes]) -> str:
+        if isinstance(content, str):
+            content = content.encode()
+        return hashlib.sha1(content).hexdigest()
+
+    def get_request_headers(self, params: RequestParams) -> Dict[str, str]:
+        """
+        Headers for a conditional request of the archive page.
+        """
+        fingerprint = self.pages.get(self.get_page_key(params), {})
+        headers = {}
+        if fingerprint.get("etag"):
+            headers["If-None-Match"] = fingerprint["etag"]
+        if fingerprint.get("last_modified"):
+            headers["If-Modified-Since"] = fingerprint["last_modified"]
+        return headers
+
+    def is_unchanged(
+        self, params: RequestParams, response: requests.Response
+    ) -> bool:
+        """
+        Check the response before parsing, i.e. by status code and body hash.
+        """
+        if response.status_code == 304:
+            return True
+        fingerprint = self.pages.get(self.get_page_key(params))
+        if fingerprint is None:
+            return False
+        return bool(
+            fingerprint.get("body_hash") == self.get_hash(response.content)
+        )
+
+    def get_new_links(
+        self, params: RequestParams, links: list[str]
+    ) -> list[str]:
+        """
+        Teaser links of the archive page that have not been seen on any page
+        of its archive before, without remembering them.
+        """
+        key = self.get_page_key(params)
+        teaser_hash = self.get_hash("\n".join(links))
+        if self.pages.get(key, {}).get("teaser_hash") == teaser_hash:
+            return []
+        seen_links = self.seen_links.get(self.get_archive_key(params), set())
+        return [link for link in links if link not in seen_links]
+
+    def mark_seen(self, params: RequestParams, links: Iterable[str]) -> None:
+        """
+        Remember the links as seen in the archive of the page, without
+        storing a fingerprint of the page, e.g. when some of its articles
+        failed and the page has to be parsed again.
+        """
+        self.seen_links.setdefault(self.get_archive_key(params), set()).update(
+            links
+        )
+
+    def update(
+        self,
+        params: RequestParams,
+        response: requests.Response,
+        links: list[str],
+    ) -> list[str]:
+        """
+        Store the fingerprint of the archive page and return the teaser links
+        that have not been seen on any page of its archive before.
+
+        Parameters
+        ----------
+        params : dict
+            Request parameters of the archive page.
+        response : requests.Response
+            Response of the archive page.
+        links : list[str]
+            Article links of all teasers on the archive page.
+
+        Returns
+        -------
+        list[str]
+            Newly appeared article links in the order of the page.
+        """
+        new_links = self.get_new_links(params, links)
+        self.pages[self.get_page_key(params)] = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "body_hash": self.get_hash(response.content),
+            "teaser_hash": self.get_hash("\n".join(links)),
+        }
+        self.mark_seen(params, links)
+        return new_links
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Copy of the fingerprints and seen links, see restore().
+        """
+        return {
+            "pages": {key: dict(page) for key, page in self.pages.items()},
+            "seen_links": {
+                key: set(links) for key, links in self.seen_links.items()
+            },
+        }
+
+    def restore(self, snapshot: Dict[str, Any]) -> None:
+        """
+        Reset the fingerprints and seen links to a snapshot, e.g. when the
+        records of a poll could not be written.
+        """
+        self.pages = snapshot["pages"]
+        self.seen_links = snapshot["seen_links"]
+
+    def prune(self, dates: Iterable[str]) -> None:
+        """
+        Forget the pages and links of all archive dates except the given
+        ones, e.g. of past days in a long running service.
+
+        Parameters
+        ----------
+        dates : Iterable[str]
+            Dates to keep in the format of the "datum" parameter.
+        """
+        keep = set(dates)
+
+        def is_kept(key: str) -> bool:
+            return self._get_params(key).get("datum") in keep
+
+        self.pages = {k: v for k, v in self.pages.items() if is_kept(k)}
+        self.seen_links = {
+            k: v for k, v in self.seen_links.items() if is_kept(k)
+        }
+
+    def load(self) -> None:
+        if self.file_path is None:
+            raise ValueError("No file path provided.")
+        with open(self.file_path, "r") as f:
+            data = json.load(f)
+        self.pages = data["pages"]
+        self.seen_links = {
+            key: set(links) for key, links in data["seen_links"].items()
+        }
+
+    def save(self) -> None:
+        if self.file_path is None:
+            raise ValueError("No file path provided.")
+        with open(self.file_path, "w") as f:
+            json.dump(
+                {
+                    "pages": self.pages,
+                    "seen_links": {
+                        key: sorted(links)
+                        for key, links in self.seen_links.items()
+                    },
+                },
+                f,
+            )
@@ -0,0 +1,750 @@
+"""
+Command line interface of tagesschauscraper.
+
+Heavy dependencies (requests, bs4, sqlite3) are imported inside the
+commands, so that e.g. --help does not pay for importing them.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import date, datetime
+from typing import Callable, Union
+from tagesschauscraper import __version__, helper
+
+NEWS_CATEGORY_CHOICES = ["wirtschaft", "inland", "ausland", "all"]
+INPUT_DATE_PATTERN = "%Y-%m-%d"
+# Duplicated from tagesschauscraper.profiling, .transport and .serializers
+# to keep the import cheap, tests/unit/test_cli.py checks they are the same
+PROFILE_MODES = ["cprofile", "sampling", "memory", "all"]
+TRANSPORTS = ["requests", "http2"]
+FORMATS = ["json", "orjson", "msgpack"]
+
+
+def setup_logging(logdir: str, verbose: bool, suffix: str = "scrape") -> str:
+    """
+    Set up logging to a file named after the current time.
+
+    Returns
+    -------
+    str
+        Path of the log file.
+    """
+    if not os.path.exists(logdir):
+        os.makedirs(logdir)
+    log_file = helper.create_file_name_from_date(
+        datetime.now(), suffix=suffix, extension=".log"
+    )
+    log_file_path = os.path.join(logdir, log_file)
+    logging.basicConfig(
+        filename=log_file_path,
+        level=logging.DEBUG if verbose else logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
+    return log_file_path
+
+
+def get_dates(args: argparse.Namespace) -> list[date]:
+    start_date = datetime.strptime(args.start_date, INPUT_DATE_PATTERN).date()
+    if args.end_date is None:
+        return [start_date]
+    end_date = datetime.strptime(args.end_date, INPUT_DATE_PATTERN).date()
+    return helper.get_date_range(start_date=start_date, end_date=end_date)
+
+
+def scrape(args: argparse.Namespace) -> int:
+    log_file_path = setup_logging(args.logdir, args.verbose)
+    if args.profile is None:
+        return _scrape(args)
+    from tagesschauscraper.profiling import Profiler
+
+    # The profiles are written next to the log file of the run
+    with Profiler(os.path.splitext(log_file_path)[0], mode=args.profile):
+        return _scrape(args)
+
+
+def _scrape(args: argparse.Namespace) -> int:
+    import requests
+    from tagesschauscraper import retrieve, tagesschau
+    from tagesschauscraper.failures import FailureLedger
+    from tagesschauscraper.parsecache import ParseCache
+    from tagesschauscraper.serializers import get_serializer, write_records
+    from tagesschauscraper.transport import create_session
+
+    start_time = time.time()
+    serializer = get_serializer(args.format)
+    dates = get_dates(args)
+    start_date = dates[0]
+
+    logging.info(
+        f"Initialize scraping for dates {dates[0]} to {dates[-1]} and"
+        f" category {args.category}"
+    )
+    session: requests.Session
+    if args.replay is not None:
+        session = retrieve.ReplaySession(
+            retrieve.open_response_archive(args.replay)
+        )
+    elif args.record is not None:
+        session = retrieve.RecordingSession(
+            retrieve.open_response_archive(args.record)
+        )
+    else:
+        session = create_session(args.transport)
+    parseCache = (
+        ParseCache(args.parse_cache) if args.parse_cache is not None else None
+    )
+    failureLedger = (
+        FailureLedger(args.ledger) if args.ledger is not None else None
+    )
+    config = tagesschau.ScraperConfig(
+        [
+            tagesschau.ArchiveFilter(
+                {"date": date_, "category": args.category}
+            )
+            for date_ in dates
+        ],
+        session=session,
+        parse_cache=parseCache,
+        bounded_memory=args.bounded_memory,
+        failure_ledger=failureLedger,
+    )
+    tagesschauScraper = tagesschau.TagesschauScraper(
+        session=session,
+        failure_ledger=failureLedger,
+        parse_cache=parseCache,
+        bounded_memory=args.bounded_memory,
+    )
+    logging.info(
+        f"Scraping news from URL {tagesschau.ARCHIVE_URL} with params"
+        f" {config.request_params}"
+    )
+    records = tagesschauScraper.get_news_from_archive(config)
+    logging.info("Scraping terminated.")
+    if failureLedger is not None:
+        failureLedger.save()
+        logging.info(f"{len(failureLedger)} failures in {args.ledger}")
+    if parseCache is not None:
+        parseCache.save()
+        logging.info(
+            f"Parse cache {args.parse_cache}: {parseCache.hits} hits,"
+            f" {parseCache.misses} misses"
+        )
+
+    if args.end_date is None:
+        dateDirectoryTreeCreator = helper.DateDirectoryTreeCreator(
+            start_date, root_dir=args.datadir
+        )
+        file_path = dateDirectoryTreeCreator.create_file_path_from_date()
+        dateDirectoryTreeCreator.make_dir_tree_from_file_path(file_path)
+        file_name = helper.create_file_name_from_date(
+            start_date,
+            suffix="_" + args.category,
+            extension=serializer.extension,
+        )
+    else:
+        file_path = args.datadir
+        os.makedirs(file_path, exist_ok=True)
+        file_name = "_".join([args.start_date, args.end_date, args.category])
+        file_name += serializer.extension
+    file_name_and_path = os.path.join(file_path, file_name)
+    logging.info(f"Save scraped news to file {file_name_and_path}")
+    write_records(file_name_and_path, records, serializer)
+    logging.info("Done.")
+    logging.info(f"Execution time: {time.time() - start_time:.2f} seconds")
+    return 0
+
+
+def retry(args: argparse.Namespace) -> int:
+    import requests
+    from tagesschauscraper import tagesschau
+    from tagesschauscraper.failures import FailureLedger, retry_failures
+    from tagesschauscraper.serializers import get_serializer, write_records
+    from tagesschauscraper.transport import create_session
+
+    if not os.path.isfile(args.ledger):
+        print(f"Failure ledger {args.ledger} does not exist.", file=sys.stderr)
+        return 1
+    setup_logging(args.logdir, args.verbose, suffix="retry")
+    serializer = get_serializer(args.format)
+    failureLedger = FailureLedger(args.ledger)
+    session = create_session(args.transport)
+    if args.transport == "requests":
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=args.workers)
+        session.mount("https://", adapter)
+    tagesschauScraper = tagesschau.TagesschauScraper(
+        session=session, failure_ledger=failureLedger
+    )
+    records = retry_failures(
+        tagesschauScraper,
+        max_workers=args.workers,
+        max_attempts=args.max_attempts,
+    )
+    failureLedger.save()
+
+    os.makedirs(args.datadir, exist_ok=True)
+    file_name_and_path = os.path.join(
+        args.datadir,
+        helper.create_file_name_from_date(
+            datetime.now(), suffix="_retry", extension=serializer.extension
+        ),
+    )
+    logging.info(f"Save retried news to file {file_name_and_path}")
+    write_records(file_name_and_path, records, serializer)
+    print(
+        f"Recovered {len(records['records'])} news,"
+        f" {len(failureLedger)} failures remain."
+    )
+    return 0
+
+
+def coordinate(args: argparse.Namespace) -> int:
+    from tagesschauscraper.serializers import get_serializer, write_records
+    from tagesschauscraper.tagesschau import ArchiveFilter
+    from tagesschauscraper.workqueue import Coordinator, open_work_queue
+
+    setup_logging(args.logdir, args.verbose, suffix="coordinate")
+    serializer = get_serializer(args.format)
+    with open_work_queue(args.queue) as workQueue:
+        coordinator = Coordinator(workQueue)
+        coordinator.submit(
+            [
+                ArchiveFilter({"date": date_, "category": args.category})
+                for date_ in get_dates(args)
+            ]
+        )
+        if args.no_wait:
+            return 0
+        counts = coordinator.wait()
+        records = coordinator.collect()
+    os.makedirs(args.datadir, exist_ok=True)
+    file_name = "_".join(
+        filter(None, [args.start_date, args.end_date, args.category])
+    )
+    file_name_and_path = os.path.join(
+        args.datadir, file_name + serializer.extension
+    )
+    logging.info(f"Save scraped news to file {file_name_and_path}")
+    write_records(file_name_and_path, records, serializer)
+    print(f"Scraped {len(records['records'])} news, units: {counts}")
+    return 0
+
+
+def work(args: argparse.Namespace) -> int:
+    from tagesschauscraper.workqueue import Worker, open_work_queue
+
+    setup_logging(args.logdir, args.verbose, suffix="work")
+    with open_work_queue(args.queue, lease_seconds=args.lease) as workQueue:
+        processed = Worker(workQueue).run()
+    print(f"Processed {processed} units.")
+    return 0
+
+
+def query(args: argparse.Namespace) -> int:
+    import json
+    from tagesschauscraper.db import TagesschauDB
+
+    if not os.path.isfile(args.db):
+        print(f"Database {args.db} does not exist.", file=sys.stderr)
+        return 1
+    with TagesschauDB(args.db) as tagesschauDB:
+        rows = tagesschauDB.get_latest(
+            args.limit, args.category, args.start, args.end
+        )
+    for row in rows:
+        print(json.dumps(row, ensure_ascii=False))
+    return 0
+
+
+def counts(args: argparse.Namespace) -> int:
+    import json
+    from tagesschauscraper.db import TagesschauDB
+
+    if not os.path.isfile(args.db):
+        print(f"Database {args.db} does not exist.", file=sys.stderr)
+        return 1
+    with TagesschauDB(args.db) as tagesschauDB:
+        if args.rebuild:
+            tagesschauDB.rebuild_rollups()
+        if args.by == "tag":
+            rows = tagesschauDB.get_tag_counts(
+                args.start, args.end, args.category, args.limit
+            )
+        elif args.by == "category":
+            rows = tagesschauDB.get_category_counts(args.start, args.end)
+        else:
+            rows = tagesschauDB.get_daily_counts(
+                args.start, args.end, args.category
+            )
+    for row in rows:
+        print(json.dumps(row, ensure_ascii=False))
+    return 0
+
+
+def coverage(args: argparse.Namespace) -> int:
+    import json
+    from tagesschauscraper.coverage import ArchiveCounts, CoveragePlanner
+    from tagesschauscraper.db import TagesschauDB
+    from tagesschauscraper.tagesschau import TagesschauScraper
+
+    setup_logging(args.logdir, args.verbose, suffix="coverage")
+    archiveCounts = ArchiveCounts(args.counts)
+    with TagesschauDB(args.db) as tagesschauDB:
+        tagesschauDB.create_table()
+        coveragePlanner = CoveragePlanner(
+            tagesschauDB,
+            categories=[args.category],
+            scraper=TagesschauScraper(bounded_memory=args.bounded_memory),
+            archive_counts=archiveCounts,
+            max_workers=args.workers,
+        )
+        if args.dry_run:
+            for gap in coveragePlanner.plan(get_dates(args)):
+                print(
+                    json.dumps(
+                        gap._asdict() | {"date_": gap.date_.isoformat()}
+                    )
+                )
+            archiveCounts.save()
+            return 0
+        records = coveragePlanner.run(get_dates(args))["records"]
+    print(f"Scraped {len(records)} missing news into {args.db}.")
+    return 0
+
+
+def import_dumps(args: argparse.Namespace) -> int:
+    from tagesschauscraper.bulkimport import import_files
+    from tagesschauscraper.db import TagesschauDB
+
+    setup_logging(args.logdir, args.verbose, suffix="import")
+    start = time.perf_counter()
+    with TagesschauDB(args.db, upsert=args.upsert) as tagesschauDB:
+        counts = import_files(
+            tagesschauDB, args.paths, args.workers, args.batch_size
+        )
+    print(
+        f"Imported {counts['loaded']} of {counts['read']} news from"
+        f" {counts['files']} files in {time.perf_counter() - start:.1f} s."
+    )
+    return 0
+
+
+def cluster(args: argparse.Namespace) -> int:
+    import json
+    from tagesschauscraper.db import TagesschauDB
+    from tagesschauscraper.nearduplicates import NearDuplicateDetector
+
+    if not os.path.isfile(args.db):
+        print(f"Database {args.db} does not exist.", file=sys.stderr)
+        return 1
+    detector = NearDuplicateDetector(threshold=args.threshold)
+    with TagesschauDB(args.db) as tagesschauDB:
+        tagesschauDB.create_table()
+        detector.cluster_db(tagesschauDB, update=not args.dry_run)
+    for group in detector.get_duplicate_groups():
+        print(json.dumps(group, ensure_ascii=False))
+    return 0
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="tagesschauscraper",
+        description="Scrape the news archive of Tagesschau.de.",
+    )
+    parser.add_argument(
+        "--version", action="version", version=f"%(prog)s {__version__}"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    scrape_parser = subparsers.add_parser(
+        "scrape",
+        help="Scrape news for a date or a date range.",
+        description=(
+            "Scrape news data from Tagesschau.de. The scraped news are"
+            " filtered by publishing date or date range and news category."
+        ),
+    )
+    scrape_parser.add_argument(
+        "start_date",
+        metavar="start",
+        type=str,
+        help=(
+            "Publishing date, or start date for a date range (inclusive)."
+            " Accepted date format is YYYY-MM-DD"
+        ),
+    )
+    scrape_parser.add_argument(
+        "end_date",
+        metavar="end",
+        type=str,
+        nargs="?",
+        default=None,
+        help=(
+            "End date for a date range (exclusive). Accepted date format is"
+            " YYYY-MM-DD"
+        ),
+    )
+    scrape_parser.add_argument(
+        "--category",
+        type=str,
+        help="Filter news article by news category",
+        default="all",
+        choices=NEWS_CATEGORY_CHOICES,
+    )
+    scrape_parser.add_argument(
+        "--datadir", type=str, help="Output dir", default="data"
+    )
+    scrape_parser.add_argument(
+        "--logdir", type=str, help="Log dir", default="logs"
+    )
+    replay_group = scrape_parser.add_mutually_exclusive_group()
+    replay_group.add_argument(
+        "--record",
+        type=str,
+        help=(
+            "Store all responses in this response archive, a packed page"
+            " store for .pack files, otherwise SQLite"
+        ),
+        default=None,
+    )
+    replay_group.add_argument(
+        "--replay",
+        type=str,
+        help="Answer all requests from this response archive, offline",
+        default=None,
+    )
+    replay_group.add_argument(
+        "--transport",
+        type=str,
+        help=(
+            "HTTP transport, http2 multiplexes all requests over one"
+            " connection and needs the http2 extra (default: requests)"
+        ),
+        default="requests",
+        choices=TRANSPORTS,
+    )
+    scrape_parser.add_argument(
+        "--ledger",
+        type=str,
+        help=(
+            "Record failed archive pages and articles in this JSON file"
+            " instead of aborting"
+        ),
+        default=None,
+    )
+    scrape_parser.add_argument(
+        "--parse-cache",
+        type=str,
+        help=(
+            "Cache extraction results in this JSON file, so that unchanged"
+            " pages are not parsed again, e.g. with --replay"
+        ),
+        default=None,
+    )
+    scrape_parser.add_argument(
+        "--profile",
+        type=str,
+        nargs="?",
+        const="all",
+        default=None,
+        choices=PROFILE_MODES,
+        help=(
+            "Profile the run and write the profiles next to the log file"
+            " (default: all), memory tracks the allocations per stage"
+        ),
+    )
+    scrape_parser.add_argument(
+        "-v", "--verbose", action="store_true", help="Enable verbose output"
+    )
+    scrape_parser.set_defaults(func=scrape)
+
+    retry_parser = subparsers.add_parser(
+        "retry", help="Scrape the failures recorded in a failure ledger again."
+    )
+    retry_parser.add_argument(
+        "--ledger", type=str, help="Failure ledger", default="failures.json"
+    )
+    retry_parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of concurrent requests",
+        default=4,
+    )
+    retry_parser.add_argument(
+        "--max-attempts",
+        type=int,
+        help="Skip failures with at least this many failed attempts",
+        default=None,
+    )
+    retry_parser.add_argument(
+        "--transport",
+        type=str,
+        help="HTTP transport (default: requests)",
+        default="requests",
+        choices=TRANSPORTS,
+    )
+    retry_parser.add_argument(
+        "--datadir", type=str, help="Output dir", default="data"
+    )
+    retry_parser.add_argument(
+        "--logdir", type=str, help="Log dir", default="logs"
+    )
+    retry_parser.add_argument(
+        "-v", "--verbose", action="store_true", help="Enable verbose output"
+    )
+    retry_parser.set_defaults(func=retry)
+
+    coordinate_parser = subparsers.add_parser(
+        "coordinate",
+        help="Put a date range on a work queue and collect the results.",
+    )
+    coordinate_parser.add_argument(
+        "start_date", metavar="start", type=str, help="Start date, YYYY-MM-DD"
+    )
+    coordinate_parser.add_argument(
+        "end_date",
+        metavar="end",
+        type=str,
+        nargs="?",
+        default=None,
+        help="End date (exclusive), YYYY-MM-DD",
+    )
+    coordinate_parser.add_argument(
+        "--category",
+        type=str,
+        help="Filter news article by news category",
+        default="all",
+        choices=NEWS_CATEGORY_CHOICES,
+    )
+    coordinate_parser.add_argument(
+        "--no-wait",
+        action="store_true",
+        help="Only submit the work units, do not wait for the workers",
+    )
+    coordinate_parser.add_argument(
+        "--datadir", type=str, help="Output dir", default="data"
+    )
+    work_parser = subparsers.add_parser(
+        "work", help="Process units of a work queue until it is finished."
+    )
+    work_parser.add_argument(
+        "--lease",
+        type=float,
+        help="Seconds a unit stays leased without heartbeat",
+        default=60.0,
+    )
+    for queue_parser in [coordinate_parser, work_parser]:
+        queue_parser.add_argument(
+            "--queue",
+            type=str,
+            help=(
+                "Work queue database file, or the URL of a Redis server for"
+                " workers on several hosts, e.g. redis://host:6379/0"
+            ),
+            default="queue.db",
+        )
+        queue_parser.add_argument(
+            "--logdir", type=str, help="Log dir", default="logs"
+        )
+        queue_parser.add_argument(
+            "-v",
+            "--verbose",
+            action="store_true",
+            help="Enable verbose output",
+        )
+    for output_parser in [scrape_parser, retry_parser, coordinate_parser]:
+        output_parser.add_argument(
+            "--format",
+            type=str,
+            help=(
+                "Output format, orjson writes compact JSON several times"
+                " faster and msgpack binary files (default: json)"
+            ),
+            default="json",
+            choices=FORMATS,
+        )
+    coordinate_parser.set_defaults(func=coordinate)
+    work_parser.set_defaults(func=work)
+
+    counts_parser = subparsers.add_parser(
+        "counts", help="Print news counts per day, category or tag."
+    )
+    counts_parser.add_argument(
+        "--db", type=str, help="Database file", default="news.db"
+    )
+    counts_parser.add_argument(
+        "--by",
+        type=str,
+        help="Count news per day and category, per category or per tag",
+        default="day",
+        choices=["day", "category", "tag"],
+    )
+    counts_parser.add_argument(
+        "--start", type=str, help="First day, YYYY-MM-DD", default=None
+    )
+    counts_parser.add_argument(
+        "--end", type=str, help="End day (exclusive), YYYY-MM-DD", default=None
+    )
+    counts_parser.add_argument(
+        "--category", type=str, help="News category", default=None
+    )
+    counts_parser.add_argument(
+        "--limit", type=int, help="Number of tags", default=None
+    )
+    counts_parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Recompute the rollup tables from all news first",
+    )
+    counts_parser.set_defaults(func=counts)
+
+    coverage_parser = subparsers.add_parser(
+        "coverage",
+        help="Scrape only the news missing in a database for a date range.",
+    )
+    coverage_parser.add_argument(
+        "start_date", metavar="start", type=str, help="Start date, YYYY-MM-DD"
+    )
+    coverage_parser.add_argument(
+        "end_date",
+        metavar="end",
+        type=str,
+        nargs="?",
+        default=None,
+        help="End date (exclusive), YYYY-MM-DD",
+    )
+    coverage_parser.add_argument(
+        "--category",
+        type=str,
+        help="Filter news article by news category",
+        default="all",
+        choices=NEWS_CATEGORY_CHOICES,
+    )
+    coverage_parser.add_argument(
+        "--db", type=str, help="Database file", default="news.db"
+    )
+    coverage_parser.add_argument(
+        "--counts",
+        type=str,
+        help="Archive result counts kept between runs",
+        default="archive-counts.json",
+    )
+    coverage_parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of concurrent article requests",
+        default=8,
+    )
+    coverage_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only print the gaps, do not scrape them",
+    )
+    for long_run_parser in [scrape_parser, coverage_parser]:
+        long_run_parser.add_argument(
+            "--bounded-memory",
+            action="store_true",
+            help=(
+                "Free every parsed page right after the extraction, so that"
+                " memory stays flat in long runs"
+            ),
+        )
+    coverage_parser.add_argument(
+        "--logdir", type=str, help="Log dir", default="logs"
+    )
+    coverage_parser.add_argument(
+        "-v", "--verbose", action="store_true", help="Enable verbose output"
+    )
+    coverage_parser.set_defaults(func=coverage)
+
+    import_parser = subparsers.add_parser(
+        "import", help="Import dumps of scraped news into a database."
+    )
+    import_parser.add_argument(
+        "paths",
+        metavar="path",
+        type=str,
+        nargs="+",
+        help="Dump file, or directory searched for .json and .msgpack files",
+    )
+    import_parser.add_argument(
+        "--db", type=str, help="Database file", default="news.db"
+    )
+    import_parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of processes parsing files (default: one per CPU)",
+        default=None,
+    )
+    import_parser.add_argument(
+        "--batch-size",
+        type=int,
+        help="Rows per transaction",
+        default=50000,
+    )
+    import_parser.add_argument(
+        "--upsert",
+        action="store_true",
+        help="Update stored news whose content changed",
+    )
+    import_parser.add_argument(
+        "--logdir", type=str, help="Log dir", default="logs"
+    )
+    import_parser.add_argument(
+        "-v", "--verbose", action="store_true", help="Enable verbose output"
+    )
+    import_parser.set_defaults(func=import_dumps)
+
+    cluster_parser = subparsers.add_parser(
+        "cluster",
+        help="Group news with near-duplicate headline and shorttext.",
+    )
+    cluster_parser.add_argument(
+        "--db", type=str, help="Database file", default="news.db"
+    )
+    cluster_parser.add_argument(
+        "--threshold",
+        type=float,
+        help="Minimum estimated similarity of near duplicates",
+        default=0.7,
+    )
+    cluster_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only print the groups, do not store the cluster ids",
+    )
+    cluster_parser.set_defaults(func=cluster)
+
+    query_parser = subparsers.add_parser(
+        "query", help="Print the latest news stored in the database."
+    )
+    query_parser.add_argument(
+        "--db", type=str, help="Database file", default="news.db"
+    )
+    query_parser.add_argument(
+        "--limit", type=int, help="Number of news", default=10
+    )
+    query_parser.add_argument(
+        "--category", type=str, help="News category", default=None
+    )
+    query_parser.add_argument(
+        "--start", type=str, help="First day, YYYY-MM-DD", default=None
+    )
+    query_parser.add_argument(
+        "--end", type=str, help="End day (exclusive), YYYY-MM-DD", default=None
+    )
+    query_parser.set_defaults(func=query)
+    return parser
+
+
+def main(argv: Union[list[str], None] = None) -> int:
+    parser = create_parser()
+    args = parser.parse_args(argv)
+    func: Callable[[argparse.Namespace], int] = args.func
+    return func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
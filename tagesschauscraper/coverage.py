@@ -0,0 +1,320 @@
+"""
+Detection and filling of gaps between the news archive and the database.
+"""
+
+import json
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, NamedTuple, Tuple, Union
+from tagesschauscraper import helper
+from tagesschauscraper.db import TagesschauDB, news_record_to_row
+from tagesschauscraper.planner import WorkUnit
+from tagesschauscraper.tagesschau import (
+    NewsRecord,
+    TagesschauScraper,
+    TeaserRecord,
+)
+
+logger = logging.getLogger(__name__)
+
+_DIGITS = re.compile(r"\d+")
+
+
+def parse_num_teaser(text: Union[str, None]) -> Union[int, None]:
+    """
+    Number of teasers from the result count of an archive page.
+
+    Examples
+    --------
+    parse_num_teaser("1.418")
+    >>> 1418
+    """
+    if not text:
+        return None
+    digits = "".join(_DIGITS.findall(text))
+    return int(digits) if digits else None
+
+
+class Gap(NamedTuple):
+    """
+    A (date, category) combination with fewer news stored than listed in
+    the archive.
+    """
+
+    date_: date
+    category: str
+    expected: int
+    stored: int
+    pages: int
+
+    @property
+    def missing(self) -> int:
+        return self.expected - self.stored
+
+    def get_work_units(self) -> list[WorkUnit]:
+        return [
+            WorkUnit(self.date_, self.category, page)
+            for page in range(1, self.pages + 1)
+        ]
+
+
+class ArchiveCounts:
+    """
+    Result counts of the archive per date and category.
+
+    The counts of settled dates, which no longer change, are kept between
+    runs, so that complete dates are recognized without any request.
+    """
+
+    def __init__(self, file_path: Union[str, None] = None) -> None:
+        """
+        Parameters
+        ----------
+        file_path : str, optional
+            JSON file the counts are loaded from and saved to. Without a file
+            path the counts are kept in memory only.
+        """
+        self.file_path = file_path
+        self.counts: Dict[str, Dict[str, Any]] = dict()
+        if file_path is not None and os.path.isfile(file_path):
+            self.load()
+
+    @staticmethod
+    def get_key(date_: date, category: str) -> str:
+        return f"{date_.isoformat()}/{category}"
+
+    def get(self, date_: date, category: str) -> Union[Dict[str, Any], None]:
+        return self.counts.get(self.get_key(date_, category))
+
+    def set(self, date_: date, category: str, **values: Any) -> None:
+        key = self.get_key(date_, category)
+        self.counts[key] = self.counts.get(key, dict()) | values
+
+    def load(self) -> None:
+        if self.file_path is None:
+            raise ValueError("No file path provided.")
+        with open(self.file_path, "r") as f:
+            self.counts = json.load(f)
+
+    def save(self) -> None:
+        if self.file_path is None:
+            raise ValueError("No file path provided.")
+        with open(self.file_path, "w") as f:
+            json.dump(self.counts, f, indent=4)
+
+
+class CoveragePlanner:
+    """
+    Compare the result count of the archive with the news stored in the
+    database and scrape only what is missing.
+
+    For every (date, category) the first archive page is fetched, which
+    holds the result count and the number of pages. A combination with
+    fewer stored news is a gap. Filling a gap fetches its archive pages in
+    order and only the articles whose teaser is not stored yet, and stops
+    as soon as the missing number of news was found. Settled dates, whose
+    counts are known to match, are skipped without a request.
+
+    Stored news are counted by the rollups of the database, per day and per
+    first path segment of the link. For the category "all" this is the
+    total of the day.
+    """
+
+    def __init__(
+        self,
+        tagesschauDB: TagesschauDB,
+        categories: Union[list[str], None] = None,
+        scraper: Union[TagesschauScraper, None] = None,
+        archive_counts: Union[ArchiveCounts, None] = None,
+        max_workers: int = 8,
+        settle_days: int = 2,
+        today: Callable[[], date] = date.today,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        tagesschauDB : TagesschauDB
+            Database with the stored news. Scraped news are inserted.
+        categories : list[str], optional
+            News categories to check, by default ["all"].
+        scraper : TagesschauScraper, optional
+            Scraper used for fetching and extracting, by default a new one.
+        archive_counts : ArchiveCounts, optional
+            Result counts of earlier runs, by default kept in memory only.
+        max_workers : int, optional
+            Maximum number of concurrent article requests, by default 8.
+        settle_days : int, optional
+            Number of days after which the archive of a date is assumed to
+            be final, by default 2.
+        today : Callable, optional
+            Function returning the current date, by default date.today.
+        """
+        self.tagesschauDB = tagesschauDB
+        self.categories = categories if categories is not None else ["all"]
+        self.scraper = scraper if scraper is not None else TagesschauScraper()
+        self.archive_counts = (
+            archive_counts if archive_counts is not None else ArchiveCounts()
+        )
+        self.max_workers = max_workers
+        self.settle_days = settle_days
+        self.today = today
+        # Teasers of first pages fetched while planning, reused for filling
+        self._first_pages: Dict[Tuple[date, str], list[TeaserRecord]] = {}
+
+    def get_stored_count(self, date_: date, category: str) -> int:
+        next_date = date_ + timedelta(days=1)
+        rows = self.tagesschauDB.get_daily_counts(
+            date_.isoformat(),
+            next_date.isoformat(),
+            None if category == "all" else category,
+        )
+        return sum(row["count"] for row in rows)
+
+    def _is_settled(self, date_: date) -> bool:
+        return date_ <= self.today() - timedelta(days=self.settle_days)
+
+    def _fetch_page(
+        self, unit: WorkUnit
+    ) -> Union[Tuple[list[TeaserRecord], Dict[str, str], int], None]:
+        """
+        Teaser, archive information and number of pages of the archive page.
+        None, when the page failed and was recorded in the failure ledger.
+        """
+        scraped = self.scraper.scrape_archive_teaser(
+            unit.to_archive_filter().processed_params
+        )
+        if scraped is None:
+            return None
+        teasers, archive = scraped
+        return (
+            teasers,
+            archive.extract_info_from_archive(),
+            len(archive.extract_pagination()),
+        )
+
+    def check(self, date_: date, category: str) -> Union[Gap, None]:
+        """
+        Gap of the date and category, or None when it is complete.
+        """
+        stored = self.get_stored_count(date_, category)
+        known = self.archive_counts.get(date_, category)
+        if known is not None and self._is_settled(date_):
+            expected = known.get("found", known["expected"])
+            if stored >= expected:
+                return None
+            return Gap(date_, category, expected, stored, known["pages"])
+        fetched = self._fetch_page(WorkUnit(date_, category, 1))
+        if fetched is None:
+            logger.warning(
+                f"Skip checking {date_} {category}, its archive failed."
+            )
+            return None
+        teasers, archive_info, pages = fetched
+        expected = parse_num_teaser(archive_info.get("num_teaser"))
+        if expected is None:
+            expected = len(teasers)
+        if self._is_settled(date_):
+            self.archive_counts.set(
+                date_, category, expected=expected, pages=pages
+            )
+        if stored >= expected:
+            return None
+        self._first_pages[(date_, category)] = teasers
+        return Gap(date_, category, expected, stored, pages)
+
+    def plan(self, dates: list[date]) -> list[Gap]:
+        """
+        Gaps of all dates and categories.
+        """
+        gaps = []
+        for date_ in dates:
+            for category in self.categories:
+                gap = self.check(date_, category)
+                if gap is not None:
+                    gaps.append(gap)
+        logger.info(
+            f"Found {len(gaps)} gaps with"
+            f" {sum(gap.missing for gap in gaps)} missing news in"
+            f" {len(dates)} dates and {len(self.categories)} categories."
+        )
+        return gaps
+
+    def fill(self, gap: Gap) -> list[NewsRecord]:
+        """
+        Scrape and store the news missing in the gap.
+        """
+        records: list[NewsRecord] = []
+        # Only a pass without failed pages and articles checked the day
+        complete = True
+        for unit in gap.get_work_units():
+            teasers = self._first_pages.pop((gap.date_, gap.category), None)
+            if unit.page > 1 or teasers is None:
+                fetched = self._fetch_page(unit)
+                if fetched is None:
+                    complete = False
+                teasers = fetched[0] if fetched is not None else []
+            ids = {
+                helper.get_hash_from_string(teaser["link"]): teaser
+                for teaser in teasers
+            }
+            existing = self.tagesschauDB.get_existing_ids(ids)
+            new_teasers = [
+                teaser for id_, teaser in ids.items() if id_ not in existing
+            ]
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                articles = executor.map(
+                    lambda teaser: self.scraper.scrape_article(
+                        teaser["link"], teaser
+                    ),
+                    new_teasers,
+                )
+                page_records: list[NewsRecord] = [
+                    {
+                        "id": helper.get_hash_from_string(teaser["link"]),
+                        "teaser": teaser,
+                        "article": article,
+                    }
+                    for teaser, article in zip(new_teasers, articles)
+                    if not self.scraper.is_failed(teaser["link"])
+                ]
+            if len(page_records) < len(new_teasers):
+                complete = False
+            self.tagesschauDB.insert_many(
+                news_record_to_row(record) for record in page_records
+            )
+            records.extend(page_records)
+            if len(records) >= gap.missing:
+                break
+        else:
+            if complete and self._is_settled(gap.date_):
+                # All pages were checked. Teasers without valid data are
+                # listed but never stored, so the day is complete as is.
+                self.archive_counts.set(
+                    gap.date_,
+                    gap.category,
+                    found=self.get_stored_count(gap.date_, gap.category),
+                )
+        logger.info(
+            f"Filled {len(records)} of {gap.missing} missing news of"
+            f" {gap.date_} {gap.category}."
+        )
+        return records
+
+    def run(self, dates: list[date]) -> Dict[str, list[NewsRecord]]:
+        """
+        Find and fill all gaps of the dates.
+
+        Returns
+        -------
+        dict
+            Scraped teaser and article data of the missing news.
+        """
+        records: list[NewsRecord] = []
+        for gap in self.plan(dates):
+            records.extend(self.fill(gap))
+        if self.archive_counts.file_path is not None:
+            self.archive_counts.save()
+        return {"records": records}
@@ -0,0 +1,867 @@
+import logging
+import queue
+import sqlite3
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, Tuple, Union
+from tagesschauscraper import helper
+from tagesschauscraper.dedup import ContentStore
+from tagesschauscraper.querycache import QueryCache
+
+logger = logging.getLogger(__name__)
+
+NewsRecord = Dict[str, Any]
+Row = Dict[str, str]
+
+_SENTINEL = None
+# SQLite versions before 3.32 allow at most 999 parameters per query
+_MAX_PARAMS = 999
+# Columns the content hash of a row is computed from
+CONTENT_COLUMNS = ["date", "topline", "headline", "shorttext", "link", "tags"]
+# Columns added after the first release, with their types
+TRACKING_COLUMNS = {
+    "content_hash": "text",
+    "first_seen": "datetime",
+    "last_seen": "datetime",
+    "last_changed": "datetime",
+    "cluster_id": "text",
+}
+
+
+def news_record_to_row(record: NewsRecord) -> Row:
+    """
+    Map a scraped news record to the columns of the Tagesschau table.
+    """
+    teaser = record["teaser"]
+    article = record.get("article") or {}
+    row = {
+        "id": record["id"],
+        "date": teaser["date"],
+        "topline": teaser.get("topline", ""),
+        "headline": teaser.get("headline", ""),
+        "shorttext": teaser.get("shorttext", ""),
+        "link": teaser["link"],
+        "tags": article.get("tags", ""),
+    }
+    if record.get("cluster_id") is not None:
+        row["cluster_id"] = record["cluster_id"]
+    return row
+
+
+def get_rollup_buckets(
+    timestamp: str, link: str, tags: str
+) -> Tuple[Tuple[str, str], list[Tuple[str, str, str]]]:
+    """
+    Rollup buckets of a row: (day, category) and (day, category, tag) for
+    every tag.
+    """
+    day = (timestamp or "")[:10]
+    category = helper.get_category_from_link(link or "")
+    return (day, category), [
+        (day, category, tag) for tag in helper.split_tags(tags or "")
+    ]
+
+
+def get_row_hash(content: Row) -> str:
+    """
+    Hash of all content columns of a row.
+    """
+    return helper.get_hash_from_string(
+        "\x1f".join(str(content.get(column, "")) for column in CONTENT_COLUMNS)
+    )
+
+
+class TagesschauDB:
+    """
+    SQLite storage of scraped news.
+
+    Writes are synchronous by default. After start_writer() all inserts are
+    put on a bounded queue and written by a dedicated writer thread in
+    batched transactions, so that concurrent scrapers never share a
+    connection. Reads use one connection per thread.
+
+    Every row carries a hash of its content and first_seen, last_seen and
+    last_changed timestamps. By default an existing id is ignored on insert.
+    In upsert mode a row with changed content is updated and its previous
+    version is moved to the history table, while a row with unchanged
+    content only gets a new last_seen timestamp.
+
+    Rollup tables hold the number of news per day and category and per day,
+    category and tag. They are updated in the same transaction as the rows,
+    so aggregate queries read a few buckets instead of scanning all rows.
+    The category is the first path segment of the link.
+
+    With a query cache, the results of get_latest() and of the rollup
+    queries are cached and every write invalidates the cached results of
+    the days and categories it touched.
+    """
+
+    _DB_NAME = "news.db"
+    _TABLE_NAME = "Tagesschau"
+    _HISTORY_TABLE_NAME = "TagesschauHistory"
+    _COUNTS_TABLE_NAME = "TagesschauCounts"
+    _TAG_COUNTS_TABLE_NAME = "TagesschauTagCounts"
+
+    def __init__(
+        self,
+        db_name: Union[str, None] = None,
+        content_store: Union[ContentStore, None] = None,
+        timeout: float = 30.0,
+        batch_size: int = 500,
+        queue_size: int = 10000,
+        upsert: bool = False,
+        query_cache: Union[QueryCache, None] = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        db_name : str, optional
+            Path of the database file, by default "news.db".
+        content_store : ContentStore, optional
+            When provided, articles whose content was already stored under a
+            different link are skipped on insert.
+        timeout : float, optional
+            Seconds to wait for a lock held by another connection (busy
+            timeout), by default 30.
+        batch_size : int, optional
+            Maximum number of rows the writer thread commits at once, by
+            default 500.
+        queue_size : int, optional
+            Maximum number of rows waiting for the writer thread, by default
+            10000. Inserts block while the queue is full.
+        upsert : bool, optional
+            Update rows whose content changed instead of ignoring them, by
+            default False.
+        query_cache : QueryCache, optional
+            Cache for the results of the read API.
+        """
+        self.db_name = db_name if db_name is not None else self._DB_NAME
+        self.content_store = content_store
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.upsert = upsert
+        self.query_cache = query_cache
+        self._queue: "queue.Queue[Union[Row, None]]" = queue.Queue(
+            maxsize=queue_size
+        )
+        self._writer: Union[threading.Thread, None] = None
+        self._writer_error: Union[BaseException, None] = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._read_connections: list[sqlite3.Connection] = []
+        self.connect()
+
+    def _create_connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_name, timeout=self.timeout, check_same_thread=False
+        )
+        conn.execute(f"PRAGMA busy_timeout = {int(self.timeout * 1000)}")
+        conn.create_function(
+            "category",
+            1,
+            lambda link: helper.get_category_from_link(link or ""),
+            deterministic=True,
+        )
+        return conn
+
+    def connect(self) -> None:
+        self.conn = self._create_connection()
+        if not self._is_memory_db():
+            # Readers do not block the writer and vice versa
+            self.conn.execute("PRAGMA journal_mode = WAL")
+        self.c = self.conn.cursor()
+        logger.info(f"Connected to {self.db_name}")
+
+    def create_table(self) -> None:
+        query = f"""
+            CREATE TABLE IF NOT EXISTS  {TagesschauDB._TABLE_NAME} (
+            id text UNIQUE,
+            timestamp datetime,
+            topline text,
+            headline text,
+            shorttext text,
+            link text,
+            tags text,
+            content_hash text,
+            first_seen datetime,
+            last_seen datetime,
+            last_changed datetime,
+            cluster_id text)
+            """
+        history_query = f"""
+            CREATE TABLE IF NOT EXISTS {TagesschauDB._HISTORY_TABLE_NAME} (
+            id text,
+            changed_at datetime,
+            content_hash text,
+            timestamp datetime,
+            topline text,
+            headline text,
+            shorttext text,
+            link text,
+            tags text)
+            """
+        timestamp_index_query = f"""
+            CREATE INDEX IF NOT EXISTS {TagesschauDB._TABLE_NAME}Timestamp
+            ON {TagesschauDB._TABLE_NAME} (timestamp)
+            """
+        history_index_query = f"""
+            CREATE INDEX IF NOT EXISTS {TagesschauDB._HISTORY_TABLE_NAME}Id
+            ON {TagesschauDB._HISTORY_TABLE_NAME} (id)
+            """
+        # Keep the previous version of a row, whenever its content changes
+        trigger_query = f"""
+            CREATE TRIGGER IF NOT EXISTS {TagesschauDB._TABLE_NAME}Changed
+            AFTER UPDATE OF content_hash ON {TagesschauDB._TABLE_NAME}
+            WHEN old.content_hash IS NOT new.content_hash
+            BEGIN
+                INSERT INTO {TagesschauDB._HISTORY_TABLE_NAME}
+                VALUES (old.id, new.last_changed, old.content_hash,
+                        old.timestamp, old.topline, old.headline,
+                        old.shorttext, old.link, old.tags);
+            END
+            """
+        counts_query = f"""
+            CREATE TABLE IF NOT EXISTS {TagesschauDB._COUNTS_TABLE_NAME} (
+            day text,
+            category text,
+            count integer,
+            PRIMARY KEY (day, category))
+            """
+        tag_counts_query = f"""
+            CREATE TABLE IF NOT EXISTS {TagesschauDB._TAG_COUNTS_TABLE_NAME} (
+            day text,
+            category text,
+            tag text,
+            count integer,
+            PRIMARY KEY (day, category, tag))
+            """
+        with self._lock, self.conn:
+            has_rollups = bool(
+                self.conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = ?",
+                    (TagesschauDB._COUNTS_TABLE_NAME,),
+                ).fetchone()
+            )
+            self.conn.execute(query)
+            self._add_missing_columns()
+            self.conn.execute(timestamp_index_query)
+            self.conn.execute(history_query)
+            self.conn.execute(history_index_query)
+            self.conn.execute(trigger_query)
+            self.conn.execute(counts_query)
+            self.conn.execute(tag_counts_query)
+        if not has_rollups:
+            # Tables created by earlier versions have rows but no rollups
+            self.rebuild_rollups()
+
+    def _add_missing_columns(self) -> None:
+        # Tables created by earlier versions lack the tracking columns
+        existing_columns = {
+            row[1]
+            for row in self.conn.execute(
+                f"PRAGMA table_info({TagesschauDB._TABLE_NAME})"
+            )
+        }
+        for column, column_type in TRACKING_COLUMNS.items():
+            if column not in existing_columns:
+                self.conn.execute(
+                    f"ALTER TABLE {TagesschauDB._TABLE_NAME}"
+                    f" ADD COLUMN {column} {column_type}"
+                )
+
+    def drop_table(self) -> None:
+        with self._lock, self.conn:
+            for table_name in [
+                TagesschauDB._TABLE_NAME,
+                TagesschauDB._HISTORY_TABLE_NAME,
+                TagesschauDB._COUNTS_TABLE_NAME,
+                TagesschauDB._TAG_COUNTS_TABLE_NAME,
+            ]:
+                self.conn.execute(f"DROP TABLE IF EXISTS {table_name}")
+        self._clear_cache()
+
+    def _get_insert_query(self) -> str:
+        query = f"""
+            INSERT INTO {TagesschauDB._TABLE_NAME} (
+                id, timestamp, topline, headline, shorttext, link, tags,
+                content_hash, first_seen, last_seen, last_changed, cluster_id)
+            VALUES (:id, :date, :topline, :headline, :shorttext, :link, :tags,
+                    :content_hash, :now, :now, :now, :cluster_id)
+            """
+        if not self.upsert:
+            return query.replace("INSERT INTO", "INSERT OR IGNORE INTO", 1)
+        return query + """
+            ON CONFLICT(id) DO UPDATE SET
+                timestamp = excluded.timestamp,
+                topline = excluded.topline,
+                headline = excluded.headline,
+                shorttext = excluded.shorttext,
+                link = excluded.link,
+                tags = excluded.tags,
+                last_seen = excluded.last_seen,
+                last_changed = CASE
+                    WHEN content_hash IS excluded.content_hash
+                    THEN last_changed
+                    ELSE excluded.last_changed
+                END,
+                content_hash = excluded.content_hash,
+                cluster_id = COALESCE(excluded.cluster_id, cluster_id)
+            """
+
+    def _is_duplicate(self, content: Row) -> bool:
+        return self.content_store is not None and (
+            self.content_store.is_duplicate(content["link"])
+        )
+
+    def insert(self, content: Row) -> None:
+        """
+        Insert a row. With a running writer thread the row is queued and
+        written asynchronously, see flush().
+        """
+        if self._is_duplicate(content):
+            return
+        if self._writer is not None:
+            self._raise_writer_error()
+            self._queue.put(content)
+        else:
+            self._write_batch(self.conn, [content])
+
+    def insert_many(self, contents: Iterable[Row]) -> None:
+        if self._writer is not None:
+            for content in contents:
+                self.insert(content)
+        else:
+            self._write_batch(
+                self.conn,
+                [c for c in contents if not self._is_duplicate(c)],
+            )
+
+    def insert_record(self, record: NewsRecord) -> None:
+        self.insert(news_record_to_row(record))
+
+    @staticmethod
+    def _get_params(batch: list[Row]) -> list[Dict[str, Any]]:
+        now = datetime.now().isoformat(sep=" ", timespec="seconds")
+        params = []
+        for content in batch:
+            param = {"cluster_id": None} | content | {"now": now}
+            # The hash may be computed beforehand, e.g. by import workers
+            if "content_hash" not in content:
+                param["content_hash"] = get_row_hash(content)
+            params.append(param)
+        return params
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: list[Row]) -> int:
+        """
+        Write the rows in one transaction.
+
+        Returns
+        -------
+        int
+            Number of inserted or changed rows. Rows whose content is
+            unchanged only get a new last_seen and are not counted.
+        """
+        params = self._get_params(batch)
+        content_hashes: Dict[str, Union[str, None]] = dict()
+        with self._lock, conn:
+            previous_rows = self._get_rollup_rows(
+                conn, [content["id"] for content in batch], content_hashes
+            )
+            cursor = conn.executemany(self._get_insert_query(), params)
+            self._update_rollups(conn, batch, previous_rows)
+        self._invalidate_cache(batch, previous_rows)
+        if not self.upsert:
+            return cursor.rowcount
+        changed = 0
+        for param in params:
+            id_ = param["id"]
+            is_new = id_ not in content_hashes
+            if is_new or content_hashes[id_] != param["content_hash"]:
+                changed += 1
+            content_hashes[id_] = param["content_hash"]
+        return changed
+
+    def bulk_load(self, rows: Iterable[Row], batch_size: int = 50000) -> int:
+        """
+        Insert a large number of rows, e.g. from JSON dumps.
+
+        Rows are written in transactions of batch_size rows without
+        durable syncs. The timestamp index is dropped during the load and
+        built once at the end. Rollups are updated per batch, so a load
+        into a large database does not rescan its rows.
+
+        Returns
+        -------
+        int
+            Number of inserted or changed rows.
+
+        Raises
+        ------
+        ValueError
+            When the writer thread is running.
+        """
+        if self._writer is not None:
+            raise ValueError("Stop the writer thread before a bulk load.")
+        self.create_table()
+        loaded = 0
+        synchronous = self.conn.execute("PRAGMA synchronous").fetchone()[0]
+        with self._lock:
+            self.conn.execute(
+                f"DROP INDEX IF EXISTS {TagesschauDB._TABLE_NAME}Timestamp"
+            )
+            self.conn.execute("PRAGMA synchronous = OFF")
+        try:
+            batch: list[Row] = []
+            for row in rows:
+                if not self._is_duplicate(row):
+                    batch.append(row)
+                if len(batch) >= batch_size:
+                    loaded += self._write_batch(self.conn, batch)
+                    batch = []
+            loaded += self._write_batch(self.conn, batch)
+        finally:
+            with self._lock:
+                self.conn.execute(f"PRAGMA synchronous = {synchronous}")
+            # Restores the timestamp index
+            self.create_table()
+        logger.info(f"Bulk loaded {loaded} rows into {self.db_name}")
+        return loaded
+
+    def _invalidate_cache(
+        self,
+        batch: list[Row],
+        previous_rows: Dict[str, Tuple[str, str, str]],
+    ) -> None:
+        if self.query_cache is None:
+            return
+        buckets = set()
+        for content in batch:
+            previous_row = previous_rows.get(content["id"])
+            if previous_row is not None:
+                # Existing rows are only changed in upsert mode
+                if not self.upsert:
+                    continue
+                buckets.add(get_rollup_buckets(*previous_row)[0])
+            buckets.add(
+                get_rollup_buckets(content["date"], content["link"], "")[0]
+            )
+        self.query_cache.invalidate(buckets)
+
+    def _clear_cache(self) -> None:
+        if self.query_cache is not None:
+            self.query_cache.clear()
+
+    def _get_rollup_rows(
+        self,
+        conn: sqlite3.Connection,
+        ids: list[str],
+        content_hashes: Union[Dict[str, Union[str, None]], None] = None,
+    ) -> Dict[str, Tuple[str, str, str]]:
+        """
+        Rollup columns of the stored rows. Their content hashes are added to
+        content_hashes, if given.
+        """
+        rows = dict()
+        for start in range(0, len(ids), _MAX_PARAMS):
+            end = start + _MAX_PARAMS
+            chunk = ids[start:end]
+            query = f"""
+                SELECT id, timestamp, link, tags, content_hash
+                FROM {TagesschauDB._TABLE_NAME}
+                WHERE id IN ({",".join("?" * len(chunk))})
+                """
+            for id_, timestamp, link, tags, content_hash in conn.execute(
+                query, chunk
+            ):
+                rows[id_] = (timestamp, link, tags)
+                if content_hashes is not None:
+                    content_hashes[id_] = content_hash
+        return rows
+
+    def _update_rollups(
+        self,
+        conn: sqlite3.Connection,
+        batch: list[Row],
+        previous_rows: Dict[str, Tuple[str, str, str]],
+    ) -> None:
+        counts: Counter[Tuple[str, str]] = Counter()
+        tag_counts: Counter[Tuple[str, str, str]] = Counter()
+
+        def add(row: Tuple[str, str, str], sign: int) -> None:
+            bucket, tag_buckets = get_rollup_buckets(*row)
+            counts[bucket] += sign
+            for tag_bucket in tag_buckets:
+                tag_counts[tag_bucket] += sign
+
+        current_rows = dict(previous_rows)
+        for content in batch:
+            row = (content["date"], content["link"], content["tags"])
+            previous_row = current_rows.get(content["id"])
+            if previous_row is not None:
+                # Existing rows are only changed in upsert mode
+                if not self.upsert or previous_row == row:
+                    continue
+                add(previous_row, -1)
+            add(row, 1)
+            current_rows[content["id"]] = row
+        self._add_to_rollups(conn, counts, tag_counts)
+
+    @staticmethod
+    def _add_to_rollups(
+        conn: sqlite3.Connection,
+        counts: "Counter[Tuple[str, str]]",
+        tag_counts: "Counter[Tuple[str, str, str]]",
+    ) -> None:
+        conn.executemany(
+            f"""
+            INSERT INTO {TagesschauDB._COUNTS_TABLE_NAME} VALUES (?, ?, ?)
+            ON CONFLICT(day, category) DO UPDATE
+            SET count = count + excluded.count
+            """,
+            [(*bucket, n) for bucket, n in counts.items() if n],
+        )
+        conn.executemany(
+            f"""
+            INSERT INTO {TagesschauDB._TAG_COUNTS_TABLE_NAME}
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(day, category, tag) DO UPDATE
+            SET count = count + excluded.count
+            """,
+            [(*bucket, n) for bucket, n in tag_counts.items() if n],
+        )
+
+    def rebuild_rollups(self) -> None:
+        """
+        Recompute the rollup tables from all rows, e.g. after a backfill by
+        other means than insert().
+        """
+        counts: Counter[Tuple[str, str]] = Counter()
+        tag_counts: Counter[Tuple[str, str, str]] = Counter()
+        with self._lock, self.conn:
+            for table_name in [
+                TagesschauDB._COUNTS_TABLE_NAME,
+                TagesschauDB._TAG_COUNTS_TABLE_NAME,
+            ]:
+                self.conn.execute(f"DELETE FROM {table_name}")
+            for row in self.conn.execute(
+                f"SELECT timestamp, link, tags FROM {TagesschauDB._TABLE_NAME}"
+            ):
+                bucket, tag_buckets = get_rollup_buckets(*row)
+                counts[bucket] += 1
+                tag_counts.update(tag_buckets)
+            self._add_to_rollups(self.conn, counts, tag_counts)
+        self._clear_cache()
+
+    def set_cluster_ids(self, cluster_ids: Dict[str, str]) -> None:
+        """
+        Store the near-duplicate cluster of every id, see
+        nearduplicates.NearDuplicateDetector.
+        """
+        with self._lock, self.conn:
+            self.conn.executemany(
+                f"UPDATE {TagesschauDB._TABLE_NAME}"
+                " SET cluster_id = ? WHERE id = ?",
+                [(cluster_id, id_) for id_, cluster_id in cluster_ids.items()],
+            )
+        self._clear_cache()
+
+    def start_writer(self) -> None:
+        """
+        Start the writer thread. All following inserts are queued.
+        """
+        if self._writer is not None:
+            return
+        self._writer_error = None
+        self._writer = threading.Thread(
+            target=self._write_from_queue, name="db-writer", daemon=True
+        )
+        self._writer.start()
+
+    def _is_memory_db(self) -> bool:
+        # Every connection to ":memory:" opens a new database, so all threads
+        # share the main connection, guarded by the lock.
+        return self.db_name == ":memory:"
+
+    def _write_from_queue(self) -> None:
+        if self._is_memory_db():
+            conn = self.conn
+        else:
+            conn = self._create_connection()
+        try:
+            done = False
+            while not done:
+                batch = []
+                item = self._queue.get()
+                dequeued = 1
+                try:
+                    while True:
+                        if item is _SENTINEL:
+                            done = True
+                            break
+                        batch.append(item)
+                        if len(batch) >= self.batch_size:
+                            break
+                        try:
+                            item = self._queue.get_nowait()
+                        except queue.Empty:
+                            break
+                        dequeued += 1
+                    if batch:
+                        self._write_batch(conn, batch)
+                except Exception as e:
+                    # Any error, not only of sqlite, must not end the thread,
+                    # flush() would wait for the queue forever
+                    logger.exception("Writing batch failed.")
+                    self._writer_error = e
+                finally:
+                    for _ in range(dequeued):
+                        self._queue.task_done()
+        finally:
+            if conn is not self.conn:
+                conn.close()
+
+    def _raise_writer_error(self) -> None:
+        if self._writer_error is not None:
+            error, self._writer_error = self._writer_error, None
+            raise error
+
+    def flush(self) -> None:
+        """
+        Wait until all queued rows are written.
+
+        Raises
+        ------
+        Exception
+            When writing a batch failed since the last flush, e.g.
+            sqlite3.Error.
+        """
+        if self._writer is not None:
+            self._queue.join()
+        self._raise_writer_error()
+
+    def stop_writer(self) -> None:
+        """
+        Write all queued rows and stop the writer thread.
+        """
+        if self._writer is None:
+            return
+        self._queue.put(_SENTINEL)
+        self._writer.join()
+        self._writer = None
+        self._raise_writer_error()
+
+    def get_read_connection(self) -> sqlite3.Connection:
+        """
+        Connection for queries, one per thread.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self._is_memory_db():
+                conn = self.conn
+            else:
+                conn = self._create_connection()
+                with self._lock:
+                    self._read_connections.append(conn)
+            self._local.conn = conn
+        return conn
+
+    def query(self, query: str, params: Any = ()) -> list[Dict[str, Any]]:
+        """
+        Run a read query.
+
+        Returns
+        -------
+        list[dict]
+            Rows as dictionaries from column name to value.
+        """
+        conn = self.get_read_connection()
+        if conn is self.conn:
+            with self._lock:
+                cursor = conn.execute(query, params)
+                rows = cursor.fetchall()
+        else:
+            cursor = conn.execute(query, params)
+            rows = cursor.fetchall()
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in rows]
+
+    def get_existing_ids(self, ids: Iterable[str]) -> set[str]:
+        """
+        Those of the ids that are stored.
+        """
+        ids = list(ids)
+        existing: set[str] = set()
+        for start in range(0, len(ids), _MAX_PARAMS):
+            end = start + _MAX_PARAMS
+            chunk = ids[start:end]
+            rows = self.query(
+                f"SELECT id FROM {TagesschauDB._TABLE_NAME}"
+                f" WHERE id IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            existing.update(row["id"] for row in rows)
+        return existing
+
+    def _cached_query(
+        self,
+        query: str,
+        params: list[Any],
+        start: Union[str, None],
+        end: Union[str, None],
+        category: Union[str, None],
+    ) -> list[Dict[str, Any]]:
+        if self.query_cache is None:
+            return self.query(query, params)
+        rows: list[Dict[str, Any]] = self.query_cache.get(
+            (query, tuple(params)),
+            lambda: self.query(query, params),
+            start,
+            end,
+            category,
+        )
+        # Callers may modify the rows, the cached ones stay untouched
+        return [dict(row) for row in rows]
+
+    def get_latest(
+        self,
+        limit: int = 10,
+        category: Union[str, None] = None,
+        start: Union[str, None] = None,
+        end: Union[str, None] = None,
+    ) -> list[Dict[str, Any]]:
+        """
+        Latest news, newest first.
+
+        Parameters
+        ----------
+        limit : int, optional
+            Number of news, by default 10.
+        category : str, optional
+            Only news of this category.
+        start : str, optional
+            First day (inclusive), YYYY-MM-DD.
+        end : str, optional
+            Last day (exclusive), YYYY-MM-DD.
+        """
+        conditions = ["1"]
+        params: list[Any] = []
+        for condition, value in [
+            ("timestamp >= ?", start),
+            ("timestamp < ?", end),
+            ("category(link) = ?", category),
+        ]:
+            if value is not None:
+                conditions.append(condition)
+                params.append(value)
+        query = f"""
+            SELECT * FROM {TagesschauDB._TABLE_NAME}
+            WHERE {" AND ".join(conditions)}
+            ORDER BY timestamp DESC LIMIT ?
+            """
+        params.append(limit)
+        return self._cached_query(query, params, start, end, category)
+
+    def _query_rollup(
+        self,
+        columns: list[str],
+        table_name: str,
+        start: Union[str, None],
+        end: Union[str, None],
+        category: Union[str, None],
+        limit: Union[int, None] = None,
+    ) -> list[Dict[str, Any]]:
+        conditions = ["1"]
+        params: list[Any] = []
+        for condition, value in [
+            ("day >= ?", start),
+            ("day < ?", end),
+            ("category = ?", category),
+        ]:
+            if value is not None:
+                conditions.append(condition)
+                params.append(value)
+        query = f"""
+            SELECT {", ".join(columns)}, SUM(count) AS count FROM {table_name}
+            WHERE {" AND ".join(conditions)}
+            GROUP BY {", ".join(columns)} HAVING SUM(count) > 0
+            ORDER BY {"count DESC, tag" if columns == ["tag"] else "1, 2"}
+            """
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return self._cached_query(query, params, start, end, category)
+
+    def get_daily_counts(
+        self,
+        start: Union[str, None] = None,
+        end: Union[str, None] = None,
+        category: Union[str, None] = None,
+    ) -> list[Dict[str, Any]]:
+        """
+        Number of news per day and category, read from the rollups.
+
+        Parameters
+        ----------
+        start : str, optional
+            First day (inclusive), YYYY-MM-DD.
+        end : str, optional
+            Last day (exclusive), YYYY-MM-DD.
+        category : str, optional
+            Only count news of this category.
+        """
+        return self._query_rollup(
+            ["day", "category"],
+            TagesschauDB._COUNTS_TABLE_NAME,
+            start,
+            end,
+            category,
+        )
+
+    def get_category_counts(
+        self,
+        start: Union[str, None] = None,
+        end: Union[str, None] = None,
+    ) -> list[Dict[str, Any]]:
+        """
+        Number of news per category in a date range, read from the rollups.
+        """
+        return self._query_rollup(
+            ["category"], TagesschauDB._COUNTS_TABLE_NAME, start, end, None
+        )
+
+    def get_tag_counts(
+        self,
+        start: Union[str, None] = None,
+        end: Union[str, None] = None,
+        category: Union[str, None] = None,
+        limit: Union[int, None] = None,
+    ) -> list[Dict[str, Any]]:
+        """
+        Most frequent tags in a date range, read from the rollups.
+        """
+        return self._query_rollup(
+            ["tag"],
+            TagesschauDB._TAG_COUNTS_TABLE_NAME,
+            start,
+            end,
+            category,
+            limit,
+        )
+
+    def close(self) -> None:
+        """
+        Stop the writer thread and close all connections.
+        """
+        self.stop_writer()
+        for conn in self._read_connections:
+            conn.close()
+        self._read_connections = []
+        self._local = threading.local()
+        self.conn.close()
+
+    def __enter__(self) -> "TagesschauDB":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
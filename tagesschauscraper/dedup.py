@@ -0,0 +1,174 @@
+"""
+Content-addressed store for article extraction results.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Mapping, Union
+
+try:
+    import xxhash
+except ImportError:  # pragma: no cover
+    xxhash = None
+
+ArticleRecord = Dict[str, str]
+ContentId = str
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize article text for hashing by lowercasing and collapsing all
+    whitespace.
+
+    Examples
+    --------
+    normalize_text("Die  Nord Stream\\n2 AG")
+    >>> die nord stream 2 ag
+    """
+    return " ".join(text.lower().split())
+
+
+def get_content_hash(text: str) -> ContentId:
+    """
+    Fast non-cryptographic 64 bit hash of the normalized text.
+
+    xxhash is used when installed, otherwise an 8 byte BLAKE2b digest.
+    """
+    data = normalize_text(text).encode()
+    if xxhash is not None:
+        return str(xxhash.xxh3_64_hexdigest(data))
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+class ContentStore:
+    """
+    Store article extraction results keyed by the hash of the article body,
+    together with an index from article link to content.
+
+    The first link under which a content was stored is the canonical link of
+    that content. Any other link with the same content is a duplicate.
+    Articles without body text, e.g. videos and liveblogs, are keyed by their
+    link instead, so they are never duplicates of each other.
+
+    The ETag and Last-Modified header of every link are kept, so that a
+    stored article is revalidated with a conditional request before it is
+    reused.
+    """
+
+    def __init__(self, file_path: Union[str, None] = None) -> None:
+        """
+        Parameters
+        ----------
+        file_path : str, optional
+            JSON file the store is loaded from and saved to. Without a file
+            path the store is kept in memory only.
+        """
+        self.file_path = file_path
+        self.contents: Dict[ContentId, ArticleRecord] = dict()
+        self.canonical_links: Dict[ContentId, str] = dict()
+        self.link_index: Dict[str, ContentId] = dict()
+        self.validators: Dict[str, Dict[str, str]] = dict()
+        self._lock = threading.Lock()
+        if file_path is not None and os.path.isfile(file_path):
+            self.load()
+
+    def put(
+        self,
+        link: str,
+        text: str,
+        article: ArticleRecord,
+        headers: Union[Mapping[str, str], None] = None,
+    ) -> ContentId:
+        """
+        Store the extraction result of an article.
+
+        Parameters
+        ----------
+        link : str
+            Article link.
+        text : str
+            Article body used for content addressing.
+        article : dict
+            Extraction result of the article.
+        headers : Mapping, optional
+            Response headers of the article, whose ETag and Last-Modified
+            are kept for revalidation.
+
+        Returns
+        -------
+        str
+            Content id of the article.
+        """
+        if normalize_text(text):
+            content_id = get_content_hash(text)
+        else:
+            content_id = "link:" + link
+        with self._lock:
+            if content_id not in self.contents:
+                self.contents[content_id] = article
+                self.canonical_links[content_id] = link
+            self.link_index[link] = content_id
+            self.validators[link] = {
+                name: headers[name]
+                for name in ["ETag", "Last-Modified"]
+                if headers is not None and headers.get(name)
+            }
+        return content_id
+
+    def get_request_headers(self, link: str) -> Dict[str, str]:
+        """
+        Headers for a conditional request of a stored article. Empty, when
+        the article is not stored or has no validators.
+        """
+        validators = self.validators.get(link, {})
+        headers = {}
+        if validators.get("ETag"):
+            headers["If-None-Match"] = validators["ETag"]
+        if validators.get("Last-Modified"):
+            headers["If-Modified-Since"] = validators["Last-Modified"]
+        return headers
+
+    def get_content_id(self, link: str) -> Union[ContentId, None]:
+        return self.link_index.get(link)
+
+    def get_by_link(self, link: str) -> Union[ArticleRecord, None]:
+        content_id = self.link_index.get(link)
+        if content_id is None:
+            return None
+        return self.contents[content_id]
+
+    def is_duplicate(self, link: str) -> bool:
+        """
+        Check if the content of the link was already stored under a different
+        link.
+        """
+        content_id = self.link_index.get(link)
+        if content_id is None:
+            return False
+        return self.canonical_links[content_id] != link
+
+    def load(self) -> None:
+        if self.file_path is None:
+            raise ValueError("No file path provided.")
+        with open(self.file_path, "r") as f:
+            data = json.load(f)
+        self.contents = data["contents"]
+        self.canonical_links = data["canonical_links"]
+        self.link_index = data["link_index"]
+        self.validators = data.get("validators", {})
+
+    def save(self) -> None:
+        if self.file_path is None:
+            raise ValueError("No file path provided.")
+        with open(self.file_path, "w") as f:
+            json.dump(
+                {
+                    "contents": self.contents,
+                    "canonical_links": self.canonical_links,
+                    "link_index": self.link_index,
+                    "validators": self.validators,
+                },
+                f,
+            )
@@ -0,0 +1,173 @@
+"""
+Declarative extraction specs, evaluated in a single walk over the HTML tree.
+"""
+
+import hashlib
+from typing import Any, Dict, NamedTuple, Union
+from bs4 import BeautifulSoup
+from bs4.element import Tag
+
+Record = Dict[str, Any]
+
+
+class Field(NamedTuple):
+    """
+    Selector and value of one field of an extraction spec.
+
+    An element matches, when it has all classes of `class_`, the tag name
+    `tag` and an ancestor with the class `within`. Selectors left as None
+    match any element. The value is the stripped text of the element, or the
+    attribute `attr`. A single field takes the first match in document order,
+    a multiple field collects the values of all matches in a list.
+    """
+
+    name: str
+    class_: Union[str, None] = None
+    tag: Union[str, None] = None
+    within: Union[str, None] = None
+    attr: Union[str, None] = None
+    multiple: bool = False
+    separator: str = " "
+
+
+class _CompiledField(NamedTuple):
+    field: Field
+    classes: frozenset[str]
+
+
+class ExtractionSpec:
+    """
+    Set of fields extracted from a page or, with a root, from every element
+    matching the root.
+
+    The spec is compiled once into lookup tables from class name and tag name
+    to the fields that may match, so every element of the tree is visited
+    once and only checked against the fields it can possibly match.
+    """
+
+    def __init__(
+        self,
+        fields: list[Field],
+        root: Union[str, None] = None,
+        revision: int = 1,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        fields : list[Field]
+            Fields to extract.
+        root : str, optional
+            Space separated classes of the elements, that each hold one
+            record, e.g. the teasers of an archive page.
+        revision : int, optional
+            Increase, when the processing of the extracted records changes,
+            by default 1. Changes of the fields change the version anyway.
+
+        Raises
+        ------
+        ValueError
+            When a field has neither a class nor a tag selector.
+        """
+        self.fields = fields
+        self.root = root
+        # Identifies the output of the spec, e.g. for caching extractions
+        digest = hashlib.sha1(repr((fields, root)).encode()).hexdigest()
+        self.version = f"{revision}.{digest[:12]}"
+        self._root_classes = frozenset(root.split()) if root else None
+        self._by_class: Dict[str, list[_CompiledField]] = dict()
+        self._by_tag: Dict[str, list[_CompiledField]] = dict()
+        self._scopes = frozenset(
+            field.within for field in fields if field.within is not None
+        )
+        for field in fields:
+            if field.class_:
+                classes = field.class_.split()
+                self._by_class.setdefault(classes[0], []).append(
+                    _CompiledField(field, frozenset(classes))
+                )
+            elif field.tag:
+                self._by_tag.setdefault(field.tag, []).append(
+                    _CompiledField(field, frozenset())
+                )
+            else:
+                raise ValueError(f"Field {field.name} has no selector.")
+
+    def extract(self, soup: Union[BeautifulSoup, Tag]) -> Record:
+        """
+        Extract all fields from the descendants of the element, ignoring the
+        root of the spec.
+        """
+        record: Record = dict()
+        self._walk(soup, record, None, frozenset())
+        return record
+
+    def extract_all(self, soup: Union[BeautifulSoup, Tag]) -> list[Record]:
+        """
+        Extract one record per root element, in document order.
+        """
+        if self._root_classes is None:
+            raise ValueError("The spec has no root.")
+        records: list[Record] = []
+        self._walk(soup, dict(), records, frozenset())
+        return records
+
+    def _walk(
+        self,
+        element: Tag,
+        record: Record,
+        records: Union[list[Record], None],
+        scopes: frozenset[str],
+    ) -> None:
+        for child in element.children:
+            if not isinstance(child, Tag):
+                continue
+            classes = child.get("class") or []
+            if isinstance(classes, str):
+                classes = classes.split()
+            child_record = record
+            roots = self._root_classes
+            is_root = roots is not None and roots.issubset(classes)
+            if records is not None and is_root:
+                child_record = dict()
+                records.append(child_record)
+            for class_name in classes:
+                for compiled in self._by_class.get(class_name, ()):
+                    self._match(child, classes, compiled, child_record, scopes)
+            for compiled in self._by_tag.get(child.name, ()):
+                self._match(child, classes, compiled, child_record, scopes)
+            child_scopes = scopes
+            if self._scopes and classes:
+                entered = self._scopes.intersection(classes)
+                if entered:
+                    child_scopes = scopes.union(entered)
+            self._walk(child, child_record, records, child_scopes)
+
+    @staticmethod
+    def _match(
+        element: Tag,
+        classes: list[str],
+        compiled: _CompiledField,
+        record: Record,
+        scopes: frozenset[str],
+    ) -> None:
+        field = compiled.field
+        if field.name in record and not field.multiple:
+            return
+        if field.tag is not None and element.name != field.tag:
+            return
+        if field.within is not None and field.within not in scopes:
+            return
+        if len(compiled.classes) > 1 and not compiled.classes.issubset(
+            classes
+        ):
+            return
+        if field.attr is not None:
+            value = element.get(field.attr)
+            if not isinstance(value, str):
+                return
+        else:
+            value = element.get_text(strip=True, separator=field.separator)
+        if field.multiple:
+            record.setdefault(field.name, []).append(value)
+        else:
+            record[field.name] = value
@@ -0,0 +1,226 @@
+"""
+Ledger of failed fetches and parses, and bulk retry of the failures.
+"""
+
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Union
+from urllib.parse import parse_qsl, urlsplit
+import requests
+
+if TYPE_CHECKING:
+    from tagesschauscraper.tagesschau import NewsRecord, TagesschauScraper
+
+logger = logging.getLogger(__name__)
+
+Failure = Dict[str, Any]
+FAILURE_KINDS = ["pagination", "archive", "article"]
+
+
+def get_status_code(error: BaseException) -> Union[int, None]:
+    """
+    HTTP status code of the response the error was raised for, if any.
+    """
+    status_code = getattr(error, "status_code", None)
+    if isinstance(status_code, int):
+        return status_code
+    response = getattr(error, "response", None)
+    if isinstance(response, requests.Response):
+        return response.status_code
+    return None
+
+
+class FailureLedger:
+    """
+    Record of all URLs whose fetch or parse failed, keyed by URL.
+
+    Each entry holds the kind of page ("pagination" for the first page of an
+    archive, "archive" or "article"), the status
+    code, the error class and message, the number of failed attempts and the
+    time of the first and last failure. Article entries also keep the teaser
+    data, so that a retry can produce complete news records. An entry is
+    removed as soon as the URL is scraped successfully.
+    """
+
+    def __init__(self, file_path: Union[str, None] = None) -> None:
+        """
+        Parameters
+        ----------
+        file_path : str, optional
+            JSON file the ledger is loaded from and saved to. Without a file
+            path the ledger is kept in memory only.
+        """
+        self.file_path = file_path
+        self.failures: Dict[str, Failure] = dict()
+        self._lock = threading.Lock()
+        if file_path is not None and os.path.isfile(file_path):
+            self.load()
+
+    def record(
+        self,
+        url: str,
+        error: BaseException,
+        kind: str = "article",
+        teaser: Union[Dict[str, str], None] = None,
+    ) -> Failure:
+        """
+        Record a failed attempt of the URL.
+
+        Returns
+        -------
+        dict
+            Updated ledger entry.
+        """
+        if kind not in FAILURE_KINDS:
+            raise ValueError(f"Kind must be one of {FAILURE_KINDS}.")
+        now = datetime.now().isoformat(sep=" ", timespec="seconds")
+        with self._lock:
+            failure = self.failures.get(url, {"attempts": 0, "first": now})
+            failure.update(
+                {
+                    "url": url,
+                    "kind": kind,
+                    "status": get_status_code(error),
+                    "error": type(error).__name__,
+                    "message": str(error),
+                    "attempts": failure["attempts"] + 1,
+                    "last": now,
+                }
+            )
+            if teaser is not None:
+                failure["teaser"] = teaser
+            self.failures[url] = failure
+        logger.warning(
+            f"Failed to scrape {kind} {url} (attempt {failure['attempts']}):"
+            f" {failure['error']} {failure['message']}"
+        )
+        return failure
+
+    def resolve(self, url: str) -> None:
+        """
+        Remove the URL after it was scraped successfully.
+        """
+        with self._lock:
+            self.failures.pop(url, None)
+
+    def get_failures(
+        self,
+        kind: Union[str, None] = None,
+        max_attempts: Union[int, None] = None,
+    ) -> list[Failure]:
+        """
+        Failures filtered by kind and by attempts below max_attempts.
+        """
+        with self._lock:
+            failures = list(self.failures.values())
+
+        def is_selected(failure: Failure) -> bool:
+            if kind is not None and failure["kind"] != kind:
+                return False
+            return max_attempts is None or failure["attempts"] < max_attempts
+
+        return [failure for failure in failures if is_selected(failure)]
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.failures
+
+    def __len__(self) -> int:
+        return len(self.failures)
+
+    def load(self) -> None:
+        if self.file_path is None:
+            raise ValueError("No file path provided.")
+        with open(self.file_path, "r") as f:
+            self.failures = json.load(f)
+
+    def save(self) -> None:
+        if self.file_path is None:
+            raise ValueError("No file path provided.")
+        with self._lock:
+            failures = dict(self.failures)
+        with open(self.file_path, "w") as f:
+            json.dump(failures, f, indent=4, ensure_ascii=False)
+
+
+def retry_pagination(
+    scraper: "TagesschauScraper", url: str
+) -> list["NewsRecord"]:
+    """
+    Scrape all pages of the archive whose pagination failed.
+    """
+    # Imported here, since the tagesschau module imports this module
+    from tagesschauscraper.tagesschau import ARCHIVE_URL, ScraperConfig
+
+    params = dict(parse_qsl(urlsplit(url).query, keep_blank_values=True))
+    config = ScraperConfig(
+        [],
+        session=scraper.session,
+        parse_cache=scraper.parse_cache,
+        bounded_memory=scraper.bounded_memory,
+        failure_ledger=scraper.failure_ledger,
+    )
+    records: list["NewsRecord"] = []
+    for page_params in config.extend_request_params_with_pagination(params):
+        records.extend(scraper.scrape_archive_page(ARCHIVE_URL, page_params))
+    return records
+
+
+def retry_failures(
+    scraper: "TagesschauScraper",
+    max_workers: int = 4,
+    max_attempts: Union[int, None] = None,
+) -> Dict[str, list["NewsRecord"]]:
+    """
+    Scrape all URLs in the failure ledger of the scraper again.
+
+    Archives whose pagination failed are retried with all their pages,
+    archive pages with all their articles, articles with the teaser data
+    stored on failure. Articles recorded without teaser data are scraped
+    again, but produce no news record. URLs that fail again stay in the
+    ledger with an increased attempt count.
+
+    Parameters
+    ----------
+    scraper : TagesschauScraper
+        Scraper with a failure ledger.
+    max_workers : int, optional
+        Number of URLs retried concurrently, by default 4.
+    max_attempts : int, optional
+        Skip URLs which already failed this many times.
+
+    Returns
+    -------
+    dict
+        News records of all URLs scraped successfully.
+    """
+    ledger = scraper.failure_ledger
+    if ledger is None:
+        raise ValueError("The scraper has no failure ledger.")
+    failures = ledger.get_failures(max_attempts=max_attempts)
+    logger.info(f"Retry {len(failures)} failures.")
+
+    def retry(failure: Failure) -> list["NewsRecord"]:
+        if failure["kind"] == "pagination":
+            return retry_pagination(scraper, failure["url"])
+        if failure["kind"] == "archive":
+            return scraper.scrape_archive_page(failure["url"])
+        teaser = failure.get("teaser")
+        if teaser is None:
+            scraper.scrape_article(failure["url"])
+            return []
+        record = scraper._merge_teaser_and_article_tags(teaser)
+        return [] if scraper.is_failed(failure["url"]) else [record]
+
+    records: list["NewsRecord"] = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for result in executor.map(retry, failures):
+            records.extend(result)
+    logger.info(
+        f"Retried {len(failures)} failures, {len(ledger)} remain in the"
+        " ledger."
+    )
+    return {"records": records}
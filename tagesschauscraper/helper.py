@@ -37,6 +37,35 @@ def get_hash_from_string(string: str) -> str:
     return result.hexdigest()
 
 
+def get_category_from_link(link: str) -> str:
+    """
+    News category from the first segment of the link path.
+
+    Examples
+    --------
+    get_category_from_link("https://www.tagesschau.de/inland/abc-101.html")
+    >>> inland
+    """
+    # Split by hand, urlparse dominates the time of bulk rollup updates
+    path = link.partition("#")[0].partition("?")[0]
+    scheme, separator, rest = path.partition("://")
+    if separator and "/" not in scheme:
+        path = rest.partition("/")[2]
+    elif path.startswith("//"):
+        path = path[2:].partition("/")[2]
+    path = path.strip("/")
+    if "/" not in path:
+        return ""
+    return path.split("/", 1)[0]
+
+
+def split_tags(tags: str) -> list[str]:
+    """
+    Split the comma joined tags of an article record.
+    """
+    return [tag.strip() for tag in tags.split(",") if tag.strip()]
+
+
 class DateDirectoryTreeCreator:
     """
     Create a directory tree and file name based on a date object.
@@ -0,0 +1,276 @@
+"""
+Near-duplicate detection of news with MinHash signatures and LSH.
+"""
+
+import hashlib
+import logging
+from array import array
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Tuple
+from tagesschauscraper.dedup import normalize_text
+
+try:
+    import xxhash
+except ImportError:  # pragma: no cover
+    xxhash = None
+
+if TYPE_CHECKING:
+    from tagesschauscraper.db import TagesschauDB
+
+logger = logging.getLogger(__name__)
+
+_MASK = 2**64 - 1
+# Added per bin of distance, when an empty bin borrows from a neighbour
+_DENSIFY_OFFSET = 0x9E3779B97F4A7C15
+# Minimum probability that a pair at the threshold becomes a candidate
+_MIN_RECALL = 0.95
+
+
+def hash64(data: bytes) -> int:
+    """
+    Stable 64 bit hash, xxhash when installed, otherwise BLAKE2b.
+    """
+    if xxhash is not None:
+        return int(xxhash.xxh3_64_intdigest(data))
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big")
+
+
+def get_shingles(text: str, k: int = 5) -> set[str]:
+    """
+    Character k-grams of the normalized text. Short edits only change the
+    few k-grams around them.
+    """
+    text = normalize_text(text)
+    if len(text) <= k:
+        return {text} if text else set()
+    return {text[i : i + k] for i in range(len(text) - k + 1)}  # noqa: E203
+
+
+def get_candidate_probability(
+    similarity: float, bands: int, rows: int
+) -> float:
+    """
+    Probability that a pair of the given similarity shares at least one band,
+    i.e. 1 - (1 - s^r)^b.
+    """
+    return float(1 - (1 - similarity**rows) ** bands)
+
+
+def get_lsh_parameters(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    Number of bands and rows per band with the most rows, i.e. the fewest
+    candidates, whose pairs at the similarity threshold still become
+    candidates with a probability of at least 95%.
+
+    Candidates are verified against the threshold, so the midpoint of the
+    S-curve, (1/b)^(1/r), lies below the threshold. For 64 permutations and
+    a threshold of 0.7 these are 16 bands of 4 rows.
+    """
+    candidates = [
+        (bands, num_perm // bands)
+        for bands in range(1, num_perm + 1)
+        if num_perm % bands == 0
+    ]
+    for bands, rows in candidates:
+        recall = get_candidate_probability(threshold, bands, rows)
+        if recall >= _MIN_RECALL:
+            return bands, rows
+    return candidates[-1]
+
+
+class MinHasher:
+    """
+    MinHash signatures by one permutation hashing.
+
+    Every shingle is hashed once. The hash selects one of num_perm bins and
+    each bin keeps its minimum, which costs O(shingles) instead of
+    O(shingles * num_perm) for num_perm independent hash functions. Empty
+    bins take the value of the next non-empty bin (rotation densification).
+    """
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 5) -> None:
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+
+    def get_signature(self, text: str) -> "array[int]":
+        signature = array("Q", [_MASK] * self.num_perm)
+        empty = True
+        for shingle in get_shingles(text, self.shingle_size):
+            value, bin_ = divmod(hash64(shingle.encode()), self.num_perm)
+            if value < signature[bin_]:
+                signature[bin_] = value
+                empty = False
+        if empty:
+            return signature
+        for i in range(self.num_perm):
+            if signature[i] == _MASK:
+                distance = 1
+                while signature[(i + distance) % self.num_perm] == _MASK:
+                    distance += 1
+                borrowed = signature[(i + distance) % self.num_perm]
+                signature[i] = (borrowed + distance * _DENSIFY_OFFSET) & (
+                    _MASK - 1
+                )
+        return signature
+
+
+def get_similarity(
+    signature: "array[int]", other_signature: "array[int]"
+) -> float:
+    """
+    Estimated Jaccard similarity of two signatures.
+    """
+    equal = sum(a == b for a, b in zip(signature, other_signature))
+    return equal / len(signature)
+
+
+def get_record_text(record: Dict[str, Any]) -> str:
+    teaser = record.get("teaser", record)
+    return f"{teaser.get('headline') or ''} {teaser.get('shorttext') or ''}"
+
+
+class NearDuplicateDetector:
+    """
+    Cluster news whose headline and shorttext are nearly the same.
+
+    Signatures are split into bands. News sharing a band are candidates and
+    join a cluster, when their estimated similarity reaches the threshold,
+    so a new record is only compared with a few candidates instead of all
+    records. Clusters are merged with union-find, when a record matches
+    several clusters. The cluster id is the id of the first record of the
+    cluster. Records without headline and shorttext are never clustered.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.7,
+        num_perm: int = 64,
+        shingle_size: int = 5,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        threshold : float, optional
+            Minimum estimated Jaccard similarity of the shingles of near
+            duplicates, by default 0.7.
+        num_perm : int, optional
+            Length of the signatures, by default 64.
+        shingle_size : int, optional
+            Characters per shingle, by default 5.
+        """
+        self.threshold = threshold
+        self.minHasher = MinHasher(num_perm, shingle_size)
+        self.bands, self.rows = get_lsh_parameters(num_perm, threshold)
+        self.buckets: list[Dict[Tuple[int, ...], list[str]]] = [
+            dict() for _ in range(self.bands)
+        ]
+        self.signatures: Dict[str, "array[int]"] = dict()
+        self.parents: Dict[str, str] = dict()
+        # Insertion position of every record, the oldest root wins a merge
+        self.positions: Dict[str, int] = dict()
+
+    def _get_band_keys(self, signature: "array[int]") -> list[Tuple[int, ...]]:
+        keys = []
+        for band in range(self.bands):
+            start = band * self.rows
+            end = start + self.rows
+            keys.append(tuple(signature[start:end]))
+        return keys
+
+    def get_cluster_id(self, record_id: str) -> str:
+        root = record_id
+        while self.parents[root] != root:
+            root = self.parents[root]
+        # Path compression
+        while self.parents[record_id] != root:
+            self.parents[record_id], record_id = root, self.parents[record_id]
+        return root
+
+    def _union(self, record_id: str, other_record_id: str) -> str:
+        # The cluster of the older root keeps its id
+        root = self.get_cluster_id(record_id)
+        other_root = self.get_cluster_id(other_record_id)
+        if root != other_root:
+            first, second = sorted(
+                [root, other_root], key=self.positions.__getitem__
+            )
+            self.parents[second] = first
+            return first
+        return root
+
+    def add(self, record_id: str, text: str) -> str:
+        """
+        Add a record and return its cluster id.
+        """
+        if record_id in self.signatures:
+            return self.get_cluster_id(record_id)
+        signature = self.minHasher.get_signature(text)
+        band_keys = self._get_band_keys(signature)
+        candidates: set[str] = set()
+        for band, key in enumerate(band_keys):
+            candidates.update(self.buckets[band].get(key, ()))
+        self.signatures[record_id] = signature
+        self.parents[record_id] = record_id
+        self.positions[record_id] = len(self.positions)
+        if not normalize_text(text):
+            # Empty texts have equal signatures but are no duplicates
+            return record_id
+        for band, key in enumerate(band_keys):
+            self.buckets[band].setdefault(key, []).append(record_id)
+        for candidate in candidates:
+            similarity = get_similarity(signature, self.signatures[candidate])
+            if similarity >= self.threshold:
+                self._union(candidate, record_id)
+        return self.get_cluster_id(record_id)
+
+    def add_record(self, record: Dict[str, Any]) -> str:
+        """
+        Add a scraped news record and store its cluster id in the record
+        under "cluster_id".
+        """
+        cluster_id = self.add(record["id"], get_record_text(record))
+        record["cluster_id"] = cluster_id
+        return cluster_id
+
+    def get_clusters(self) -> Dict[str, str]:
+        """
+        Cluster id of every record.
+        """
+        return {
+            record_id: self.get_cluster_id(record_id)
+            for record_id in self.signatures
+        }
+
+    def get_duplicate_groups(self) -> list[list[str]]:
+        """
+        All clusters with more than one record.
+        """
+        groups: Dict[str, list[str]] = dict()
+        for record_id, cluster_id in self.get_clusters().items():
+            groups.setdefault(cluster_id, []).append(record_id)
+        return [group for group in groups.values() if len(group) > 1]
+
+    def add_records(self, records: Iterable[Dict[str, Any]]) -> None:
+        for record in records:
+            self.add_record(record)
+
+    def cluster_db(
+        self, tagesschauDB: "TagesschauDB", update: bool = True
+    ) -> Dict[str, str]:
+        """
+        Cluster all news of the database in publishing order and, with
+        update, store the cluster ids in the cluster_id column.
+        """
+        rows = tagesschauDB.query(
+            "SELECT id, headline, shorttext"
+            f" FROM {tagesschauDB._TABLE_NAME} ORDER BY timestamp, rowid"
+        )
+        for row in rows:
+            self.add(row["id"], get_record_text(row))
+        clusters = self.get_clusters()
+        if update:
+            tagesschauDB.set_cluster_ids(clusters)
+        logger.info(
+            f"Clustered {len(clusters)} news into"
+            f" {len(set(clusters.values()))} clusters."
+        )
+        return clusters
@@ -0,0 +1,239 @@
+"""
+Append-only packed store for raw pages with an offset index.
+"""
+
+import logging
+import mmap
+import os
+import struct
+import threading
+from typing import Dict, Iterator, Tuple, Union
+from tagesschauscraper import helper
+
+logger = logging.getLogger(__name__)
+
+# Index entry: SHA1 digest, offset and length of the page in the pack file
+_INDEX_ENTRY = struct.Struct("<20sQQ")
+# Length of an index entry marking a deleted page
+_DELETED = 2**64 - 1
+
+
+class PageStore:
+    """
+    Store raw HTML pages in a single pack file.
+
+    Pages are appended to "<path>.pack" and their location is appended to
+    "<path>.idx". The index is loaded into a dictionary on open, so a lookup
+    is O(1). Pages are read through mmap and handed out as memoryview slices
+    of the mapping without copying. Pages are keyed by the SHA1 id of their
+    link, the same id used for the news records.
+
+    Overwritten and deleted pages stay in the pack file until compact() is
+    called.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Parameters
+        ----------
+        path : str
+            Path of the store without extension.
+        """
+        self.path = path
+        self.pack_path = path + ".pack"
+        self.index_path = path + ".idx"
+        self.index: Dict[str, Tuple[int, int]] = dict()
+        self._lock = threading.Lock()
+        self._mmap: Union[mmap.mmap, None] = None
+        self._open()
+
+    def _recover(self) -> None:
+        """
+        Finish or roll back a compaction interrupted by a crash.
+
+        compact() writes the new index and pack file next to the current
+        ones and renames the index first. Its rename commits the
+        compaction, so a temporary index means the compaction was not
+        committed and is dropped, while a temporary pack file without one
+        is the new pack file of a committed compaction.
+        """
+        tmp_pack_path = self.pack_path + ".tmp"
+        tmp_index_path = self.index_path + ".tmp"
+        if os.path.exists(tmp_index_path):
+            logger.warning(f"Dropping interrupted compaction of {self.path}")
+            os.remove(tmp_index_path)
+            if os.path.exists(tmp_pack_path):
+                os.remove(tmp_pack_path)
+        elif os.path.exists(tmp_pack_path):
+            logger.warning(f"Finishing interrupted compaction of {self.path}")
+            os.replace(tmp_pack_path, self.pack_path)
+
+    def _open(self) -> None:
+        self._recover()
+        self._pack = open(self.pack_path, "ab+")
+        self._index_file = open(self.index_path, "ab+")
+        self.index = dict()
+        self._index_file.seek(0)
+        data = self._index_file.read()
+        complete = len(data) - len(data) % _INDEX_ENTRY.size
+        if complete < len(data):
+            # Torn entry of an interrupted append. Later entries would not
+            # be aligned, so it is cut off.
+            logger.warning(
+                f"Truncating torn entry at the end of {self.index_path}"
+            )
+            self._index_file.truncate(complete)
+        for digest, offset, length in _INDEX_ENTRY.iter_unpack(
+            data[:complete]
+        ):
+            if length == _DELETED:
+                self.index.pop(digest.hex(), None)
+            else:
+                self.index[digest.hex()] = (offset, length)
+        self._pack.seek(0, os.SEEK_END)
+        self._size = self._pack.tell()
+
+    @staticmethod
+    def get_id(link: str) -> str:
+        return helper.get_hash_from_string(link)
+
+    def _append_index_entry(self, id_: str, offset: int, length: int) -> None:
+        self._index_file.write(
+            _INDEX_ENTRY.pack(bytes.fromhex(id_), offset, length)
+        )
+        self._index_file.flush()
+
+    def put(self, id_: str, content: bytes) -> None:
+        """
+        Append a page. A page with the same id is replaced.
+        """
+        with self._lock:
+            offset = self._size
+            self._pack.write(content)
+            self._pack.flush()
+            self._size += len(content)
+            self._append_index_entry(id_, offset, len(content))
+            self.index[id_] = (offset, len(content))
+
+    def put_page(self, link: str, content: bytes) -> str:
+        id_ = self.get_id(link)
+        self.put(id_, content)
+        return id_
+
+    def _get_mmap(self, end: int) -> mmap.mmap:
+        if self._mmap is None or len(self._mmap) < end:
+            if self._mmap is not None:
+                try:
+                    self._mmap.close()
+                except BufferError:
+                    # Slices of the old mapping are still in use, it is
+                    # released once they are garbage collected.
+                    pass
+            self._mmap = mmap.mmap(
+                self._pack.fileno(), self._size, access=mmap.ACCESS_READ
+            )
+        return self._mmap
+
+    def get(self, id_: str) -> Union[memoryview, None]:
+        """
+        Zero-copy view of the page. None, when the id is not in the store.
+        """
+        location = self.index.get(id_)
+        if location is None:
+            return None
+        offset, length = location
+        if length == 0:
+            return memoryview(b"")
+        end = offset + length
+        with self._lock:
+            mapping = self._get_mmap(end)
+        return memoryview(mapping)[offset:end]
+
+    def get_page(self, link: str) -> Union[memoryview, None]:
+        return self.get(self.get_id(link))
+
+    def delete(self, id_: str) -> None:
+        with self._lock:
+            if self.index.pop(id_, None) is not None:
+                self._append_index_entry(id_, 0, _DELETED)
+
+    def __contains__(self, id_: str) -> bool:
+        return id_ in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self.index))
+
+    def get_garbage_size(self) -> int:
+        """
+        Number of bytes in the pack file not belonging to any current page.
+        """
+        return self._size - sum(length for _, length in self.index.values())
+
+    def compact(self) -> None:
+        """
+        Rewrite the pack file with the current pages only.
+
+        The two files cannot be swapped in one atomic step. The new index is
+        renamed first, which commits the compaction, and the new pack file
+        second. A compaction interrupted in between is finished when the
+        store is opened again.
+
+        All views returned by get() must be released before compacting.
+        """
+        with self._lock:
+            tmp_pack_path = self.pack_path + ".tmp"
+            tmp_index_path = self.index_path + ".tmp"
+            mapping = self._get_mmap(self._size) if self._size else None
+            # The index is created first, so that a pack file without index
+            # is always complete
+            with open(tmp_index_path, "wb") as index, open(
+                tmp_pack_path, "wb"
+            ) as pack:
+                offset = 0
+                for id_, (old_offset, length) in sorted(
+                    self.index.items(), key=lambda item: item[1][0]
+                ):
+                    old_end = old_offset + length
+                    if mapping is not None:
+                        pack.write(mapping[old_offset:old_end])
+                    index.write(
+                        _INDEX_ENTRY.pack(bytes.fromhex(id_), offset, length)
+                    )
+                    offset += length
+                pack.flush()
+                os.fsync(pack.fileno())
+                index.flush()
+                os.fsync(index.fileno())
+            self._close_files()
+            os.replace(tmp_index_path, self.index_path)
+            os.replace(tmp_pack_path, self.pack_path)
+            self._open()
+
+    def _close_files(self) -> None:
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Views are still in use, the mapping is released once they
+                # are garbage collected.
+                pass
+            self._mmap = None
+        self._pack.close()
+        self._index_file.close()
+
+    def close(self) -> None:
+        """
+        Close the store. Views returned by get() stay valid until they are
+        released.
+        """
+        with self._lock:
+            self._close_files()
+
+    def __enter__(self) -> "PageStore":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
@@ -0,0 +1,135 @@
+"""
+Cache of extraction results keyed by page hash and extractor version.
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, TypeVar, Union
+
+logger = logging.getLogger(__name__)
+
+Result = TypeVar("Result")
+
+
+def get_page_hash(content: Union[str, bytes]) -> str:
+    """
+    128 bit BLAKE2b digest of the page content.
+    """
+    if isinstance(content, str):
+        content = content.encode()
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+class ParseCache:
+    """
+    Store the results of extractors per page, so that unchanged pages are
+    not parsed again, e.g. when a run is replayed from a response archive.
+
+    Results are keyed by the hash of the page content and grouped by
+    extractor. Every extractor has a version, e.g. the version of its
+    extraction spec. When an extractor is used with another version than its
+    cached results, the results are dropped, so that results of an outdated
+    extractor are never returned.
+
+    Results must be JSON serializable. Copies are handed out, so callers may
+    modify them.
+    """
+
+    def __init__(self, file_path: Union[str, None] = None) -> None:
+        """
+        Parameters
+        ----------
+        file_path : str, optional
+            JSON file the cache is loaded from and saved to. Without a file
+            path the cache is kept in memory only.
+        """
+        self.file_path = file_path
+        self.extractors: Dict[str, Dict[str, Any]] = dict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if file_path is not None and os.path.isfile(file_path):
+            self.load()
+
+    def _get_results(self, extractor: str, version: str) -> Dict[str, Any]:
+        entry = self.extractors.get(extractor)
+        if entry is None or entry["version"] != version:
+            if entry is not None:
+                logger.info(
+                    f"Extractor {extractor} changed from version"
+                    f" {entry['version']} to {version}, dropped"
+                    f" {len(entry['results'])} cached results."
+                )
+            entry = {"version": version, "results": dict()}
+            self.extractors[extractor] = entry
+        results: Dict[str, Any] = entry["results"]
+        return results
+
+    def get(self, extractor: str, version: str, page_hash: str) -> Any:
+        """
+        Cached result of the extractor for the page. None, when the page is
+        not cached for this version of the extractor.
+        """
+        with self._lock:
+            result = self._get_results(extractor, version).get(page_hash)
+        return copy.deepcopy(result)
+
+    def put(
+        self, extractor: str, version: str, page_hash: str, result: Any
+    ) -> None:
+        result = copy.deepcopy(result)
+        with self._lock:
+            self._get_results(extractor, version)[page_hash] = result
+
+    def get_or_extract(
+        self,
+        extractor: str,
+        version: str,
+        content: Union[str, bytes],
+        extract: Callable[[], Result],
+    ) -> Result:
+        """
+        Cached result of the extractor for the page content, or the result
+        of extract(), which is cached.
+
+        Parameters
+        ----------
+        extractor : str
+            Name of the extractor.
+        version : str
+            Version of the extractor.
+        content : str or bytes
+            Page content.
+        extract : Callable
+            Function parsing the page and returning the result.
+        """
+        page_hash = get_page_hash(content)
+        result = self.get(extractor, version, page_hash)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if result is None:
+            result = extract()
+            self.put(extractor, version, page_hash, result)
+        return result  # type: ignore[no-any-return]
+
+    def __len__(self) -> int:
+        return sum(len(entry["results"]) for entry in self.extractors.values())
+
+    def load(self) -> None:
+        if self.file_path is None:
+            raise ValueError("No file path provided.")
+        with open(self.file_path, "r") as f:
+            self.extractors = json.load(f)
+
+    def save(self) -> None:
+        if self.file_path is None:
+            raise ValueError("No file path provided.")
+        with self._lock, open(self.file_path, "w") as f:
+            json.dump(self.extractors, f)
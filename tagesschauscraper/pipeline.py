@@ -0,0 +1,292 @@
+"""
+Staged scraping pipeline with bounded queues between the stages.
+"""
+
+import logging
+import queue
+import threading
+from typing import Any, Callable, Dict, Iterable, Tuple, Union
+import requests
+from tagesschauscraper import helper
+from tagesschauscraper.tagesschau import (
+    NewsRecord,
+    RequestParams,
+    ScraperConfig,
+    TagesschauScraper,
+    TeaserRecord,
+)
+
+logger = logging.getLogger(__name__)
+
+_SENTINEL = object()
+
+
+class Stage:
+    """
+    A pipeline stage, i.e. a function applied to every item of the input
+    queue by a number of worker threads.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[Any], Iterable[Any]],
+        workers: int = 1,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        name : str
+            Name of the stage used in thread names and log messages.
+        func : Callable
+            Function returning the output items for one input item.
+        workers : int, optional
+            Number of worker threads, by default 1.
+        """
+        if workers < 1:
+            raise ValueError("A stage needs at least one worker.")
+        self.name = name
+        self.func = func
+        self.workers = workers
+
+
+class Pipeline:
+    """
+    Run stages concurrently, connected by bounded queues.
+
+    A full queue blocks the upstream stage (backpressure), so that a slow
+    stage limits the memory held by the pipeline. The pipeline shuts down
+    gracefully: each stage finishes all items of its input queue before the
+    next stage is told that no more items will come. On an error, or when
+    stop() is called, no new items are fed and queued items are discarded.
+    """
+
+    def __init__(self, stages: list[Stage], queue_size: int = 64) -> None:
+        """
+        Parameters
+        ----------
+        stages : list[Stage]
+            Stages in processing order.
+        queue_size : int, optional
+            Maximum number of items in each queue, by default 64.
+        """
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage.")
+        self.stages = stages
+        self.queue_size = queue_size
+        self._stop_event = threading.Event()
+        self._errors: list[BaseException] = []
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def run(self, items: Iterable[Any]) -> list[Any]:
+        """
+        Feed the items into the first stage and wait until all stages are
+        done.
+
+        Returns
+        -------
+        list
+            Output items of the last stage.
+
+        Raises
+        ------
+        Exception
+            The first exception raised by any stage.
+        """
+        self._stop_event.clear()
+        self._errors = []
+        queues: list["queue.Queue[Any]"] = [
+            queue.Queue(maxsize=self.queue_size) for _ in self.stages
+        ]
+        results: list[Any] = []
+        queues.append(_ResultQueue(results))  # type: ignore
+        threads = []
+        for index, stage in enumerate(self.stages):
+            remaining = [stage.workers]
+            lock = threading.Lock()
+            for number in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._work,
+                    args=(
+                        stage,
+                        queues[index],
+                        queues[index + 1],
+                        self._get_workers(index + 1),
+                        remaining,
+                        lock,
+                    ),
+                    name=f"{stage.name}-{number}",
+                    daemon=True,
+                )
+                thread.start()
+                threads.append(thread)
+        try:
+            for item in items:
+                if self._stop_event.is_set():
+                    break
+                queues[0].put(item)
+        finally:
+            for _ in range(self.stages[0].workers):
+                queues[0].put(_SENTINEL)
+            for thread in threads:
+                thread.join()
+        if self._errors:
+            raise self._errors[0]
+        return results
+
+    def _get_workers(self, index: int) -> int:
+        if index < len(self.stages):
+            return self.stages[index].workers
+        return 0
+
+    def _work(
+        self,
+        stage: Stage,
+        in_queue: "queue.Queue[Any]",
+        out_queue: "queue.Queue[Any]",
+        downstream_workers: int,
+        remaining: list[int],
+        lock: threading.Lock,
+    ) -> None:
+        while True:
+            item = in_queue.get()
+            if item is _SENTINEL:
+                break
+            if self._stop_event.is_set():
+                continue
+            try:
+                for output in stage.func(item):
+                    out_queue.put(output)
+            except Exception as e:
+                logger.exception(f"Stage {stage.name} failed.")
+                self._errors.append(e)
+                self._stop_event.set()
+        with lock:
+            remaining[0] -= 1
+            is_last_worker = remaining[0] == 0
+        if is_last_worker:
+            for _ in range(downstream_workers):
+                out_queue.put(_SENTINEL)
+
+
+class _ResultQueue:
+    """
+    Stand-in for the output queue of the last stage collecting all items.
+    """
+
+    def __init__(self, results: list[Any]) -> None:
+        self.results = results
+        self.lock = threading.Lock()
+
+    def put(self, item: Any) -> None:
+        with self.lock:
+            self.results.append(item)
+
+
+class ScraperPipeline:
+    """
+    Scrape the news archive with overlapping network I/O and parsing.
+
+    The stages are: fetching archive pages -> parsing teaser -> fetching
+    articles -> parsing articles -> writing records. Records are written in
+    the order in which they are completed.
+    """
+
+    def __init__(
+        self,
+        scraper: Union[TagesschauScraper, None] = None,
+        writer: Union[Callable[[NewsRecord], None], None] = None,
+        fetch_workers: int = 8,
+        parse_workers: int = 2,
+        queue_size: int = 64,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        scraper : TagesschauScraper, optional
+            Scraper used for fetching and extracting, by default a new one.
+        writer : Callable, optional
+            Function called for every record by a single writer thread, e.g.
+            TagesschauDB.insert wrapped for the record layout. Without a
+            writer the records are collected and returned.
+        fetch_workers : int, optional
+            Number of threads per fetching stage, by default 8.
+        parse_workers : int, optional
+            Number of threads per parsing stage, by default 2.
+        queue_size : int, optional
+            Maximum number of items between two stages, by default 64.
+        """
+        self.scraper = scraper if scraper is not None else TagesschauScraper()
+        self.writer = writer
+        self.pipeline = Pipeline(
+            [
+                Stage("fetch-archive", self._fetch_archive, fetch_workers),
+                Stage("parse-teaser", self._parse_teaser, parse_workers),
+                Stage("fetch-article", self._fetch_article, fetch_workers),
+                Stage("parse-article", self._parse_article, parse_workers),
+                Stage("write", self._write, 1),
+            ],
+            queue_size=queue_size,
+        )
+
+    def run(self, config: ScraperConfig) -> Dict[str, list[NewsRecord]]:
+        """
+        Scrape all archive pages of the config.
+
+        Returns
+        -------
+        dict
+            Scraped teaser and article data. Empty, when a writer is used.
+        """
+        records = self.pipeline.run(config.request_params)
+        return {"records": records}
+
+    def stop(self) -> None:
+        self.pipeline.stop()
+
+    def _fetch_archive(
+        self, params: RequestParams
+    ) -> Iterable[requests.Response]:
+        yield self.scraper.get_archive_response(params)
+
+    def _parse_teaser(
+        self, response: requests.Response
+    ) -> Iterable[TeaserRecord]:
+        yield from self.scraper.scrape_teaser(response)["records"]
+
+    def _fetch_article(
+        self, teaser_data: TeaserRecord
+    ) -> Iterable[Tuple[TeaserRecord, Union[requests.Response, None]]]:
+        link = teaser_data["link"]
+        try:
+            response = self.scraper.fetch_article(link)
+        except Exception as e:
+            if self.scraper.failure_ledger is None:
+                raise
+            # Left to the retry of the failure ledger
+            self.scraper.failure_ledger.record(link, e, teaser=teaser_data)
+            return
+        yield teaser_data, response
+
+    def _parse_article(
+        self, item: Tuple[TeaserRecord, Union[requests.Response, None]]
+    ) -> Iterable[NewsRecord]:
+        teaser_data, response = item
+        link = teaser_data["link"]
+        article_data = self.scraper.parse_article(link, response, teaser_data)
+        if self.scraper.is_failed(link):
+            # Left to the retry of the failure ledger
+            return
+        yield {
+            "id": helper.get_hash_from_string(link),
+            "teaser": teaser_data,
+            "article": article_data,
+        }
+
+    def _write(self, record: NewsRecord) -> Iterable[NewsRecord]:
+        if self.writer is None:
+            yield record
+        else:
+            self.writer(record)
@@ -0,0 +1,239 @@
+"""
+Planning of scraping runs over several dates and news categories.
+"""
+
+import copy
+import logging
+import threading
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from datetime import date
+from typing import Any, Callable, Deque, Dict, NamedTuple, Tuple, Union
+import requests
+from tagesschauscraper.tagesschau import (
+    NEWS_CATEGORIES,
+    ArchiveFilter,
+    ArticleRecord,
+    NewsRecord,
+    TagesschauScraper,
+    TeaserRecord,
+)
+from tagesschauscraper import helper
+
+logger = logging.getLogger(__name__)
+
+# Position of a teaser in the plan: (date index, category index, page, rank)
+PlanPosition = Tuple[int, int, int, int]
+
+
+class WorkUnit(NamedTuple):
+    """
+    A single archive page to be scraped.
+    """
+
+    date_: date
+    category: str
+    page: int
+
+    def to_archive_filter(self) -> ArchiveFilter:
+        return ArchiveFilter(
+            {
+                "date": self.date_,
+                "category": self.category,
+                "page": str(self.page),
+            }
+        )
+
+
+class CategoryFanOutPlanner:
+    """
+    Scrape the news archive for all combinations of dates and categories.
+
+    Every archive page is a work unit. The planner starts with the first page
+    of each (date, category) combination and schedules further pages as soon
+    as the pagination of the first page is known. Each unique article is
+    fetched only once, even when its teaser appears under several categories.
+    The resulting records are tagged with all categories they appeared under.
+
+    Sessions are not thread-safe, so every worker thread uses a copy of the
+    scraper with a session of its own. The stores, the failure ledger and
+    the parse cache of the scraper are shared, they are thread-safe.
+    """
+
+    def __init__(
+        self,
+        dates: list[date],
+        categories: Union[list[str], None] = None,
+        scraper: Union[TagesschauScraper, None] = None,
+        max_workers: int = 8,
+        session_factory: Callable[[], requests.Session] = requests.Session,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        dates : list[date]
+            Dates to scrape.
+        categories : list[str], optional
+            News categories to scrape, by default all of NEWS_CATEGORIES.
+        scraper : TagesschauScraper, optional
+            Scraper used for fetching and extracting, by default a new one.
+        max_workers : int, optional
+            Maximum number of concurrent requests, by default 8.
+        session_factory : Callable, optional
+            Function creating the session of a worker thread, by default
+            requests.Session. The session of the scraper is not used.
+        """
+        self.dates = dates
+        self.categories = (
+            categories if categories is not None else list(NEWS_CATEGORIES)
+        )
+        self.scraper = scraper if scraper is not None else TagesschauScraper()
+        self.max_workers = max_workers
+        self.session_factory = session_factory
+        self._local = threading.local()
+        self._sessions: list[requests.Session] = []
+        self._sessions_lock = threading.Lock()
+
+    def _get_scraper(self) -> TagesschauScraper:
+        """
+        Scraper of the current worker thread.
+        """
+        scraper = getattr(self._local, "scraper", None)
+        if scraper is None:
+            scraper = copy.copy(self.scraper)
+            scraper.session = self.session_factory()
+            with self._sessions_lock:
+                self._sessions.append(scraper.session)
+            self._local.scraper = scraper
+        return scraper
+
+    def plan(self) -> list[WorkUnit]:
+        """
+        Return the initial work units, i.e. the first archive page of every
+        (date, category) combination.
+        """
+        return [
+            WorkUnit(date_, category, 1)
+            for date_ in self.dates
+            for category in self.categories
+        ]
+
+    def run(self) -> Dict[str, list[NewsRecord]]:
+        """
+        Execute the plan.
+
+        Archive pages are scheduled before articles, so that new work is
+        discovered as early as possible and all workers stay busy.
+
+        Returns
+        -------
+        dict
+            Scraped teaser and article data, tagged with categories.
+        """
+        pending_units: Deque[WorkUnit] = deque(self.plan())
+        pending_links: Deque[str] = deque()
+        teasers: Dict[str, TeaserRecord] = {}
+        positions: Dict[str, PlanPosition] = {}
+        categories: Dict[str, set[str]] = {}
+        articles: Dict[str, ArticleRecord] = {}
+        running: Dict["Future[Any]", Tuple[str, Any]] = {}
+
+        def submit(
+            executor: ThreadPoolExecutor,
+            kind: str,
+            item: Any,
+            fn: Callable[[Any], Any],
+        ) -> None:
+            running[executor.submit(fn, item)] = (kind, item)
+
+        def scrape_article(link: str) -> ArticleRecord:
+            return self._get_scraper().scrape_article(link, teasers[link])
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                while pending_units or pending_links or running:
+                    while len(running) < self.max_workers and (
+                        pending_units or pending_links
+                    ):
+                        if pending_units:
+                            submit(
+                                executor,
+                                "unit",
+                                pending_units.popleft(),
+                                self._scrape_unit,
+                            )
+                        else:
+                            submit(
+                                executor,
+                                "article",
+                                pending_links.popleft(),
+                                scrape_article,
+                            )
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        kind, item = running.pop(future)
+                        if kind == "article":
+                            articles[item] = future.result()
+                            continue
+                        unit_teasers, max_page = future.result()
+                        if item.page == 1:
+                            pending_units.extend(
+                                WorkUnit(item.date_, item.category, page)
+                                for page in range(2, max_page + 1)
+                            )
+                        for rank, teaser in enumerate(unit_teasers):
+                            link = teaser["link"]
+                            position = (
+                                self.dates.index(item.date_),
+                                self.categories.index(item.category),
+                                item.page,
+                                rank,
+                            )
+                            if link not in teasers:
+                                teasers[link] = teaser
+                                positions[link] = position
+                                categories[link] = set()
+                                pending_links.append(link)
+                            elif position < positions[link]:
+                                teasers[link] = teaser
+                                positions[link] = position
+                            categories[link].add(item.category)
+        finally:
+            self._close_sessions()
+
+        records: list[NewsRecord] = [
+            {
+                "id": helper.get_hash_from_string(link),
+                "teaser": teasers[link],
+                "article": articles[link],
+                "categories": sorted(categories[link]),
+            }
+            for link in sorted(teasers, key=positions.__getitem__)
+            if not self.scraper.is_failed(link)
+        ]
+        logger.info(
+            f"Scraped {len(records)} unique articles from "
+            f"{len(self.dates)} dates and {len(self.categories)} categories."
+        )
+        return {"records": records}
+
+    def _close_sessions(self) -> None:
+        with self._sessions_lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions.clear()
+
+    def _scrape_unit(self, unit: WorkUnit) -> Tuple[list[TeaserRecord], int]:
+        scraped = self._get_scraper().scrape_archive_teaser(
+            unit.to_archive_filter().processed_params
+        )
+        if scraped is None:
+            # Recorded in the failure ledger, the retry scrapes the page
+            return [], 1
+        teasers, archive = scraped
+        return teasers, len(archive.extract_pagination())
@@ -0,0 +1,354 @@
+"""
+Opt-in profiling of scraping runs.
+"""
+
+import contextlib
+import cProfile
+import io
+import logging
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from types import FrameType, TracebackType
+from typing import ContextManager, Dict, Iterator, Union
+
+logger = logging.getLogger(__name__)
+
+# "all" does not include "memory", since tracemalloc slows down the run and
+# distorts the time profiles
+PROFILE_MODES = ["cprofile", "sampling", "memory", "all"]
+
+
+def get_frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", code.co_filename)
+    return f"{module}:{code.co_name}"
+
+
+class SamplingProfiler:
+    """
+    Sample the call stacks of all threads in a fixed interval.
+
+    Unlike cProfile, which only sees the thread it was enabled in, the
+    sampler covers the worker threads of pipelines and thread pools. The
+    stacks are written in the folded format read by flamegraph.pl and
+    speedscope.
+    """
+
+    def __init__(self, interval: float = 0.005) -> None:
+        """
+        Parameters
+        ----------
+        interval : float, optional
+            Seconds between two samples, by default 0.005.
+        """
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+        self._thread: Union[threading.Thread, None] = None
+
+    def start(self) -> None:
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._sample, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _sample(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            thread_names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                current: Union[FrameType, None] = frame
+                while current is not None:
+                    stack.append(get_frame_name(current))
+                    current = current.f_back
+                stack.append(thread_names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def get_folded_stacks(self) -> str:
+        return "".join(
+            f"{stack} {count}\n"
+            for stack, count in sorted(self.stacks.items())
+        )
+
+    def get_summary(self, top: int = 30) -> str:
+        """
+        Functions with the most samples on top of the stack (self) and
+        anywhere in the stack (total).
+        """
+        self_counts: Counter[str] = Counter()
+        total_counts: Counter[str] = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")[1:]
+            if frames:
+                self_counts[frames[-1]] += count
+            for frame in set(frames):
+                total_counts[frame] += count
+        lines = [f"{self.samples} samples every {self.interval} seconds"]
+        for title, counts in [("self", self_counts), ("total", total_counts)]:
+            lines.append(f"\nTop functions by {title} samples:")
+            lines.extend(
+                f"{count:>8}  {name}"
+                for name, count in counts.most_common(top)
+            )
+        return "\n".join(lines) + "\n"
+
+
+def get_peak_rss() -> Union[int, None]:
+    """
+    Peak resident set size of the process in bytes. None, when the platform
+    has no resource module.
+    """
+    try:
+        import resource
+    except ImportError:  # pragma: no cover
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class StageAllocations:
+    """
+    Allocations of all calls of one stage.
+    """
+
+    def __init__(self) -> None:
+        self.calls = 0
+        # Traced memory after minus before the calls. Negative, when a
+        # stage frees memory allocated by an earlier stage.
+        self.net = 0
+        # Largest increase of traced memory during a call
+        self.peak = 0
+
+
+class AllocationTracker:
+    """
+    Track the memory allocated by the stages of a run with tracemalloc.
+
+    Code marks its stages with the stage() context manager of this module,
+    which does nothing unless a tracker is started. Stages must not be
+    nested. The traced memory is process wide, so with concurrent stages the
+    numbers of a stage include allocations of other threads.
+    """
+
+    def __init__(self, frames: int = 1) -> None:
+        """
+        Parameters
+        ----------
+        frames : int, optional
+            Number of frames stored per allocation, by default 1. More
+            frames group the allocation sites by caller, but cost more.
+        """
+        self.frames = frames
+        self.stages: Dict[str, StageAllocations] = dict()
+        self.snapshot: Union[tracemalloc.Snapshot, None] = None
+        self._lock = threading.Lock()
+        self._started_tracing = False
+
+    def start(self) -> None:
+        global _tracker
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+        _tracker = self
+
+    def stop(self) -> None:
+        global _tracker
+        _tracker = None
+        self.snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        )
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextlib.contextmanager
+    def track(self, name: str) -> Iterator[None]:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            with self._lock:
+                allocations = self.stages.setdefault(name, StageAllocations())
+                allocations.calls += 1
+                allocations.net += current - before
+                allocations.peak = max(allocations.peak, peak - before)
+
+    def get_report(self, top: int = 20) -> str:
+        """
+        Allocations per stage and the allocation sites holding the most
+        memory when the tracker was stopped.
+        """
+        lines = [
+            f"{'stage':<20}{'calls':>8}{'net [KiB]':>12}"
+            f"{'net/call [KiB]':>16}{'peak [KiB]':>12}"
+        ]
+        for name, allocations in self.stages.items():
+            lines.append(
+                f"{name:<20}{allocations.calls:>8}"
+                f"{allocations.net / 1024:>12.1f}"
+                f"{allocations.net / allocations.calls / 1024:>16.1f}"
+                f"{allocations.peak / 1024:>12.1f}"
+            )
+        peak_rss = get_peak_rss()
+        if peak_rss is not None:
+            lines.append(f"\nPeak RSS: {peak_rss / 2**20:.1f} MiB")
+        if self.snapshot is not None:
+            lines.append(f"\nTop {top} allocation sites:")
+            lines.extend(
+                str(statistic)
+                for statistic in self.snapshot.statistics("lineno")[:top]
+            )
+        return "\n".join(lines) + "\n"
+
+
+# Tracker of the stages, set while an AllocationTracker is started
+_tracker: Union[AllocationTracker, None] = None
+
+
+def stage(name: str) -> ContextManager[None]:
+    """
+    Mark a stage of a run for the allocation tracker, e.g.
+
+        with profiling.stage("parse-article"):
+            ...
+    """
+    tracker = _tracker
+    if tracker is None:
+        return contextlib.nullcontext()
+    return tracker.track(name)
+
+
+class Profiler:
+    """
+    Context manager profiling a run with cProfile and the sampling profiler,
+    or tracking its allocations, and writing the results next to the log
+    file of the run.
+
+    Written files, for the path prefix "logs/2023-03-01T12:00:00scrape":
+
+    * logs/2023-03-01T12:00:00scrape.prof: cProfile stats, e.g. for snakeviz
+    * logs/2023-03-01T12:00:00scrape.folded: sampled stacks for flamegraphs
+    * logs/2023-03-01T12:00:00scrape.memory.txt: allocations per stage
+    * logs/2023-03-01T12:00:00scrape.profile.txt: top functions
+    """
+
+    def __init__(
+        self,
+        path_prefix: str,
+        mode: str = "all",
+        interval: float = 0.005,
+        top: int = 30,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        path_prefix : str
+            Path of the output files without extension, usually the path of
+            the log file without ".log".
+        mode : str, optional
+            "cprofile", "sampling", "memory" or "all", by default "all",
+            which is "cprofile" and "sampling".
+        interval : float, optional
+            Seconds between two samples of the sampling profiler.
+        top : int, optional
+            Number of functions listed in the summary, by default 30.
+
+        Raises
+        ------
+        ValueError
+            When the mode is not defined.
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Profile mode must be one of {PROFILE_MODES}.")
+        self.path_prefix = path_prefix
+        self.top = top
+        self.cprofile: Union[cProfile.Profile, None] = None
+        self.sampler: Union[SamplingProfiler, None] = None
+        self.allocations: Union[AllocationTracker, None] = None
+        if mode in ["cprofile", "all"]:
+            self.cprofile = cProfile.Profile()
+        if mode in ["sampling", "all"]:
+            self.sampler = SamplingProfiler(interval)
+        if mode == "memory":
+            self.allocations = AllocationTracker()
+        self.files: Dict[str, str] = dict()
+
+    def __enter__(self) -> "Profiler":
+        self._start_time = time.time()
+        if self.allocations is not None:
+            self.allocations.start()
+        if self.sampler is not None:
+            self.sampler.start()
+        if self.cprofile is not None:
+            self.cprofile.enable()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Union[type[BaseException], None],
+        exc_value: Union[BaseException, None],
+        traceback: Union[TracebackType, None],
+    ) -> None:
+        if self.cprofile is not None:
+            self.cprofile.disable()
+        if self.sampler is not None:
+            self.sampler.stop()
+        if self.allocations is not None:
+            self.allocations.stop()
+        self.write()
+
+    def write(self) -> Dict[str, str]:
+        """
+        Write all profiles and the summary.
+
+        Returns
+        -------
+        dict
+            Paths of the written files.
+        """
+        summary = [f"Wall time: {time.time() - self._start_time:.2f} seconds"]
+        if self.cprofile is not None:
+            self.files["cprofile"] = self.path_prefix + ".prof"
+            self.cprofile.dump_stats(self.files["cprofile"])
+            stream = io.StringIO()
+            stats = pstats.Stats(self.cprofile, stream=stream)
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top)
+            summary.append("cProfile, top functions by cumulative time:")
+            summary.append(stream.getvalue())
+        if self.sampler is not None:
+            self.files["folded"] = self.path_prefix + ".folded"
+            with open(self.files["folded"], "w") as f:
+                f.write(self.sampler.get_folded_stacks())
+            summary.append("Sampling profiler:")
+            summary.append(self.sampler.get_summary(self.top))
+        if self.allocations is not None:
+            report = self.allocations.get_report(self.top)
+            self.files["memory"] = self.path_prefix + ".memory.txt"
+            with open(self.files["memory"], "w") as f:
+                f.write(report)
+            summary.append("Allocations:")
+            summary.append(report)
+        self.files["summary"] = self.path_prefix + ".profile.txt"
+        with open(self.files["summary"], "w") as f:
+            f.write("\n".join(summary))
+        logger.info(f"Profiles written to {list(self.files.values())}")
+        return self.files
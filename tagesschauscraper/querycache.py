@@ -0,0 +1,174 @@
+"""
+In-process result cache for read queries of the news database.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    NamedTuple,
+    Tuple,
+    Union,
+)
+
+
+class _Entry(NamedTuple):
+    value: Any
+    expires: float
+    start: Union[str, None]
+    end: Union[str, None]
+    category: Union[str, None]
+
+    def covers(self, day: str, category: str) -> bool:
+        """
+        Check if the query of the entry covers the (day, category) bucket.
+        """
+        if self.start is not None and day < self.start:
+            return False
+        if self.end is not None and day >= self.end:
+            return False
+        return self.category is None or self.category == category
+
+
+class QueryCache:
+    """
+    LRU cache of query results with a time to live.
+
+    Every entry records the date range [start, end) and the category of its
+    query, where None stands for any. A write invalidates exactly the
+    entries whose range contains one of the written (day, category)
+    buckets, so results of other days stay cached. The time to live bounds
+    the staleness caused by writes of other processes, which the cache does
+    not see.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        max_size : int, optional
+            Maximum number of cached results, by default 1024. The least
+            recently used result is evicted first.
+        ttl : float, optional
+            Seconds a result stays valid, by default 60.
+        clock : Callable, optional
+            Function returning the current time in seconds, by default
+            time.monotonic.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Increased by every invalidation. A result computed while an
+        # invalidation happened may be stale and is not stored.
+        self._generation = 0
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+        }
+
+    def get(
+        self,
+        key: Hashable,
+        compute: Callable[[], Any],
+        start: Union[str, None] = None,
+        end: Union[str, None] = None,
+        category: Union[str, None] = None,
+    ) -> Any:
+        """
+        Cached result of the key, or the result of compute() on a miss.
+
+        Parameters
+        ----------
+        key : Hashable
+            Query and parameters.
+        compute : Callable
+            Function running the query.
+        start, end : str, optional
+            First day (inclusive) and last day (exclusive) of the query,
+            YYYY-MM-DD.
+        category : str, optional
+            Category of the query.
+        """
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires > now:
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return entry.value
+                del self._entries[key]
+                self.stats["expirations"] += 1
+            self.stats["misses"] += 1
+            generation = self._generation
+        value = compute()
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = _Entry(
+                    value, now + self.ttl, start, end, category
+                )
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self.stats["evictions"] += 1
+        return value
+
+    def invalidate(self, buckets: Iterable[Tuple[str, str]]) -> int:
+        """
+        Drop all results whose query covers one of the (day, category)
+        buckets.
+
+        Returns
+        -------
+        int
+            Number of dropped results.
+        """
+        buckets = set(buckets)
+        if not buckets:
+            return 0
+        with self._lock:
+            self._generation += 1
+            stale = [
+                key
+                for key, entry in self._entries.items()
+                if any(entry.covers(*bucket) for bucket in buckets)
+            ]
+            for key in stale:
+                del self._entries[key]
+            self.stats["invalidations"] += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self.stats["invalidations"] += len(self._entries)
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Hit and miss counts, hit rate and size of the cache.
+        """
+        with self._lock:
+            stats: Dict[str, Any] = dict(self.stats)
+            stats["size"] = len(self._entries)
+        requests = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / requests if requests else 0.0
+        return stats
+
+    def __len__(self) -> int:
+        return len(self._entries)
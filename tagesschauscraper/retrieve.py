@@ -1,23 +1,73 @@
+import json
+import os
+import struct
+import threading
+import zlib
 import requests
 from bs4 import BeautifulSoup
 from bs4.element import Tag
 from requests.models import Response
-from typing import Dict, Union
+from requests.structures import CaseInsensitiveDict
+from typing import Any, Dict, Tuple, Union
+
+
+class HTTPStatusError(ValueError):
+    """
+    The response has a status code other than 200.
+    """
+
+    def __init__(self, url: str, status_code: int) -> None:
+        super().__init__(f"Status code {status_code} for URL {url}.")
+        self.url = url
+        self.status_code = status_code
+
+
+def check_status(response: Response) -> None:
+    """
+    Raises
+    ------
+    HTTPStatusError
+        When the status code of the response is not 200.
+    """
+    if response.status_code != 200:
+        raise HTTPStatusError(response.url, response.status_code)
+
+
+def get_request_url(url: str, params: Any = None) -> str:
+    """
+    Full request URL including the query string.
+    """
+    prepared_request = requests.Request("GET", url, params=params).prepare()
+    return str(prepared_request.url)
 
 
 def get_soup_from_url(url: str) -> BeautifulSoup:
     response = requests.get(url)
-    if response.status_code != 200:
-        raise ValueError
+    check_status(response)
     return BeautifulSoup(response.text, "html.parser")
 
 
 def get_soup(response: Response) -> BeautifulSoup:
-    if response.status_code != 200:
-        raise ValueError
+    check_status(response)
     return BeautifulSoup(response.text, "html.parser")
 
 
+def release_soup(soup: Union[BeautifulSoup, Tag]) -> None:
+    """
+    Destroy the tree. Its elements reference each other, so without
+    breaking the cycles the tree is only freed by the cyclic garbage
+    collector, which lets memory climb in long runs.
+    """
+    # Decomposing the root only walks the elements after it, which a
+    # parsed document does not link to, so the children go one by one.
+    for child in list(soup.contents):
+        if isinstance(child, Tag):
+            child.decompose()
+        else:
+            child.extract()
+    soup.decompose()
+
+
 def get_text_from_html(
     soup: BeautifulSoup, element: Dict[str, str], separator: str = "\n"
 ) -> Union[str, None]:
@@ -47,6 +97,12 @@ class WebsiteTest:
     def __init__(self, response: requests.Response) -> None:
         self.soup = get_soup(response)
 
+    def release(self) -> None:
+        """
+        Free the parsed website. It cannot be tested afterwards.
+        """
+        release_soup(self.soup)
+
     def is_element(
         self,
         name: Union[str, None] = None,
@@ -80,3 +136,250 @@ class WebsiteTest:
             return target_text in result.get_text()
         else:
             return False
+
+
+class ResponseNotRecordedError(requests.exceptions.RequestException):
+    """
+    The requested URL is not in the response archive.
+    """
+
+
+class ResponseArchive:
+    """
+    SQLite container of raw responses, indexed by the full request URL.
+    Response bodies are stored zlib compressed.
+    """
+
+    _TABLE_NAME = "responses"
+
+    def __init__(self, file_path: str) -> None:
+        """
+        Parameters
+        ----------
+        file_path : str
+            Path of the archive file. It is created when it does not exist.
+        """
+        # Imported here, so that importing this module stays cheap
+        import sqlite3
+
+        self.file_path = file_path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(file_path, check_same_thread=False)
+        with self.conn:
+            self.conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {ResponseArchive._TABLE_NAME} (
+                url text PRIMARY KEY,
+                status_code integer,
+                headers text,
+                encoding text,
+                content blob)
+                """)
+
+    @staticmethod
+    def get_key(url: str, params: Any = None) -> str:
+        """
+        Full request URL including the query string.
+        """
+        return get_request_url(url, params)
+
+    def put(self, key: str, response: Response) -> None:
+        """
+        Store the response. A stored 200 response is kept, when the page
+        later answers with another status, e.g. 304 or an error.
+        """
+        query = f"""
+            INSERT INTO {ResponseArchive._TABLE_NAME} VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (url) DO UPDATE SET
+            status_code = excluded.status_code, headers = excluded.headers,
+            encoding = excluded.encoding, content = excluded.content
+            WHERE excluded.status_code = 200
+                OR {ResponseArchive._TABLE_NAME}.status_code != 200
+            """
+        params = (
+            key,
+            response.status_code,
+            json.dumps(dict(response.headers)),
+            response.encoding,
+            zlib.compress(response.content),
+        )
+        with self._lock, self.conn:
+            self.conn.execute(query, params)
+
+    def get(self, key: str) -> Union[Response, None]:
+        query = f"""
+            SELECT status_code, headers, encoding, content
+            FROM {ResponseArchive._TABLE_NAME} WHERE url = ?
+            """
+        with self._lock:
+            row = self.conn.execute(query, (key,)).fetchone()
+        if row is None:
+            return None
+        status_code, headers, encoding, content = row
+        response = Response()
+        response.status_code = status_code
+        response.headers = CaseInsensitiveDict(json.loads(headers))
+        response.encoding = encoding
+        response._content = zlib.decompress(content)
+        response._content_consumed = True  # type: ignore[attr-defined]
+        response.url = key
+        return response
+
+    def __contains__(self, key: str) -> bool:
+        query = f"SELECT 1 FROM {ResponseArchive._TABLE_NAME} WHERE url = ?"
+        with self._lock:
+            return self.conn.execute(query, (key,)).fetchone() is not None
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class _MappedResponse(Response):
+    """
+    Response whose body is a memoryview of a memory mapped pack file.
+    """
+
+    @property
+    def apparent_encoding(self) -> str:
+        # The charset detection needs bytes, only then the body is copied
+        response = Response()
+        response._content = bytes(self.content)
+        return str(response.apparent_encoding)
+
+
+class PackedResponseArchive:
+    """
+    Response archive in a packed page store, for archives of many pages.
+
+    Every response is one page of the store: a header with the status code,
+    headers and encoding followed by the raw body. Pages are keyed by the
+    SHA1 id of the full request URL, which for article pages is the id of
+    their news record. Replayed bodies are memoryview slices of the memory
+    mapped pack file, neither decompressed nor copied. A slice keeps the
+    mapping alive until it is released.
+    """
+
+    # Length of the JSON header in front of the body
+    _HEADER_LENGTH = struct.Struct("<I")
+
+    def __init__(self, file_path: str) -> None:
+        """
+        Parameters
+        ----------
+        file_path : str
+            Path of the pack file, e.g. "responses.pack". The index is
+            stored next to it, e.g. "responses.idx".
+        """
+        # Imported here, so that importing this module stays cheap
+        from tagesschauscraper.pagestore import PageStore
+
+        self.file_path = file_path
+        self.pageStore = PageStore(os.path.splitext(file_path)[0])
+
+    get_key = staticmethod(ResponseArchive.get_key)
+
+    def put(self, key: str, response: Response) -> None:
+        """
+        Store the response. A stored 200 response is kept, when the page
+        later answers with another status, e.g. 304 or an error.
+        """
+        if response.status_code != 200 and self._get_status_code(key) == 200:
+            return
+        header = json.dumps(
+            {
+                "status_code": response.status_code,
+                "headers": dict(response.headers),
+                "encoding": response.encoding,
+            }
+        ).encode()
+        self.pageStore.put_page(
+            key,
+            self._HEADER_LENGTH.pack(len(header)) + header + response.content,
+        )
+
+    def _read_header(self, page: memoryview) -> Tuple[Dict[str, Any], int]:
+        """
+        Header of the page and the offset of the body.
+        """
+        (header_length,) = self._HEADER_LENGTH.unpack_from(page)
+        header_start = self._HEADER_LENGTH.size
+        body_start = header_start + header_length
+        return json.loads(page[header_start:body_start].tobytes()), body_start
+
+    def _get_status_code(self, key: str) -> Union[int, None]:
+        page = self.pageStore.get_page(key)
+        if page is None:
+            return None
+        with page:
+            header, _ = self._read_header(page)
+        return int(header["status_code"])
+
+    def get(self, key: str) -> Union[Response, None]:
+        page = self.pageStore.get_page(key)
+        if page is None:
+            return None
+        header, body_start = self._read_header(page)
+        response = _MappedResponse()
+        response.status_code = header["status_code"]
+        response.headers = CaseInsensitiveDict(header["headers"])
+        response.encoding = header["encoding"]
+        response._content = page[body_start:]  # type: ignore[assignment]
+        response._content_consumed = True  # type: ignore[attr-defined]
+        response.url = key
+        return response
+
+    def __contains__(self, key: str) -> bool:
+        return self.pageStore.get_id(key) in self.pageStore
+
+    def close(self) -> None:
+        self.pageStore.close()
+
+
+AnyResponseArchive = Union[ResponseArchive, PackedResponseArchive]
+
+
+def open_response_archive(file_path: str) -> AnyResponseArchive:
+    """
+    Response archive of the file: a packed page store for ".pack" files,
+    otherwise SQLite.
+    """
+    if os.path.splitext(file_path)[1] == ".pack":
+        return PackedResponseArchive(file_path)
+    return ResponseArchive(file_path)
+
+
+class RecordingSession(requests.Session):
+    """
+    Session storing every GET response in a response archive.
+    """
+
+    def __init__(self, archive: AnyResponseArchive) -> None:
+        super().__init__()
+        self.archive = archive
+
+    def request(  # type: ignore[override]
+        self, method: str, url: str, params: Any = None, **kwargs: Any
+    ) -> Response:
+        response = super().request(method, url, params=params, **kwargs)
+        if method.upper() == "GET":
+            self.archive.put(self.archive.get_key(url, params), response)
+        return response
+
+
+class ReplaySession(requests.Session):
+    """
+    Session answering GET requests from a response archive without network
+    access.
+    """
+
+    def __init__(self, archive: AnyResponseArchive) -> None:
+        super().__init__()
+        self.archive = archive
+
+    def request(  # type: ignore[override]
+        self, method: str, url: str, params: Any = None, **kwargs: Any
+    ) -> Response:
+        key = self.archive.get_key(url, params)
+        response = self.archive.get(key)
+        if method.upper() != "GET" or response is None:
+            raise ResponseNotRecordedError(f"No recorded response for {key}.")
+        return response
@@ -0,0 +1,358 @@
+"""
+Serializers for writing and reading scraped records.
+"""
+
+import codecs
+import json
+import logging
+import os
+import re
+from abc import ABC, abstractmethod
+from typing import IO, Any, Dict, Iterable, Iterator, Type, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+Record = Dict[str, Any]
+Records = Dict[str, list[Record]]
+
+# Start of the list of records, {"records": [...]} or {"teaser": [...]}
+_RECORDS_START = re.compile(r'"(?:records|teaser)"\s*:\s*\[')
+_SEPARATOR = re.compile(r"[\s,]+")
+_CHUNK_SIZE = 1 << 16
+
+
+def iter_json_records(
+    fp: IO[bytes], chunk_size: int = _CHUNK_SIZE
+) -> Iterator[Record]:
+    """
+    Parse the records of a JSON dump one by one, reading the file in chunks.
+
+    Only the current chunk and the record being parsed are held in memory,
+    not the whole file.
+
+    Raises
+    ------
+    ValueError
+        When the file has no list of records or is truncated.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    match = None
+    while match is None:
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            raise ValueError("No list of records in the dump.")
+        buffer += utf8.decode(chunk)
+        match = _RECORDS_START.search(buffer)
+    position = match.end()
+    eof = False
+    while True:
+        separator = _SEPARATOR.match(buffer, position)
+        if separator is not None:
+            position = separator.end()
+        if position < len(buffer):
+            if buffer[position] == "]":
+                return
+            try:
+                record, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # The record continues in the next chunk
+                pass
+            else:
+                yield record
+                continue
+        if eof:
+            raise ValueError("Invalid or truncated dump.")
+        chunk = fp.read(chunk_size)
+        eof = not chunk
+        buffer = buffer[position:] + utf8.decode(chunk, final=eof)
+        position = 0
+
+
+class Serializer(ABC):
+    """
+    Format of files with scraped records, i.e. {"records": [...]}.
+
+    Records are encoded and decoded one at a time, so that writing and
+    reading a file does not need the whole encoded file in memory.
+    """
+
+    name = ""
+    extension = ""
+
+    @abstractmethod
+    def dump_records(self, records: Iterable[Record], fp: IO[bytes]) -> int:
+        """
+        Write the records to the binary file.
+
+        Returns
+        -------
+        int
+            Number of records written.
+        """
+
+    @abstractmethod
+    def iter_records(
+        self, fp: IO[bytes], chunk_size: int = _CHUNK_SIZE
+    ) -> Iterator[Record]:
+        """
+        Read the records of the binary file one by one.
+
+        Raises
+        ------
+        ValueError
+            When the file is not a valid dump.
+        """
+
+    def dump(self, data: Records, fp: IO[bytes]) -> None:
+        self.dump_records(data["records"], fp)
+
+    def load(self, fp: IO[bytes]) -> Records:
+        return {"records": list(self.iter_records(fp))}
+
+
+class _JSONLayout(Serializer):
+    """
+    JSON object with the list of records, written record by record.
+    """
+
+    extension = ".json"
+    # Written before the first record, between records, after the last
+    # record and after no record at all
+    _start = b'{"records": ['
+    _first_separator = b""
+    _separator = b", "
+    _end = b"]}"
+    _empty_end = b"]}"
+    # Indentation of the lines of a record
+    _record_indent = b""
+
+    @abstractmethod
+    def _encode(self, record: Record) -> bytes:
+        """
+        Encode one record as JSON.
+        """
+
+    def dump_records(self, records: Iterable[Record], fp: IO[bytes]) -> int:
+        count = 0
+        fp.write(self._start)
+        for record in records:
+            fp.write(self._separator if count else self._first_separator)
+            data = self._encode(record)
+            if self._record_indent:
+                data = data.replace(b"\n", b"\n" + self._record_indent)
+            fp.write(data)
+            count += 1
+        fp.write(self._end if count else self._empty_end)
+        return count
+
+    def iter_records(
+        self, fp: IO[bytes], chunk_size: int = _CHUNK_SIZE
+    ) -> Iterator[Record]:
+        return iter_json_records(fp, chunk_size)
+
+
+class JSONSerializer(_JSONLayout):
+    """
+    JSON of the standard library. With an indent of 4 the output is the
+    same as of json.dump(records, fp, indent=4).
+    """
+
+    name = "json"
+
+    def __init__(self, indent: Union[int, None] = 4) -> None:
+        """
+        Parameters
+        ----------
+        indent : int, optional
+            Indentation of nested objects, by default 4. None for a compact
+            single line.
+        """
+        self.indent = indent
+        if indent is not None:
+            pad = b" " * indent
+            self._start = b"{\n" + pad + b'"records": ['
+            self._first_separator = b"\n" + pad * 2
+            self._separator = b"," + self._first_separator
+            self._end = b"\n" + pad + b"]\n}"
+            self._empty_end = b"]\n}"
+            self._record_indent = pad * 2
+
+    def _encode(self, record: Record) -> bytes:
+        return json.dumps(record, indent=self.indent).encode()
+
+
+class OrjsonSerializer(_JSONLayout):
+    """
+    Compact UTF-8 JSON encoded by orjson, several times faster than the
+    standard library. The files are read like any other JSON dump.
+
+    Requires the extra: pip install tagesschauscraper[fast]
+    """
+
+    name = "orjson"
+    _start = b'{"records":['
+    _separator = b","
+
+    def __init__(self) -> None:
+        """
+        Raises
+        ------
+        ImportError
+            When orjson is not installed.
+        """
+        if orjson is None:
+            raise ImportError(
+                "The orjson serializer requires orjson, install it with"
+                " pip install tagesschauscraper[fast]"
+            )
+
+    def _encode(self, record: Record) -> bytes:
+        data: bytes = orjson.dumps(record)
+        return data
+
+    def load(self, fp: IO[bytes]) -> Records:
+        data = orjson.loads(fp.read())
+        # Older dumps of teaser only
+        key = "records" if "records" in data else "teaser"
+        return {"records": data[key]}
+
+
+class MsgpackSerializer(Serializer):
+    """
+    Binary msgpack. A file is a sequence of records, one msgpack map each,
+    so that records can be appended and read without a closing bracket.
+
+    Requires the extra: pip install tagesschauscraper[msgpack]
+    """
+
+    name = "msgpack"
+    extension = ".msgpack"
+
+    def __init__(self) -> None:
+        """
+        Raises
+        ------
+        ImportError
+            When msgpack is not installed.
+        """
+        if msgpack is None:
+            raise ImportError(
+                "The msgpack serializer requires msgpack, install it with"
+                " pip install tagesschauscraper[msgpack]"
+            )
+
+    def dump_records(self, records: Iterable[Record], fp: IO[bytes]) -> int:
+        packer = msgpack.Packer()
+        count = 0
+        for record in records:
+            fp.write(packer.pack(record))
+            count += 1
+        return count
+
+    def iter_records(
+        self, fp: IO[bytes], chunk_size: int = _CHUNK_SIZE
+    ) -> Iterator[Record]:
+        unpacker = msgpack.Unpacker(raw=False)
+        size = 0
+        while True:
+            chunk = fp.read(chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            unpacker.feed(chunk)
+            try:
+                yield from unpacker
+            except ValueError as e:
+                raise ValueError(f"Invalid dump: {e}") from e
+        if unpacker.tell() != size:
+            raise ValueError("Truncated dump.")
+
+
+SERIALIZERS: Dict[str, Type[Serializer]] = {
+    "json": JSONSerializer,
+    "orjson": OrjsonSerializer,
+    "msgpack": MsgpackSerializer,
+}
+
+
+def get_serializer(name: str = "json") -> Serializer:
+    """
+    Serializer of the format, one of SERIALIZERS.
+
+    Raises
+    ------
+    ValueError
+        When the format is unknown.
+    ImportError
+        When the package of the format is not installed.
+    """
+    if name not in SERIALIZERS:
+        raise ValueError(f"Format must be one of {list(SERIALIZERS)}.")
+    return SERIALIZERS[name]()
+
+
+def get_serializer_for_path(file_path: str) -> Serializer:
+    """
+    Serializer for reading the file, chosen by its extension. JSON files
+    are read with orjson when it is installed.
+    """
+    if os.path.splitext(file_path)[1] == MsgpackSerializer.extension:
+        return MsgpackSerializer()
+    if orjson is not None:
+        return OrjsonSerializer()
+    return JSONSerializer()
+
+
+def write_records(
+    file_path: str,
+    records: Union[Records, Iterable[Record]],
+    serializer: Union[Serializer, None] = None,
+) -> int:
+    """
+    Write the records to the file, by default as indented JSON.
+
+    Returns
+    -------
+    int
+        Number of records written.
+    """
+    if serializer is None:
+        serializer = JSONSerializer()
+    if isinstance(records, dict):
+        records = records["records"]
+    with open(file_path, "wb") as fp:
+        return serializer.dump_records(records, fp)
+
+
+def read_records(
+    file_path: str, chunk_size: int = _CHUNK_SIZE
+) -> Iterator[Record]:
+    """
+    Read the records of the file one by one, in the format of its extension.
+
+    Only the current chunk and the record being decoded are held in memory,
+    not the whole file.
+
+    Raises
+    ------
+    ValueError
+        When the file is not a valid dump.
+    """
+    serializer = get_serializer_for_path(file_path)
+    with open(file_path, "rb") as fp:
+        try:
+            yield from serializer.iter_records(fp, chunk_size)
+        except ValueError as e:
+            raise ValueError(f"{file_path}: {e}") from e
@@ -0,0 +1,254 @@
+"""
+Long-running service polling the news archive on a schedule.
+"""
+
+import json
+import logging
+import threading
+import time
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Union
+from tagesschauscraper.changes import ArchiveChangeTracker
+from tagesschauscraper.tagesschau import (
+    ArchiveFilter,
+    NewsRecord,
+    ScraperConfig,
+    TagesschauScraper,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ScraperService:
+    """
+    Poll the archive of the current day in a fixed interval and pass newly
+    appeared records to a writer.
+
+    The session, the archive pages, their fingerprints and the ids of all
+    emitted records are kept in memory between polls, so that a poll only
+    fetches what is new. Fingerprints and ids only advance, when the records
+    of a day were written. When the day rolls over, the previous day is
+    polled and written a last time and its state is dropped.
+    """
+
+    def __init__(
+        self,
+        writer: Callable[[list[NewsRecord]], None],
+        category: str = "all",
+        interval: float = 60.0,
+        scraper: Union[TagesschauScraper, None] = None,
+        tracker: Union[ArchiveChangeTracker, None] = None,
+        today: Callable[[], date] = date.today,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        writer : Callable
+            Function called with the new records of each polled day.
+        category : str, optional
+            News category, by default "all".
+        interval : float, optional
+            Seconds between the start of two polls, by default 60.
+        scraper : TagesschauScraper, optional
+            Scraper used for all polls, by default a new one.
+        tracker : ArchiveChangeTracker, optional
+            Fingerprints of the archive pages, by default an in-memory one.
+        today : Callable, optional
+            Function returning the date to poll, by default date.today.
+        """
+        self.writer = writer
+        self.category = category
+        self.interval = interval
+        self.scraper = scraper if scraper is not None else TagesschauScraper()
+        self.tracker = (
+            tracker if tracker is not None else ArchiveChangeTracker()
+        )
+        self.today = today
+        self.seen_ids: set[str] = set()
+        # Day of the last poll and its archive pages
+        self.day: Union[date, None] = None
+        self._config: Union[ScraperConfig, None] = None
+        self.status: Dict[str, Any] = {
+            "running": False,
+            "polls": 0,
+            "records": 0,
+            "last_poll": None,
+            "last_duration": None,
+            "last_error": None,
+        }
+        self._stop_event = threading.Event()
+        self._poll_event = threading.Event()
+        self._lock = threading.Lock()
+
+    def poll(self) -> list[NewsRecord]:
+        """
+        Scrape the archive once and write the records not seen before.
+        """
+        with self._lock:
+            start_time = time.time()
+            today = self.today()
+            records: list[NewsRecord] = []
+            if self.day is not None and self.day != today:
+                try:
+                    # News of the last interval of the previous day
+                    records.extend(self._poll_day())
+                finally:
+                    self._roll_over(today)
+            if self._config is None:
+                self.day = today
+                self._config = ScraperConfig(
+                    ArchiveFilter({"date": today, "category": self.category}),
+                    session=self.scraper.session,
+                    paginate=False,
+                )
+            records.extend(self._poll_day())
+            self.status["polls"] += 1
+            self.status["last_poll"] = datetime.now().isoformat()
+            self.status["last_duration"] = round(time.time() - start_time, 3)
+            logger.info(f"Poll found {len(records)} new records.")
+            return records
+
+    def _poll_day(self) -> list[NewsRecord]:
+        """
+        Scrape and write the new records of the polled day. The tracker is
+        reset, when they could not be written.
+        """
+        assert self._config is not None
+        snapshot = self.tracker.snapshot()
+        try:
+            records = [
+                record
+                for record in self.scraper.get_new_news_from_archive(
+                    self._config, self.tracker
+                )["records"]
+                if record["id"] not in self.seen_ids
+            ]
+            if records:
+                self.writer(records)
+        except Exception:
+            self.tracker.restore(snapshot)
+            raise
+        self.seen_ids.update(str(record["id"]) for record in records)
+        self.status["records"] += len(records)
+        return records
+
+    def _roll_over(self, today: date) -> None:
+        """
+        Drop the state of all days before today.
+        """
+        logger.info(f"Day rolled over from {self.day} to {today}.")
+        self.seen_ids.clear()
+        self._config = None
+        self.tracker.prune(
+            [ArchiveFilter({"date": today}).processed_params["datum"]]
+        )
+
+    def run(self) -> None:
+        """
+        Poll until stop() is called. Errors of a single poll are logged and
+        do not end the service.
+        """
+        self._stop_event.clear()
+        self.status["running"] = True
+        try:
+            while not self._stop_event.is_set():
+                start_time = time.time()
+                try:
+                    self.poll()
+                    self.status["last_error"] = None
+                except Exception as e:
+                    logger.exception("Poll failed.")
+                    self.status["last_error"] = repr(e)
+                self._poll_event.wait(
+                    max(0.0, self.interval - (time.time() - start_time))
+                )
+                self._poll_event.clear()
+        finally:
+            self.status["running"] = False
+
+    def trigger(self) -> None:
+        """
+        Start the next poll immediately.
+        """
+        self._poll_event.set()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._poll_event.set()
+
+    def get_status(self) -> Dict[str, Any]:
+        return self.status | {"seen_ids": len(self.seen_ids)}
+
+
+class ControlServer:
+    """
+    Local HTTP endpoint for controlling a running ScraperService.
+
+    * GET /status returns the service status as JSON.
+    * POST /poll starts the next poll immediately.
+    * POST /stop stops the service.
+    """
+
+    def __init__(
+        self, service: ScraperService, host: str = "127.0.0.1", port: int = 0
+    ) -> None:
+        """
+        Parameters
+        ----------
+        service : ScraperService
+            Service to control.
+        host : str, optional
+            Host to bind to, by default localhost only.
+        port : int, optional
+            Port to bind to, by default any free port.
+        """
+        self.service = service
+        self.httpd = ThreadingHTTPServer((host, port), self._create_handler())
+        self.port = self.httpd.server_address[1]
+        self._thread: Union[threading.Thread, None] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self.httpd.serve_forever, name="control-server", daemon=True
+        )
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _create_handler(self) -> type:
+        service = self.service
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path == "/status":
+                    self._send(200, service.get_status())
+                else:
+                    self._send(404, {"error": "not found"})
+
+            def do_POST(self) -> None:
+                if self.path == "/poll":
+                    service.trigger()
+                    self._send(202, {"poll": "triggered"})
+                elif self.path == "/stop":
+                    service.stop()
+                    self._send(202, {"stop": "triggered"})
+                else:
+                    self._send(404, {"error": "not found"})
+
+            def _send(self, status: int, body: Dict[str, Any]) -> None:
+                content = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                logger.debug(format % args)
+
+        return Handler
@@ -0,0 +1,177 @@
+"""
+Incremental extraction of full articles from streamed responses.
+"""
+
+import codecs
+import logging
+from html.parser import HTMLParser
+from typing import Dict, Iterable, Tuple, Union
+import requests
+from tagesschauscraper import retrieve
+
+logger = logging.getLogger(__name__)
+
+ArticleRecord = Dict[str, str]
+Attributes = list[Tuple[str, Union[str, None]]]
+
+# Elements to capture text from: (tag, class) -> field name
+TEXT_ELEMENTS = {
+    ("span", "seitenkopf__topline"): "topline",
+    ("span", "seitenkopf__headline--text"): "headline",
+    ("div", "metatextline"): "metatextline",
+    ("p", "textabsatz"): "text",
+    ("h2", "meldung__subhead"): "subheadings",
+    ("a", "tag-btn"): "tags",
+}
+# <meta name=...> elements: name -> field name
+META_ELEMENTS = {
+    "author": "author",
+    "date": "date_published",
+    "description": "description",
+}
+
+
+class ArticleStreamParser(HTMLParser):
+    """
+    Parse an article page chunk by chunk and collect the article content.
+
+    The parser is done, when the tag list or the <article> element is
+    closed. Everything after it is never parsed.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.fields: Dict[str, list[str]] = {
+            field: [] for field in TEXT_ELEMENTS.values()
+        }
+        self.meta: Dict[str, str] = dict()
+        self.done = False
+        self._article_depth = 0
+        self._in_taglist = False
+        self._capture: Union[Tuple[str, str, int], None] = None
+        self._buffer: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs: Attributes) -> None:
+        if self.done:
+            return
+        attributes = dict(attrs)
+        classes = (attributes.get("class") or "").split()
+        if tag == "meta" and attributes.get("name") in META_ELEMENTS:
+            field = META_ELEMENTS[attributes["name"]]  # type: ignore
+            self.meta[field] = (attributes.get("content") or "").strip()
+        elif tag == "article":
+            self._article_depth += 1
+        elif tag == "ul" and "taglist" in classes:
+            self._in_taglist = True
+        if self._capture is not None:
+            field, capture_tag, depth = self._capture
+            if tag == capture_tag:
+                self._capture = (field, capture_tag, depth + 1)
+            return
+        for class_name in classes:
+            field_name = TEXT_ELEMENTS.get((tag, class_name))
+            if field_name == "tags" and not self._in_taglist:
+                continue
+            if field_name is not None:
+                self._capture = (field_name, tag, 1)
+                self._buffer = []
+                return
+
+    def handle_endtag(self, tag: str) -> None:
+        if self.done:
+            return
+        if self._capture is not None:
+            field, capture_tag, depth = self._capture
+            if tag == capture_tag:
+                if depth > 1:
+                    self._capture = (field, capture_tag, depth - 1)
+                else:
+                    text = " ".join("".join(self._buffer).split())
+                    if text:
+                        self.fields[field].append(text)
+                    self._capture = None
+        if tag == "ul" and self._in_taglist:
+            self._in_taglist = False
+            self.done = True
+        elif tag == "article" and self._article_depth > 0:
+            self._article_depth -= 1
+            if self._article_depth == 0:
+                self.done = True
+
+    def handle_data(self, data: str) -> None:
+        if self._capture is not None and not self.done:
+            self._buffer.append(data)
+
+    def get_data(self) -> ArticleRecord:
+        return {
+            "topline": " ".join(self.fields["topline"]),
+            "headline": " ".join(self.fields["headline"]),
+            "metatextline": " ".join(self.fields["metatextline"]),
+            "subheadings": "\n".join(self.fields["subheadings"]),
+            "text": "\n".join(self.fields["text"]),
+            "tags": ",".join(sorted(self.fields["tags"])),
+            "author": self.meta.get("author", ""),
+            "date_published": self.meta.get("date_published", ""),
+            "description": self.meta.get("description", ""),
+        }
+
+
+class StreamingArticle:
+    """
+    Extract the full article, i.e. text, subheadings, tags, author and
+    publish metadata, from a streamed response without holding the whole
+    page or a parse tree in memory.
+    """
+
+    def __init__(
+        self, max_bytes: int = 2**20, chunk_size: int = 2**14
+    ) -> None:
+        """
+        Parameters
+        ----------
+        max_bytes : int, optional
+            Maximum number of bytes read from the response, by default 1 MiB.
+            The extraction stops, when the limit is reached.
+        chunk_size : int, optional
+            Number of bytes read at once, by default 16 KiB.
+        """
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+
+    def extract_from_chunks(
+        self, chunks: Iterable[bytes], encoding: str = "utf-8"
+    ) -> ArticleRecord:
+        parser = ArticleStreamParser()
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        bytes_read = 0
+        for chunk in chunks:
+            bytes_read += len(chunk)
+            parser.feed(decoder.decode(chunk))
+            if parser.done:
+                break
+            if bytes_read >= self.max_bytes:
+                logger.warning(
+                    f"Stopped article extraction after {bytes_read} bytes."
+                )
+                break
+        return parser.get_data()
+
+    def extract_from_response(
+        self, response: requests.Response
+    ) -> ArticleRecord:
+        """
+        Extract the article from a response requested with stream=True.
+
+        Raises
+        ------
+        retrieve.HTTPStatusError
+            When the status code is not 200.
+        """
+        try:
+            retrieve.check_status(response)
+            return self.extract_from_chunks(
+                response.iter_content(chunk_size=self.chunk_size),
+                encoding=response.encoding or "utf-8",
+            )
+        finally:
+            response.close()
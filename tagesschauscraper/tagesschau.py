@@ -1,10 +1,16 @@
-import sqlite3
+import logging
 from datetime import date
-from typing import Dict, Union
+from typing import Any, Dict, Tuple, Union
 import requests
 from bs4 import BeautifulSoup
 from bs4.element import Tag
-from tagesschauscraper import constants, helper, retrieve
+from tagesschauscraper import constants, helper, profiling, retrieve
+from tagesschauscraper.changes import ArchiveChangeTracker
+from tagesschauscraper.dedup import ContentStore
+from tagesschauscraper.extraction import ExtractionSpec, Field
+from tagesschauscraper.failures import FailureLedger
+from tagesschauscraper.parsecache import ParseCache
+from tagesschauscraper.streaming import StreamingArticle
 
 ARCHIVE_URL = "https://www.tagesschau.de/archiv/"
 NEWS_CATEGORIES = ["wirtschaft", "inland", "ausland"]
@@ -12,7 +18,96 @@ RequestParams = Dict[str, str]
 TeaserRecord = Dict[str, str]
 ArticleRecord = Dict[str, str]
 NewsId = str
-NewsRecord = Dict[str, Union[NewsId, TeaserRecord, ArticleRecord]]
+NewsRecord = Dict[str, Union[NewsId, TeaserRecord, ArticleRecord, list[str]]]
+
+logger = logging.getLogger(__name__)
+
+# All selectors of the site markup. Update these, when the markup changes.
+# Increase the revision of a spec, when the processing of its records
+# changes, so that results in parse caches are dropped.
+ARCHIVE_HEADLINE_CLASS = "archive__headline"
+TEASER_SPEC = ExtractionSpec(
+    [
+        Field("date", class_="teaser-xs__date"),
+        Field("topline", class_="teaser-xs__topline"),
+        Field("headline", class_="teaser-xs__headline"),
+        Field("shorttext", class_="teaser-xs__shorttext"),
+        Field("link", class_="teaser-xs__link", attr="href"),
+    ],
+    root="columns teaser-xs twelve teaser-xs__wide",
+)
+ARCHIVE_SPEC = ExtractionSpec(
+    [
+        Field("headline", class_=ARCHIVE_HEADLINE_CLASS, separator="\n"),
+        Field("num_teaser", class_="ergebnisse__anzahl", separator="\n"),
+        Field(
+            "pages",
+            tag="li",
+            within="paginierung__liste",
+            multiple=True,
+            separator="",
+        ),
+    ]
+)
+ARTICLE_SPEC = ExtractionSpec(
+    [
+        Field(
+            "tags",
+            class_="tag-btn tag-btn--light-grey",
+            within="taglist",
+            multiple=True,
+            separator="",
+        ),
+        Field("paragraphs", class_="textabsatz", tag="p", multiple=True),
+    ]
+)
+
+
+def extract_response(
+    extractor: str,
+    spec: ExtractionSpec,
+    response: requests.Response,
+    parse_cache: Union[ParseCache, None] = None,
+    release: bool = False,
+) -> Dict[str, Any]:
+    """
+    Extract the fields of the spec from the response.
+
+    With a parse cache, an unchanged page is not parsed again.
+
+    Parameters
+    ----------
+    extractor : str
+        Name of the extractor in the parse cache.
+    spec : ExtractionSpec
+        Fields to extract. Its version is the version of the extractor.
+    response : requests.Response
+        Response of the page.
+    parse_cache : ParseCache, optional
+        Cache of extraction results.
+    release : bool, optional
+        Release the parsed tree right after the extraction, by default
+        False.
+
+    Raises
+    ------
+    retrieve.HTTPStatusError
+        When the status code of the response is not 200.
+    """
+
+    def extract() -> Dict[str, Any]:
+        soup = retrieve.get_soup(response)
+        record = spec.extract(soup)
+        if release:
+            retrieve.release_soup(soup)
+        return record
+
+    if parse_cache is None:
+        return extract()
+    retrieve.check_status(response)
+    return parse_cache.get_or_extract(
+        extractor, spec.version, response.text, extract
+    )
 
 
 class ArchiveFilter:
@@ -113,8 +208,38 @@ class ScraperConfig:
     """
 
     def __init__(
-        self, archive_filter: Union[ArchiveFilter, list[ArchiveFilter]]
+        self,
+        archive_filter: Union[ArchiveFilter, list[ArchiveFilter]],
+        session: Union[requests.Session, None] = None,
+        parse_cache: Union[ParseCache, None] = None,
+        bounded_memory: bool = False,
+        failure_ledger: Union[FailureLedger, None] = None,
+        paginate: bool = True,
     ) -> None:
+        """
+        Parameters
+        ----------
+        archive_filter : ArchiveFilter or list[ArchiveFilter]
+            Archives to scrape.
+        session : requests.Session, optional
+            Session used for the pagination requests.
+        parse_cache : ParseCache, optional
+            Cache of the pagination extraction results.
+        bounded_memory : bool, optional
+            Release the parsed first pages right after the extraction.
+        failure_ledger : FailureLedger, optional
+            When provided, archives whose first page failed are recorded in
+            the ledger and skipped instead of aborting the run.
+        paginate : bool, optional
+            Fetch the first page of every archive for the number of pages,
+            by default True. Otherwise only the first pages are requested,
+            e.g. by get_new_news_from_archive, which adds the further pages
+            when it fetches the first ones anyway.
+        """
+        self.session = session if session is not None else requests.Session()
+        self.parse_cache = parse_cache
+        self.bounded_memory = bounded_memory
+        self.failure_ledger = failure_ledger
         if not isinstance(archive_filter, list):
             self.archive_filters = [archive_filter]
         else:
@@ -122,22 +247,54 @@ class ScraperConfig:
 
         self.request_params = []
         for f in self.archive_filters:
-            self.request_params.extend(
-                self.extend_request_params_with_pagination(f.processed_params)
-            )
+            if paginate:
+                self.request_params.extend(
+                    self.extend_request_params_with_pagination(
+                        f.processed_params
+                    )
+                )
+            else:
+                self.request_params.append(
+                    f.processed_params | {"pageIndex": "1"}
+                )
 
     def get_archive_soup_from_params(
         self, params: RequestParams
     ) -> BeautifulSoup:
-        response = requests.get(ARCHIVE_URL, params=params)
+        response = self.session.get(ARCHIVE_URL, params=params)
         return retrieve.get_soup(response)
 
     def extend_request_params_with_pagination(
         self, request_params: RequestParams
     ) -> list[RequestParams]:
-        soup = self.get_archive_soup_from_params(request_params)
-        archive = Archive(soup)
-        pagination = archive.extract_pagination()
+        """
+        Request parameters of all pages of the archive.
+
+        With a failure ledger, a failed first page is recorded under its
+        full URL as kind "pagination" and no pages are returned.
+        """
+        request_url = retrieve.get_request_url(ARCHIVE_URL, request_params)
+        try:
+            with profiling.stage("paginate"):
+                response = self.session.get(ARCHIVE_URL, params=request_params)
+                archive = Archive(
+                    None,
+                    extracted=extract_response(
+                        "archive",
+                        ARCHIVE_SPEC,
+                        response,
+                        self.parse_cache,
+                        release=self.bounded_memory,
+                    ),
+                )
+                pagination = archive.extract_pagination()
+        except Exception as e:
+            if self.failure_ledger is None:
+                raise
+            self.failure_ledger.record(request_url, e, kind="pagination")
+            return []
+        if self.failure_ledger is not None:
+            self.failure_ledger.resolve(request_url)
         return [request_params | p for p in pagination]
 
 
@@ -146,20 +303,256 @@ class TagesschauScraper:
     A web scraper specified for scraping the news archive of Tagesschau.de.
     """
 
-    def __init__(self) -> None:
-        self.validation_element = {"class": "archive__headline"}
+    def __init__(
+        self,
+        session: Union[requests.Session, None] = None,
+        content_store: Union[ContentStore, None] = None,
+        streaming_article: Union[StreamingArticle, None] = None,
+        failure_ledger: Union[FailureLedger, None] = None,
+        parse_cache: Union[ParseCache, None] = None,
+        bounded_memory: bool = False,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        session : requests.Session, optional
+            Session used for all requests, so that connections are reused.
+            A new session is created when no session is provided.
+        content_store : ContentStore, optional
+            Store of already extracted articles. Articles whose link is in the
+            store are requested conditionally and reused, when the server
+            answers 304 Not Modified.
+        streaming_article : StreamingArticle, optional
+            When provided, the full article is extracted from the streamed
+            response instead of the article tags only.
+        failure_ledger : FailureLedger, optional
+            When provided, failed archive pages and articles are recorded in
+            the ledger and skipped instead of aborting the run.
+        parse_cache : ParseCache, optional
+            Cache of the teaser and article extraction results. Unchanged
+            pages are not parsed again.
+        bounded_memory : bool, optional
+            Release every parsed page right after the extraction, so that
+            memory stays flat in long runs, by default False.
+        """
+        self.validation_element = {"class": ARCHIVE_HEADLINE_CLASS}
+        self.session = session if session is not None else requests.Session()
+        self.content_store = content_store
+        self.streaming_article = streaming_article
+        self.failure_ledger = failure_ledger
+        self.parse_cache = parse_cache
+        self.bounded_memory = bounded_memory
+
+    def get_archive_response(
+        self,
+        params: RequestParams,
+        headers: Union[Dict[str, str], None] = None,
+    ) -> requests.Response:
+        with profiling.stage("fetch-archive"):
+            return self.session.get(
+                ARCHIVE_URL, params=params, headers=headers
+            )
 
     def get_news_from_archive(
         self, config: ScraperConfig
     ) -> Dict[str, list[NewsRecord]]:
         records = []
         for params in config.request_params:
-            response = requests.get(ARCHIVE_URL, params=params)
-            records.extend(
-                self.scrape_teaser_and_articles(response)["records"]
+            records.extend(self.scrape_archive_page(ARCHIVE_URL, params))
+        return {"records": records}
+
+    def scrape_archive_page(
+        self, url: str, params: Union[RequestParams, None] = None
+    ) -> list[NewsRecord]:
+        """
+        Scrape all teaser and articles of one archive page.
+
+        With a failure ledger, a failed archive page is recorded under its
+        full URL and no records are returned.
+        """
+        request_url = retrieve.get_request_url(url, params)
+        try:
+            with profiling.stage("fetch-archive"):
+                response = self.session.get(url, params=params)
+            records = self.scrape_teaser_and_articles(response)["records"]
+        except Exception as e:
+            if self.failure_ledger is None:
+                raise
+            self.failure_ledger.record(request_url, e, kind="archive")
+            return []
+        if self.failure_ledger is not None:
+            self.failure_ledger.resolve(request_url)
+        return records
+
+    def scrape_archive_teaser(
+        self, params: RequestParams
+    ) -> Union[Tuple[list[TeaserRecord], "Archive"], None]:
+        """
+        Fetch an archive page and extract its teaser and archive information,
+        without scraping the articles.
+
+        The page is parsed once, or not at all with a parse cache hit, and
+        released right away in bounded memory mode.
+
+        Parameters
+        ----------
+        params : dict
+            Request parameters of the archive page.
+
+        Returns
+        -------
+        tuple or None
+            Teaser of the page and the archive with the extracted
+            information. None, when the page failed and was recorded in the
+            failure ledger, as kind "pagination" for a first page.
+        """
+        request_url = retrieve.get_request_url(ARCHIVE_URL, params)
+        try:
+            response = self.get_archive_response(params)
+            if self.parse_cache is None:
+                with profiling.stage("parse-teaser"):
+                    soup = self.get_archive_soup(response)
+                    archive = Archive(soup)
+                    teasers = self._extract_all_teaser(soup)["records"]
+                    if self.bounded_memory:
+                        archive.release()
+            else:
+                teasers, archive = self._extract_cached_archive(response)
+        except Exception as e:
+            if self.failure_ledger is None:
+                raise
+            kind = (
+                "pagination" if params.get("pageIndex") == "1" else "archive"
+            )
+            self.failure_ledger.record(request_url, e, kind=kind)
+            return None
+        if self.failure_ledger is not None:
+            self.failure_ledger.resolve(request_url)
+        return teasers, archive
+
+    def _extract_cached_archive(
+        self, response: requests.Response
+    ) -> Tuple[list[TeaserRecord], "Archive"]:
+        """
+        Teaser and archive information through the parse cache. On a miss of
+        either, the page is parsed once for both extractors.
+        """
+        assert self.parse_cache is not None
+        retrieve.check_status(response)
+        soup: Union[BeautifulSoup, None] = None
+
+        def get_soup() -> BeautifulSoup:
+            nonlocal soup
+            if soup is None:
+                soup = self.get_archive_soup(response)
+            return soup
+
+        with profiling.stage("parse-teaser"):
+            teasers = self.parse_cache.get_or_extract(
+                "teaser",
+                TEASER_SPEC.version,
+                response.text,
+                lambda: self._extract_all_teaser(get_soup())["records"],
+            )
+            extracted = self.parse_cache.get_or_extract(
+                "archive",
+                ARCHIVE_SPEC.version,
+                response.text,
+                lambda: ARCHIVE_SPEC.extract(get_soup()),
+            )
+            if soup is not None and self.bounded_memory:
+                retrieve.release_soup(soup)
+        return teasers, Archive(None, extracted=extracted)
+
+    def get_new_news_from_archive(
+        self, config: ScraperConfig, tracker: ArchiveChangeTracker
+    ) -> Dict[str, list[NewsRecord]]:
+        """
+        Scrape only teaser and articles that newly appeared since the last
+        call with the same tracker.
+
+        Archive pages, which did not change, are neither parsed nor are their
+        articles fetched again. Pages of an archive that appeared since the
+        last call are added to the request parameters of the config, when
+        its first page changed.
+
+        The tracker is only updated, when the call returns, so that no new
+        teaser is lost when it raises. Teaser whose article failed stay new
+        and their pages are parsed again by the next call.
+
+        Parameters
+        ----------
+        config : ScraperConfig
+            Archive pages to scrape.
+        tracker : ArchiveChangeTracker
+            Fingerprints of the archive pages from previous calls.
+
+        Returns
+        -------
+        dict
+            Scraped teaser and article data of new teaser.
+        """
+        records: list[NewsRecord] = []
+        # Pages and their teaser links, remembered after all pages
+        pages: list[Tuple[RequestParams, requests.Response, list[str]]] = []
+        # Archive key and link of the teaser handled, and failed, in this call
+        handled: set[Tuple[str, str]] = set()
+        failed: set[Tuple[str, str]] = set()
+        for params in config.request_params:
+            response = self.get_archive_response(
+                params, headers=tracker.get_request_headers(params)
             )
+            if tracker.is_unchanged(params, response):
+                continue
+            if params.get("pageIndex") == "1":
+                # Appended pages are visited by this loop as well
+                config.request_params.extend(
+                    page_params
+                    for page_params in self._get_pagination(params, response)
+                    if page_params not in config.request_params
+                )
+            all_teaser = self.scrape_teaser(response)["records"]
+            links = [teaser_data["link"] for teaser_data in all_teaser]
+            archive_key = tracker.get_archive_key(params)
+            new_links = set(tracker.get_new_links(params, links))
+            for teaser_data in all_teaser:
+                key = (archive_key, teaser_data["link"])
+                if teaser_data["link"] not in new_links or key in handled:
+                    continue
+                handled.add(key)
+                record = self._merge_teaser_and_article_tags(teaser_data)
+                if self.is_failed(teaser_data["link"]):
+                    failed.add(key)
+                else:
+                    records.append(record)
+            pages.append((params, response, links))
+        for params, response, links in pages:
+            archive_key = tracker.get_archive_key(params)
+            done = [
+                link for link in links if (archive_key, link) not in failed
+            ]
+            if len(done) < len(links):
+                tracker.mark_seen(params, done)
+            else:
+                tracker.update(params, response, links)
         return {"records": records}
 
+    def _get_pagination(
+        self, params: RequestParams, response: requests.Response
+    ) -> list[RequestParams]:
+        with profiling.stage("paginate"):
+            archive = Archive(
+                None,
+                extracted=extract_response(
+                    "archive",
+                    ARCHIVE_SPEC,
+                    response,
+                    self.parse_cache,
+                    release=self.bounded_memory,
+                ),
+            )
+            return [params | page for page in archive.extract_pagination()]
+
     def scrape_teaser(
         self, response: requests.Response
     ) -> Dict[str, list[TeaserRecord]]:
@@ -177,9 +570,36 @@ class TagesschauScraper:
         dict
             Scraped teaser.
         """
+
+        def extract() -> list[TeaserRecord]:
+            soup = self.get_archive_soup(response)
+            records = self._extract_all_teaser(soup)["records"]
+            if self.bounded_memory:
+                retrieve.release_soup(soup)
+            return records
+
+        with profiling.stage("parse-teaser"):
+            if self.parse_cache is None:
+                return {"records": extract()}
+            retrieve.check_status(response)
+            records = self.parse_cache.get_or_extract(
+                "teaser", TEASER_SPEC.version, response.text, extract
+            )
+            return {"records": records}
+
+    def get_archive_soup(self, response: requests.Response) -> BeautifulSoup:
+        """
+        Parse an archive response after validating that it is an archive
+        page.
+
+        Raises
+        ------
+        ValueError
+            When the archive headline cannot be found.
+        """
         websiteTest = retrieve.WebsiteTest(response)
         if websiteTest.is_element(attrs=self.validation_element):
-            return self._extract_all_teaser(websiteTest.soup)
+            return websiteTest.soup
         else:
             raise ValueError(
                 f"HTML element with specifications {self.validation_element}  "
@@ -203,21 +623,21 @@ class TagesschauScraper:
             Scraped teaser and article data.
         """
         all_teaser = self.scrape_teaser(response)["records"]
-        teaser_and_article_data = [
-            self._merge_teaser_and_article_tags(teaser_data)
-            for teaser_data in all_teaser
-        ]
+        teaser_and_article_data = []
+        for teaser_data in all_teaser:
+            record = self._merge_teaser_and_article_tags(teaser_data)
+            # Failed articles are left to a retry, an empty article would
+            # look like an article without tags
+            if not self.is_failed(teaser_data["link"]):
+                teaser_and_article_data.append(record)
         return {"records": teaser_and_article_data}
 
     def _extract_all_teaser(
         self, soup: BeautifulSoup
     ) -> Dict[str, list[TeaserRecord]]:
-        self.teaser_element = {
-            "class": "columns teaser-xs twelve teaser-xs__wide"
-        }
         extracted_teaser_list: list[TeaserRecord] = []
-        for teaser in soup.find_all(attrs=self.teaser_element):
-            teaserObj = Teaser(soup=teaser)
+        for teaser_info in TEASER_SPEC.extract_all(soup):
+            teaserObj = Teaser(soup=None, teaser_info=teaser_info)
             teaser_data = teaserObj.get_data()
             if teaserObj.is_teaser_data_valid(teaser_data):
                 extracted_teaser_list.append(teaser_data)
@@ -243,29 +663,182 @@ class TagesschauScraper:
         article_link = teaser_data.get("link")
         if article_link:
             id_ = helper.get_hash_from_string(article_link)
-            article_tags = {}
-            if article_link:
-                try:
-                    article_soup = retrieve.get_soup_from_url(article_link)
-
-                except requests.exceptions.TooManyRedirects:
-                    print(f"Article not found for link: {article_link}.")
-
-                else:
-                    articleObj = Article(article_soup)
-                    article_tags = articleObj.extract_article_tags()
-            article_data = article_tags
+            article_data = self.scrape_article(article_link, teaser_data)
             return {"id": id_, "teaser": teaser_data, "article": article_data}
         else:
             raise ValueError("No article link found in provided teaser data.")
 
+    def is_failed(self, article_link: str) -> bool:
+        """
+        Check if the last attempt of the article failed and is recorded in
+        the failure ledger. Records of failed articles are left out, the
+        retry of the ledger produces them.
+        """
+        if self.failure_ledger is None:
+            return False
+        return article_link in self.failure_ledger
+
+    def scrape_article(
+        self,
+        article_link: str,
+        teaser_data: Union[TeaserRecord, None] = None,
+    ) -> ArticleRecord:
+        """
+        Scrape the article tags from the article website.
+
+        Parameters
+        ----------
+        article_link : str
+            Article website.
+        teaser_data : dict, optional
+            Teaser of the article, stored in the failure ledger on failure.
+
+        Returns
+        -------
+        dict
+            Article tags. Empty, when the article cannot be found or failed.
+        """
+        try:
+            response = self.fetch_article(article_link)
+        except Exception as e:
+            if self.failure_ledger is None:
+                raise
+            self.failure_ledger.record(article_link, e, teaser=teaser_data)
+            return {}
+        return self.parse_article(article_link, response, teaser_data)
+
+    def get_stored_article(
+        self, article_link: str, response: Union[requests.Response, None]
+    ) -> Union[ArticleRecord, None]:
+        """
+        Article of the content store, when the response confirms that it is
+        unchanged. None, when it has to be extracted.
+        """
+        if self.content_store is None or response is None:
+            return None
+        if response.status_code != 304:
+            return None
+        return self.content_store.get_by_link(article_link)
+
+    def fetch_article(
+        self, article_link: str
+    ) -> Union[requests.Response, None]:
+        """
+        Request the article website, streamed for the streaming
+        extraction and conditionally for a stored article. None, when the
+        article cannot be found and there is no failure ledger to record it
+        in.
+        """
+        kwargs: Dict[str, Any] = {}
+        if self.streaming_article is not None:
+            kwargs["stream"] = True
+        if self.content_store is not None:
+            headers = self.content_store.get_request_headers(article_link)
+            if headers:
+                kwargs["headers"] = headers
+        try:
+            with profiling.stage("fetch-article"):
+                return self.session.get(article_link, **kwargs)
+        except requests.exceptions.TooManyRedirects:
+            if self.failure_ledger is not None:
+                raise
+            logger.warning(f"Article not found for link: {article_link}.")
+            return None
+
+    def parse_article(
+        self,
+        article_link: str,
+        response: Union[requests.Response, None],
+        teaser_data: Union[TeaserRecord, None] = None,
+    ) -> ArticleRecord:
+        """
+        Extract the article from the response of fetch_article(), the full
+        article with the streaming extraction, otherwise the article tags.
+        A stored article is reused, when the response is 304 Not Modified.
+
+        Returns
+        -------
+        dict
+            Article data. Empty, when the article cannot be found or failed.
+        """
+        try:
+            stored_article = self.get_stored_article(article_link, response)
+            if stored_article is not None:
+                article_data = stored_article
+            elif self.streaming_article is not None:
+                article_data = self._extract_full_article(
+                    article_link, response
+                )
+            else:
+                article_data = self.extract_article(article_link, response)
+        except Exception as e:
+            if self.failure_ledger is None:
+                raise
+            self.failure_ledger.record(article_link, e, teaser=teaser_data)
+            return {}
+        if self.failure_ledger is not None:
+            self.failure_ledger.resolve(article_link)
+        return article_data
+
+    def extract_article(
+        self, article_link: str, response: Union[requests.Response, None]
+    ) -> ArticleRecord:
+        """
+        Extract the article tags from the response of the article website.
+        """
+        if response is None:
+            return {}
+        with profiling.stage("parse-article"):
+            articleObj = Article(
+                None,
+                extracted=extract_response(
+                    "article",
+                    ARTICLE_SPEC,
+                    response,
+                    self.parse_cache,
+                    release=self.bounded_memory,
+                ),
+            )
+        article_tags = articleObj.extract_article_tags()
+        if self.content_store is not None:
+            self.content_store.put(
+                article_link,
+                articleObj.extract_article_text(),
+                article_tags,
+                headers=response.headers,
+            )
+        return article_tags
+
+    def _extract_full_article(
+        self, article_link: str, response: Union[requests.Response, None]
+    ) -> ArticleRecord:
+        assert self.streaming_article is not None
+        if response is None:
+            return {}
+        with profiling.stage("stream-article"):
+            article_data = self.streaming_article.extract_from_response(
+                response
+            )
+        if self.content_store is not None:
+            self.content_store.put(
+                article_link,
+                article_data["text"],
+                article_data,
+                headers=response.headers,
+            )
+        return article_data
+
 
 class Archive:
     """
     A class for extracting information from news archive.
     """
 
-    def __init__(self, soup: BeautifulSoup) -> None:
+    def __init__(
+        self,
+        soup: Union[BeautifulSoup, None],
+        extracted: Union[Dict[str, Any], None] = None,
+    ) -> None:
         """
         Initializes the Teaser with the provided BeautifulSoup element.
 
@@ -273,26 +846,42 @@ class Archive:
         ----------
         soup : BeautifulSoup
             BeautifulSoup object representing an element for a news teaser.
+            None, when the archive information is already extracted.
+        extracted : dict, optional
+            Fields of ARCHIVE_SPEC already extracted, e.g. from a parse
+            cache.
         """
         self.archive_soup = soup
         self.archive_info: Dict[str, str] = dict()
+        self._extracted = extracted
+
+    def _extract(self) -> Dict[str, Any]:
+        if self._extracted is None:
+            self._extracted = (
+                ARCHIVE_SPEC.extract(self.archive_soup)
+                if self.archive_soup is not None
+                else dict()
+            )
+        return self._extracted
+
+    def release(self) -> None:
+        """
+        Free the parsed archive page. All fields are extracted before, so
+        they stay available.
+        """
+        if self.archive_soup is not None:
+            self._extract()
+            retrieve.release_soup(self.archive_soup)
+            self.archive_soup = None
 
     def extract_pagination(self) -> list[Dict[str, str]]:
         page_keyword = "pageIndex"
-        pagination_html = self.archive_soup.find(
-            "ul", class_="paginierung__liste"
-        )
         max_page = 1
-        if isinstance(pagination_html, Tag):
-            pagination_elements = pagination_html.find_all("li")
-            if pagination_elements:
-                for element in pagination_elements:
-                    if isinstance(element, Tag):
-                        page_str = element.get_text(strip=True)
-                        if page_str.isdigit():
-                            page = int(page_str)
-                            if page > max_page:
-                                max_page = page
+        for page_str in self._extract().get("pages", []):
+            if page_str.isdigit():
+                page = int(page_str)
+                if page > max_page:
+                    max_page = page
         return [{page_keyword: str(p)} for p in range(1, max_page + 1)]
 
     def transform_date_to_date_in_headline(self, date_: date) -> str:
@@ -311,14 +900,9 @@ class Archive:
         return date(year, month, day)
 
     def extract_info_from_archive(self) -> Dict[str, str]:
-        name_html_mapping_text = {
-            "headline": "archive__headline",
-            "num_teaser": "ergebnisse__anzahl",
-        }
-        for name, html_tag in name_html_mapping_text.items():
-            text = retrieve.get_text_from_html(
-                self.archive_soup, element={"class": html_tag}
-            )
+        extracted = self._extract()
+        for name in ["headline", "num_teaser"]:
+            text = extracted.get(name)
             if text:
                 self.archive_info[name] = text
 
@@ -330,7 +914,11 @@ class Teaser:
     A class for extracting information from news teaser elements.
     """
 
-    def __init__(self, soup: BeautifulSoup) -> None:
+    def __init__(
+        self,
+        soup: Union[BeautifulSoup, Tag, None],
+        teaser_info: Union[TeaserRecord, None] = None,
+    ) -> None:
         """
         Initializes the Teaser with the provided BeautifulSoup element.
 
@@ -338,9 +926,15 @@ class Teaser:
         ----------
         soup : BeautifulSoup
             BeautifulSoup object representing an element for a news teaser.
+            None, when the teaser information is already extracted.
+        teaser_info : dict, optional
+            Teaser information already extracted, e.g. by a single walk over
+            the whole archive page.
         """
         self.teaser_soup = soup
-        self.teaser_info: TeaserRecord = dict()
+        self.teaser_info: TeaserRecord = (
+            teaser_info if teaser_info is not None else dict()
+        )
         self.required_attributes = {
             "date",
             "topline",
@@ -353,6 +947,17 @@ class Teaser:
         extracted_data = self.extract_data_from_teaser()
         return self.process_extracted_data(extracted_data)
 
+    def release(self) -> None:
+        """
+        Free the teaser element, which is removed from its page. The teaser
+        information is extracted before, so it stays available.
+        """
+        if self.teaser_soup is not None:
+            if not self.teaser_info:
+                self.extract_data_from_teaser()
+            retrieve.release_soup(self.teaser_soup)
+            self.teaser_soup = None
+
     def extract_data_from_teaser(self) -> TeaserRecord:
         """
         Extracts structured information from a teaser element.
@@ -368,26 +973,8 @@ class Teaser:
         dict
             A dictionary containing all the information of the news teaser
         """
-        field_names_text = ["date", "topline", "headline", "shorttext"]
-        field_names_link = ["link"]
-        name_html_mapping = {
-            key: f"teaser-xs__{key}"
-            for key in field_names_text + field_names_link
-        }
-
-        for field_name, html_class_name in name_html_mapping.items():
-            tag = self.teaser_soup.find(class_=html_class_name)
-            if isinstance(tag, Tag):
-                if field_name in field_names_text:
-                    self.teaser_info[field_name] = tag.get_text(
-                        strip=True, separator=" "
-                    )
-                elif field_name in field_names_link:
-                    if isinstance(tag.get("href"), str):
-                        self.teaser_info[field_name] = tag.get("href")  # type: ignore
-                    else:
-                        raise ValueError
-
+        if self.teaser_soup is not None:
+            self.teaser_info.update(TEASER_SPEC.extract(self.teaser_soup))
         return self.teaser_info
 
     def process_extracted_data(
@@ -437,9 +1024,42 @@ class Article:
     A class for extracting information from news article HTML elements.
     """
 
-    def __init__(self, soup: BeautifulSoup) -> None:
+    def __init__(
+        self,
+        soup: Union[BeautifulSoup, None],
+        extracted: Union[Dict[str, Any], None] = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        soup : BeautifulSoup
+            Parsed article website. None, when the article information is
+            already extracted.
+        extracted : dict, optional
+            Fields of ARTICLE_SPEC already extracted, e.g. from a parse
+            cache.
+        """
         self.article_soup = soup
-        self.tags_element = {"class": "taglist"}
+        self._extracted = extracted
+
+    def _extract(self) -> Dict[str, Any]:
+        if self._extracted is None:
+            self._extracted = (
+                ARTICLE_SPEC.extract(self.article_soup)
+                if self.article_soup is not None
+                else dict()
+            )
+        return self._extracted
+
+    def release(self) -> None:
+        """
+        Free the parsed article website. All fields are extracted before,
+        so they stay available.
+        """
+        if self.article_soup is not None:
+            self._extract()
+            retrieve.release_soup(self.article_soup)
+            self.article_soup = None
 
     def get_data(self) -> ArticleRecord:
         article_tags = self.extract_article_tags()
@@ -447,55 +1067,21 @@ class Article:
         return article_data
 
     def extract_article_tags(self) -> ArticleRecord:
-        tags_group = self.article_soup.find(class_="taglist")
-        if isinstance(tags_group, Tag):
-            tags = [
-                tag.get_text(strip=True)
-                for tag in tags_group.find_all(
-                    class_="tag-btn tag-btn--light-grey"
-                )
-                if hasattr(tag, "get_text")
-            ]
-        else:
-            tags = []
+        tags = self._extract().get("tags", [])
         return {"tags": ",".join(sorted(tags))}
 
+    def extract_article_text(self) -> str:
+        """
+        Extract the article body, i.e. all text paragraphs.
+        """
+        return "\n".join(self._extract().get("paragraphs", []))
+
+
+def __getattr__(name: str) -> Any:
+    # TagesschauDB moved to tagesschauscraper.db. It is imported on first
+    # access, so that importing this module does not import sqlite3.
+    if name == "TagesschauDB":
+        from tagesschauscraper.db import TagesschauDB
 
-class TagesschauDB:
-    _DB_NAME = "news.db"
-    _TABLE_NAME = "Tagesschau"
-
-    def __init__(self) -> None:
-        self.connect()
-
-    def connect(self) -> None:
-        self.conn = sqlite3.connect(TagesschauDB._DB_NAME)
-        self.c = self.conn.cursor()
-        print(f"Connected to {TagesschauDB._DB_NAME}")
-
-    def create_table(self) -> None:
-        query = f"""
-            CREATE TABLE IF NOT EXISTS  {TagesschauDB._TABLE_NAME} (
-            id text UNIQUE,
-            timestamp datetime,
-            topline text,
-            headline text,
-            shorttext text,
-            link text,
-            tags text)
-            """
-        self.c.execute(query)
-
-    def drop_table(self) -> None:
-        query = f"""
-            DROP TABLE IF EXISTS {TagesschauDB._TABLE_NAME}
-            """
-        self.c.execute(query)
-
-    def insert(self, content: Dict[str, str]) -> None:
-        query = f"""
-            INSERT OR IGNORE INTO {TagesschauDB._TABLE_NAME}
-            VALUES (:id, :date, :topline, :headline, :shorttext, :link, :tags)
-            """
-        with self.conn:
-            self.c.execute(query, content)
+        return TagesschauDB
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,444 @@
+"""
+Inverted index from article tags to news records.
+"""
+
+import json
+import re
+import struct
+from array import array
+from bisect import bisect_left
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    Tuple,
+    Union,
+)
+from tagesschauscraper.helper import split_tags
+
+if TYPE_CHECKING:
+    from tagesschauscraper.db import TagesschauDB
+
+_MAGIC = b"TGIX"
+_VERSION = 1
+_HEADER = struct.Struct("<4sBI")
+# Sorted positions of a sparse tag or bitmap of a dense tag
+Posting = Union["array[int]", bytearray]
+
+
+_NONZERO_BYTE = re.compile(rb"[^\x00]")
+
+
+def popcount(bitmap: int) -> int:
+    return bin(bitmap).count("1")
+
+
+if hasattr(int, "bit_count"):
+    # Python 3.10+
+    popcount = int.bit_count  # type: ignore[assignment] # noqa: F811
+
+
+def iter_bits(bitmap: int) -> Iterator[int]:
+    """
+    Positions of the set bits in ascending order.
+    """
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+    # Zero bytes are skipped by the regex engine instead of a Python loop
+    for match in _NONZERO_BYTE.finditer(data):
+        byte_index = match.start()
+        byte = data[byte_index]
+        while byte:
+            lowest = byte & -byte
+            yield byte_index * 8 + lowest.bit_length() - 1
+            byte ^= lowest
+
+
+def get_bitmap_from_positions(positions: Iterable[int]) -> bytearray:
+    bitmap = bytearray()
+    for position in positions:
+        byte_index = position >> 3
+        if byte_index >= len(bitmap):
+            bitmap.extend(bytes(byte_index + 1 - len(bitmap)))
+        bitmap[byte_index] |= 1 << (position & 7)
+    return bitmap
+
+
+def encode_postings(positions: Iterable[int]) -> bytes:
+    """
+    Encode ascending positions as varints of the gaps between them.
+    """
+    encoded = bytearray()
+    previous = -1
+    for position in positions:
+        gap = position - previous
+        previous = position
+        while gap >= 0x80:
+            encoded.append(gap & 0x7F | 0x80)
+            gap >>= 7
+        encoded.append(gap)
+    return bytes(encoded)
+
+
+def decode_postings(encoded: bytes) -> Iterator[int]:
+    position = -1
+    gap = 0
+    shift = 0
+    for byte in encoded:
+        gap |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            position += gap
+            yield position
+            gap = 0
+            shift = 0
+
+
+class TagIndex:
+    """
+    Map every tag to the set of news records carrying it.
+
+    Tags and record ids are interned to integer ids. Most tags are rare, so
+    the posting list of a tag is a sorted array of record positions, as long
+    as that is smaller than a bitmap over the positions. Frequent tags are
+    switched to bytearray bitmaps, which are queried as Python ints, so AND
+    and OR queries of frequent tags are single big integer operations. A
+    bitmap is switched back to an array when the tag becomes rare, e.g. as
+    the index grows. On disk the posting lists are stored as delta encoded
+    varints.
+    """
+
+    def __init__(self) -> None:
+        self.tags: list[str] = []
+        self.tag_ids: Dict[str, int] = dict()
+        self.record_ids: list[str] = []
+        self.record_index: Dict[str, int] = dict()
+        self.postings: list[Posting] = []
+        # Number of records per tag
+        self.counts: list[int] = []
+        # Int views of the bitmaps, dropped when a bitmap changes
+        self._bitmaps: Dict[int, int] = dict()
+
+    def _get_tag_id(self, tag: str) -> int:
+        tag_id = self.tag_ids.get(tag)
+        if tag_id is None:
+            tag_id = len(self.tags)
+            self.tag_ids[tag] = tag_id
+            self.tags.append(tag)
+            self.postings.append(array("I"))
+            self.counts.append(0)
+        return tag_id
+
+    def _iter_positions(self, tag_id: int) -> Iterator[int]:
+        posting = self.postings[tag_id]
+        if isinstance(posting, bytearray):
+            return iter_bits(self._get_bitmap_by_id(tag_id))
+        return iter(posting)
+
+    def _has_position(self, tag_id: int, position: int) -> bool:
+        posting = self.postings[tag_id]
+        if isinstance(posting, bytearray):
+            byte_index = position >> 3
+            if byte_index >= len(posting):
+                return False
+            return bool(posting[byte_index] >> (position & 7) & 1)
+        index = bisect_left(posting, position)
+        return index < len(posting) and posting[index] == position
+
+    def _fit(self, tag_id: int, highest: int) -> None:
+        """
+        Switch the posting list of the tag to the smaller representation for
+        the given highest position. Arrays become bitmaps at a density of
+        1/32 and bitmaps become arrays below 1/64, so that a tag near the
+        limit does not switch back and forth.
+        """
+        posting = self.postings[tag_id]
+        array_size = self.counts[tag_id] * array("I").itemsize
+        bitmap_size = (highest >> 3) + 1
+        if isinstance(posting, bytearray):
+            if 2 * array_size < bitmap_size:
+                self.postings[tag_id] = array(
+                    "I", iter_bits(self._get_bitmap_by_id(tag_id))
+                )
+                self._bitmaps.pop(tag_id, None)
+        elif array_size > bitmap_size:
+            self.postings[tag_id] = get_bitmap_from_positions(posting)
+
+    def _set_bit(self, tag_id: int, position: int) -> None:
+        posting = self.postings[tag_id]
+        if isinstance(posting, bytearray):
+            if self._has_position(tag_id, position):
+                return
+            self.counts[tag_id] += 1
+            # A bitmap is only extended while the tag stays dense
+            self._fit(tag_id, max(position, len(posting) * 8 - 1))
+            posting = self.postings[tag_id]
+            if not isinstance(posting, bytearray):
+                posting.insert(bisect_left(posting, position), position)
+                return
+            byte_index = position >> 3
+            if byte_index >= len(posting):
+                posting.extend(bytes(byte_index + 1 - len(posting)))
+            posting[byte_index] |= 1 << (position & 7)
+            self._bitmaps.pop(tag_id, None)
+            return
+        if not posting or position > posting[-1]:
+            # Records are mostly added in order
+            posting.append(position)
+        else:
+            index = bisect_left(posting, position)
+            if posting[index] == position:
+                return
+            posting.insert(index, position)
+        self.counts[tag_id] += 1
+        self._fit(tag_id, posting[-1])
+
+    def _clear_bit(self, tag_id: int, position: int) -> None:
+        if not self._has_position(tag_id, position):
+            return
+        self.counts[tag_id] -= 1
+        posting = self.postings[tag_id]
+        if isinstance(posting, bytearray):
+            posting[position >> 3] ^= 1 << (position & 7)
+            self._bitmaps.pop(tag_id, None)
+            self._fit(tag_id, len(posting) * 8 - 1)
+        else:
+            del posting[bisect_left(posting, position)]
+
+    def add(self, record_id: str, tags: Iterable[str]) -> None:
+        """
+        Index the tags of a record. Tags indexed for the record before are
+        replaced.
+        """
+        position = self.record_index.get(record_id)
+        if position is None:
+            position = len(self.record_ids)
+            self.record_index[record_id] = position
+            self.record_ids.append(record_id)
+        else:
+            self._remove_position(position)
+        for tag in tags:
+            self._set_bit(self._get_tag_id(tag), position)
+
+    def remove(self, record_id: str) -> None:
+        position = self.record_index.get(record_id)
+        if position is not None:
+            self._remove_position(position)
+
+    def _remove_position(self, position: int) -> None:
+        for tag_id in range(len(self.tags)):
+            self._clear_bit(tag_id, position)
+
+    def add_record(self, record: Dict[str, Any]) -> None:
+        """
+        Index a news record as returned by the scraper.
+        """
+        article = record.get("article") or {}
+        self.add(record["id"], split_tags(article.get("tags", "")))
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> "TagIndex":
+        tagIndex = cls()
+        for record in records:
+            tagIndex.add_record(record)
+        return tagIndex
+
+    @classmethod
+    def from_db(cls, tagesschauDB: "TagesschauDB") -> "TagIndex":
+        tagIndex = cls()
+        for row in tagesschauDB.query(
+            f"SELECT id, tags FROM {tagesschauDB._TABLE_NAME} ORDER BY rowid"
+        ):
+            tagIndex.add(row["id"], split_tags(row["tags"] or ""))
+        return tagIndex
+
+    def _get_bitmap_by_id(self, tag_id: int) -> int:
+        posting = self.postings[tag_id]
+        if not isinstance(posting, bytearray):
+            # Only bitmaps of dense tags are cached
+            return int.from_bytes(get_bitmap_from_positions(posting), "little")
+        bitmap = self._bitmaps.get(tag_id)
+        if bitmap is None:
+            bitmap = int.from_bytes(posting, "little")
+            self._bitmaps[tag_id] = bitmap
+        return bitmap
+
+    def get_bitmap(self, tag: str) -> int:
+        tag_id = self.tag_ids.get(tag)
+        return self._get_bitmap_by_id(tag_id) if tag_id is not None else 0
+
+    def _get_record_ids(self, bitmap: int) -> list[str]:
+        return [self.record_ids[position] for position in iter_bits(bitmap)]
+
+    def query_and(self, tags: Iterable[str]) -> list[str]:
+        """
+        Ids of the records carrying all of the tags, in insertion order.
+        """
+        return self._get_record_ids(self._and(tags))
+
+    def query_or(self, tags: Iterable[str]) -> list[str]:
+        """
+        Ids of the records carrying any of the tags, in insertion order.
+        """
+        return self._get_record_ids(self._or(tags))
+
+    def count_and(self, tags: Iterable[str]) -> int:
+        return popcount(self._and(tags))
+
+    def count_or(self, tags: Iterable[str]) -> int:
+        return popcount(self._or(tags))
+
+    def _and(self, tags: Iterable[str]) -> int:
+        tag_ids = []
+        for tag in tags:
+            tag_id = self.tag_ids.get(tag)
+            if tag_id is None:
+                return 0
+            tag_ids.append(tag_id)
+        if not tag_ids:
+            return 0
+        # Intersect the shortest posting lists first, so that the result
+        # shrinks as early as possible.
+        tag_ids.sort(key=self.counts.__getitem__)
+        shortest = self.postings[tag_ids[0]]
+        if not isinstance(shortest, bytearray):
+            # Look up the few positions of a sparse tag in the others
+            positions = [
+                position
+                for position in shortest
+                if all(
+                    self._has_position(tag_id, position)
+                    for tag_id in tag_ids[1:]
+                )
+            ]
+            bitmap = get_bitmap_from_positions(positions)
+            return int.from_bytes(bitmap, "little")
+        result = self._get_bitmap_by_id(tag_ids[0])
+        for tag_id in tag_ids[1:]:
+            if not result:
+                break
+            result &= self._get_bitmap_by_id(tag_id)
+        return result
+
+    def _or(self, tags: Iterable[str]) -> int:
+        result = 0
+        positions: list[int] = []
+        for tag in tags:
+            tag_id = self.tag_ids.get(tag)
+            if tag_id is None:
+                continue
+            posting = self.postings[tag_id]
+            if isinstance(posting, bytearray):
+                result |= self._get_bitmap_by_id(tag_id)
+            else:
+                positions.extend(posting)
+        bitmap = get_bitmap_from_positions(positions)
+        return result | int.from_bytes(bitmap, "little")
+
+    def _count_common(self, tag_id: int, other_tag_id: int) -> int:
+        """
+        Number of records carrying both tags.
+        """
+        is_dense = isinstance(self.postings[tag_id], bytearray)
+        is_other_dense = isinstance(self.postings[other_tag_id], bytearray)
+        if is_dense and is_other_dense:
+            bitmap = self._get_bitmap_by_id(tag_id)
+            return popcount(bitmap & self._get_bitmap_by_id(other_tag_id))
+        # Look up the positions of the shorter sparse tag in the other tag
+        is_longer = self.counts[tag_id] > self.counts[other_tag_id]
+        if is_dense or (is_longer and not is_other_dense):
+            tag_id, other_tag_id = other_tag_id, tag_id
+        return sum(
+            self._has_position(other_tag_id, position)
+            for position in self.postings[tag_id]
+        )
+
+    def get_tag_counts(self) -> Dict[str, int]:
+        """
+        Number of records per tag.
+        """
+        return {
+            tag: self.counts[tag_id]
+            for tag_id, tag in enumerate(self.tags)
+            if self.counts[tag_id]
+        }
+
+    def get_cooccurrences(
+        self, tag: str, top: int = 10
+    ) -> list[Tuple[str, int]]:
+        """
+        Tags most often appearing together with the tag, with the number of
+        records they share.
+        """
+        tag_id = self.tag_ids.get(tag)
+        if tag_id is None:
+            return []
+        counts = [
+            (other_tag, self._count_common(tag_id, other_tag_id))
+            for other_tag_id, other_tag in enumerate(self.tags)
+            if other_tag_id != tag_id and self.counts[other_tag_id]
+        ]
+        counts = [(other_tag, count) for other_tag, count in counts if count]
+        return sorted(counts, key=lambda item: (-item[1], item[0]))[:top]
+
+    def __len__(self) -> int:
+        return len(self.record_ids)
+
+    def save(self, file_path: str) -> None:
+        """
+        Write the index as a header, a JSON block with tags, record ids and
+        posting sizes, followed by all delta encoded posting lists.
+        """
+        encoded_postings = [
+            encode_postings(self._iter_positions(tag_id))
+            for tag_id in range(len(self.tags))
+        ]
+        metadata = json.dumps(
+            {
+                "tags": self.tags,
+                "record_ids": self.record_ids,
+                "sizes": [len(encoded) for encoded in encoded_postings],
+            },
+            ensure_ascii=False,
+        ).encode()
+        with open(file_path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, len(metadata)))
+            f.write(metadata)
+            for encoded in encoded_postings:
+                f.write(encoded)
+
+    @classmethod
+    def load(cls, file_path: str) -> "TagIndex":
+        """
+        Raises
+        ------
+        ValueError
+            When the file is not a tag index of this version.
+        """
+        with open(file_path, "rb") as f:
+            data = f.read()
+        magic, version, metadata_size = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{file_path} is no tag index of version 1.")
+        offset = _HEADER.size
+        metadata_end = offset + metadata_size
+        metadata = json.loads(data[offset:metadata_end])
+        tagIndex = cls()
+        tagIndex.tags = metadata["tags"]
+        tagIndex.tag_ids = {tag: i for i, tag in enumerate(tagIndex.tags)}
+        tagIndex.record_ids = metadata["record_ids"]
+        tagIndex.record_index = {
+            record_id: i for i, record_id in enumerate(tagIndex.record_ids)
+        }
+        offset = metadata_end
+        for tag_id, size in enumerate(metadata["sizes"]):
+            end = offset + size
+            positions = array("I", decode_postings(data[offset:end]))
+            tagIndex.postings.append(positions)
+            tagIndex.counts.append(len(positions))
+            if positions:
+                tagIndex._fit(tag_id, positions[-1])
+            offset = end
+        return tagIndex
@@ -0,0 +1,187 @@
+"""
+Alternative HTTP transports behind the requests.Session interface.
+"""
+
+import logging
+from typing import Any, Iterator, Union
+import requests
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+TRANSPORTS = ["requests", "http2"]
+
+
+class _StreamReader:
+    """
+    File-like view of the decoded body of a streamed httpx response, used
+    as Response.raw, so that Response.iter_content() works as usual.
+    """
+
+    def __init__(self, response: "httpx.Response", chunk_size: int) -> None:
+        self.response = response
+        self._chunks: Iterator[bytes] = response.iter_bytes(chunk_size)
+        self._buffer = b""
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            size = len(self._buffer)
+        data = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return data
+
+    def close(self) -> None:
+        self.response.close()
+
+
+def to_requests_response(
+    response: "httpx.Response", stream: bool = False, chunk_size: int = 65536
+) -> Response:
+    """
+    Wrap an httpx response as a requests response with decoded content.
+
+    A streamed response is decompressed while it is read.
+    """
+    requestsResponse = Response()
+    requestsResponse.status_code = response.status_code
+    requestsResponse.headers = CaseInsensitiveDict(response.headers.items())
+    requestsResponse.encoding = get_encoding_from_headers(
+        requestsResponse.headers
+    )
+    requestsResponse.reason = response.reason_phrase
+    requestsResponse.url = str(response.url)
+    if stream:
+        requestsResponse.raw = _StreamReader(response, chunk_size)
+    else:
+        requestsResponse._content = response.content
+        requestsResponse._content_consumed = True  # type: ignore[attr-defined]
+    return requestsResponse
+
+
+class HTTP2Session(requests.Session):
+    """
+    Session sending all requests through one httpx client with HTTP/2.
+
+    All requests to a host are multiplexed over a single connection instead
+    of one connection per concurrent request. Compressed responses are
+    negotiated with Accept-Encoding (gzip, deflate and brotli, when the
+    brotli package is installed) and decoded by httpx, streamed responses
+    chunk by chunk. Responses and errors are translated to those of
+    requests, so the session can be used wherever a requests.Session is
+    expected.
+
+    Requires the extra: pip install tagesschauscraper[http2]
+    """
+
+    def __init__(
+        self,
+        timeout: Union[float, None] = 30.0,
+        max_connections: int = 10,
+        http2: bool = True,
+        transport: Union["httpx.BaseTransport", None] = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        timeout : float, optional
+            Seconds to wait for connecting and for data, by default 30.
+        max_connections : int, optional
+            Maximum number of open connections, by default 10.
+        http2 : bool, optional
+            Use HTTP/2 if the server supports it, by default True.
+        transport : httpx.BaseTransport, optional
+            Custom httpx transport, e.g. for testing.
+
+        Raises
+        ------
+        ImportError
+            When httpx is not installed.
+        """
+        if httpx is None:
+            raise ImportError(
+                "The HTTP/2 transport requires httpx, install it with"
+                " pip install tagesschauscraper[http2]"
+            )
+        super().__init__()
+        # Only headers set by the user are sent, httpx sets the defaults.
+        # Accept-Encoding of requests would prevent brotli and the
+        # Connection header is not allowed in HTTP/2.
+        self.headers = CaseInsensitiveDict()
+        self.client = httpx.Client(
+            http2=http2,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections),
+            follow_redirects=True,
+            # Same limit as requests
+            max_redirects=30,
+            transport=transport,
+        )
+
+    def request(  # type: ignore[override]
+        self,
+        method: str,
+        url: str,
+        params: Any = None,
+        headers: Any = None,
+        stream: bool = False,
+        allow_redirects: bool = True,
+        timeout: Union[float, None] = None,
+        **kwargs: Any,
+    ) -> Response:
+        """
+        Raises
+        ------
+        requests.exceptions.RequestException
+            The requests counterpart of the httpx error.
+        """
+        request = self.client.build_request(
+            method,
+            url,
+            params=params,
+            headers=dict(self.headers) | dict(headers or {}),
+            **({"timeout": timeout} if timeout is not None else {}),
+        )
+        try:
+            response = self.client.send(
+                request, stream=stream, follow_redirects=allow_redirects
+            )
+        except httpx.TooManyRedirects as e:
+            raise requests.exceptions.TooManyRedirects(str(e)) from e
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e)) from e
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+        except httpx.HTTPError as e:
+            raise requests.exceptions.RequestException(str(e)) from e
+        logger.debug(
+            f"{method} {response.url} {response.status_code}"
+            f" {response.http_version}"
+        )
+        return to_requests_response(response, stream=stream)
+
+    def close(self) -> None:
+        self.client.close()
+        super().close()
+
+
+def create_session(transport: str = "requests") -> requests.Session:
+    """
+    New session of the transport, one of TRANSPORTS.
+    """
+    if transport == "requests":
+        return requests.Session()
+    if transport == "http2":
+        return HTTP2Session()
+    raise ValueError(f"Transport must be one of {TRANSPORTS}.")
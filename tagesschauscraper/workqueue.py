@@ -0,0 +1,809 @@
+"""
+Work queue for scraping with several worker processes or hosts.
+"""
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, NamedTuple, Union
+from tagesschauscraper import helper, retrieve
+from tagesschauscraper.tagesschau import (
+    ARCHIVE_URL,
+    ArchiveFilter,
+    NewsRecord,
+    RequestParams,
+    TagesschauScraper,
+)
+
+try:
+    import redis
+except ImportError:  # pragma: no cover
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# Archive units are claimed before article units, so that new work is
+# discovered as early as possible.
+UNIT_PRIORITIES = {"archive": 0, "article": 1}
+UNIT_STATES = ["pending", "leased", "done", "failed"]
+
+
+class Lease(NamedTuple):
+    """
+    A work unit claimed by a worker.
+    """
+
+    id: int
+    kind: str
+    key: str
+    payload: Dict[str, Any]
+    worker_id: str
+    attempts: int
+
+
+def get_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{threading.get_ident()}"
+
+
+class WorkQueue:
+    """
+    Work queue backed by a SQLite database.
+
+    Units are unique by key, so a unit put twice is only processed once. A
+    worker claims a unit with a lease, which it extends by heartbeats while
+    processing. When a worker dies, its lease expires and the unit is
+    claimed by another worker. Units, which failed max_attempts times, are
+    marked as failed.
+
+    Workers run until the coordinator marked the queue as submitted and all
+    units are done or failed, so they may be started before the coordinator.
+
+    Every process opens its own queue on the same database file. All
+    processes must run on the same host: SQLite relies on file locks, which
+    are unreliable on network file systems, so a database file on a shared
+    file system is not supported. Use a RedisWorkQueue for workers on
+    several hosts.
+    """
+
+    _TABLE_NAME = "work_units"
+    _STATE_TABLE_NAME = "work_queue_state"
+
+    def __init__(
+        self,
+        db_name: str,
+        lease_seconds: float = 60.0,
+        max_attempts: int = 3,
+        timeout: float = 30.0,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        db_name : str
+            Path of the database file.
+        lease_seconds : float, optional
+            Seconds a claimed unit stays leased without heartbeat, by default
+            60.
+        max_attempts : int, optional
+            Number of claims before a failing unit is given up, by default 3.
+        timeout : float, optional
+            Seconds to wait for a lock held by another process, by default 30.
+        """
+        self.db_name = db_name
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(
+            db_name,
+            timeout=timeout,
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        if db_name != ":memory:":
+            # Rollback journal, since WAL needs memory shared by all
+            # processes and corrupts a database on a network file system
+            self.conn.execute("PRAGMA journal_mode = DELETE")
+        self.conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {WorkQueue._TABLE_NAME} (
+            id integer PRIMARY KEY,
+            kind text,
+            key text UNIQUE,
+            payload text,
+            priority integer,
+            state text,
+            worker text,
+            lease_expires real,
+            attempts integer DEFAULT 0,
+            result text,
+            error text)
+            """)
+        self.conn.execute(f"""
+            CREATE INDEX IF NOT EXISTS {WorkQueue._TABLE_NAME}State
+            ON {WorkQueue._TABLE_NAME} (state, priority, id)
+            """)
+        self.conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {WorkQueue._STATE_TABLE_NAME} (
+            name text PRIMARY KEY,
+            value text)
+            """)
+
+    def put(self, kind: str, key: str, payload: Dict[str, Any]) -> bool:
+        """
+        Add a unit to the queue.
+
+        Returns
+        -------
+        bool
+            False, when a unit with the key was already added.
+        """
+        if kind not in UNIT_PRIORITIES:
+            raise ValueError(f"Kind must be one of {list(UNIT_PRIORITIES)}.")
+        query = f"""
+            INSERT OR IGNORE INTO {WorkQueue._TABLE_NAME}
+            (kind, key, payload, priority, state)
+            VALUES (?, ?, ?, ?, 'pending')
+            """
+        with self._lock:
+            cursor = self.conn.execute(
+                query, (kind, key, json.dumps(payload), UNIT_PRIORITIES[kind])
+            )
+        return cursor.rowcount == 1
+
+    def claim(self, worker_id: str) -> Union[Lease, None]:
+        """
+        Lease the next pending unit, or a unit whose lease expired.
+
+        Returns
+        -------
+        Lease or None
+            None, when no unit is available right now.
+        """
+        now = time.time()
+        select_query = f"""
+            SELECT id, kind, key, payload, attempts
+            FROM {WorkQueue._TABLE_NAME}
+            WHERE state = 'pending'
+                OR (state = 'leased' AND lease_expires < ?)
+            ORDER BY priority, id LIMIT 1
+            """
+        update_query = f"""
+            UPDATE {WorkQueue._TABLE_NAME}
+            SET state = 'leased', worker = ?, lease_expires = ?,
+                attempts = ?
+            WHERE id = ?
+            """
+        with self._lock:
+            # The write lock is taken up front, so that two workers never
+            # claim the same unit.
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                while True:
+                    row = self.conn.execute(select_query, (now,)).fetchone()
+                    if row is None:
+                        self.conn.execute("COMMIT")
+                        return None
+                    id_, kind, key, payload, attempts = row
+                    if attempts < self.max_attempts:
+                        break
+                    # A worker holding this unit died on its last attempt
+                    self.conn.execute(
+                        f"UPDATE {WorkQueue._TABLE_NAME} SET state = 'failed'"
+                        " WHERE id = ?",
+                        (id_,),
+                    )
+                self.conn.execute(
+                    update_query,
+                    (worker_id, now + self.lease_seconds, attempts + 1, id_),
+                )
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        return Lease(
+            id_, kind, key, json.loads(payload), worker_id, attempts + 1
+        )
+
+    def _update_lease(self, lease: Lease, query: str, *params: Any) -> bool:
+        # Only the current holder of a lease may update its unit
+        with self._lock:
+            cursor = self.conn.execute(
+                query + " WHERE id = ? AND worker = ? AND state = 'leased'",
+                (*params, lease.id, lease.worker_id),
+            )
+        return cursor.rowcount == 1
+
+    def heartbeat(self, lease: Lease) -> bool:
+        """
+        Extend the lease.
+
+        Returns
+        -------
+        bool
+            False, when the lease was lost, e.g. after it expired and another
+            worker claimed the unit.
+        """
+        return self._update_lease(
+            lease,
+            f"UPDATE {WorkQueue._TABLE_NAME} SET lease_expires = ?",
+            time.time() + self.lease_seconds,
+        )
+
+    def complete(self, lease: Lease, result: Any) -> bool:
+        return self._update_lease(
+            lease,
+            f"UPDATE {WorkQueue._TABLE_NAME}"
+            " SET state = 'done', result = ?, error = NULL",
+            json.dumps(result),
+        )
+
+    def fail(self, lease: Lease, error: BaseException) -> bool:
+        """
+        Release the unit after a failed attempt. It is given up after
+        max_attempts attempts.
+        """
+        state = "failed" if lease.attempts >= self.max_attempts else "pending"
+        return self._update_lease(
+            lease,
+            f"UPDATE {WorkQueue._TABLE_NAME} SET state = ?, error = ?",
+            state,
+            f"{type(error).__name__}: {error}",
+        )
+
+    def get_counts(self) -> Dict[str, int]:
+        """
+        Number of units per state.
+        """
+        query = f"""
+            SELECT state, count(*) FROM {WorkQueue._TABLE_NAME}
+            GROUP BY state
+            """
+        with self._lock:
+            rows = self.conn.execute(query).fetchall()
+        return {state: 0 for state in UNIT_STATES} | dict(rows)
+
+    def mark_submitted(self) -> None:
+        """
+        Mark that the coordinator added all its units. Units discovered by
+        workers may still be added afterwards.
+        """
+        query = f"""
+            INSERT OR REPLACE INTO {WorkQueue._STATE_TABLE_NAME}
+            VALUES ('submitted', ?)
+            """
+        with self._lock:
+            self.conn.execute(query, (str(time.time()),))
+
+    def clear_submitted(self) -> None:
+        """
+        Mark that the coordinator starts adding the units of a new run.
+        """
+        query = f"""
+            DELETE FROM {WorkQueue._STATE_TABLE_NAME}
+            WHERE name = 'submitted'
+            """
+        with self._lock:
+            self.conn.execute(query)
+
+    def is_submitted(self) -> bool:
+        query = f"""
+            SELECT 1 FROM {WorkQueue._STATE_TABLE_NAME}
+            WHERE name = 'submitted'
+            """
+        with self._lock:
+            return self.conn.execute(query).fetchone() is not None
+
+    def is_finished(self) -> bool:
+        """
+        Check if the queue is submitted and no unit is pending or leased.
+        """
+        if not self.is_submitted():
+            return False
+        counts = self.get_counts()
+        return counts["pending"] == 0 and counts["leased"] == 0
+
+    def get_results(self, kind: str) -> list[Dict[str, Any]]:
+        """
+        Payload and result of all completed units of a kind, in the order
+        they were added.
+        """
+        query = f"""
+            SELECT key, payload, result FROM {WorkQueue._TABLE_NAME}
+            WHERE kind = ? AND state = 'done' ORDER BY id
+            """
+        with self._lock:
+            rows = self.conn.execute(query, (kind,)).fetchall()
+        return [
+            {
+                "key": key,
+                "payload": json.loads(payload),
+                "result": json.loads(result),
+            }
+            for key, payload, result in rows
+        ]
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "WorkQueue":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+_REDIS_PUT_SCRIPT = """
+local prefix = ARGV[1]
+if redis.call('HSETNX', prefix .. ':keys', ARGV[3], '') == 0 then
+    return 0
+end
+local id = redis.call('INCR', prefix .. ':seq')
+redis.call('HSET', prefix .. ':keys', ARGV[3], id)
+redis.call(
+    'HSET', prefix .. ':unit:' .. id, 'kind', ARGV[2], 'key', ARGV[3],
+    'payload', ARGV[4], 'priority', ARGV[5], 'state', 'pending',
+    'attempts', 0
+)
+redis.call('ZADD', prefix .. ':pending', ARGV[5] * 1e12 + id, id)
+redis.call('HINCRBY', prefix .. ':counts', 'pending', 1)
+return 1
+"""
+
+_REDIS_CLAIM_SCRIPT = """
+local prefix = ARGV[1]
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+while true do
+    local pending = redis.call(
+        'ZRANGE', prefix .. ':pending', 0, 0, 'WITHSCORES'
+    )
+    local expired = redis.call(
+        'ZRANGEBYSCORE', prefix .. ':leased', '-inf', '(' .. now,
+        'LIMIT', 0, 1
+    )
+    local id = pending[1]
+    if expired[1] then
+        local unit = prefix .. ':unit:' .. expired[1]
+        local fields = redis.call('HMGET', unit, 'priority')
+        local score = tonumber(fields[1]) * 1e12 + tonumber(expired[1])
+        if not id or score < tonumber(pending[2]) then
+            id = expired[1]
+        end
+    end
+    if not id then
+        return false
+    end
+    local unit = prefix .. ':unit:' .. id
+    local fields = redis.call(
+        'HMGET', unit, 'state', 'attempts', 'kind', 'key', 'payload'
+    )
+    local attempts = tonumber(fields[2])
+    redis.call('ZREM', prefix .. ':pending', id)
+    redis.call('ZREM', prefix .. ':leased', id)
+    redis.call('HINCRBY', prefix .. ':counts', fields[1], -1)
+    if attempts < tonumber(ARGV[4]) then
+        redis.call(
+            'HSET', unit, 'state', 'leased', 'worker', ARGV[2],
+            'attempts', attempts + 1
+        )
+        redis.call('ZADD', prefix .. ':leased', now + ARGV[3], id)
+        redis.call('HINCRBY', prefix .. ':counts', 'leased', 1)
+        return {id, attempts + 1, fields[3], fields[4], fields[5]}
+    end
+    -- A worker holding this unit died on its last attempt
+    redis.call('HSET', unit, 'state', 'failed')
+    redis.call('HINCRBY', prefix .. ':counts', 'failed', 1)
+end
+"""
+
+# Only the current holder of a lease may update its unit
+_REDIS_UPDATE_LEASE_SCRIPT = """
+local prefix = ARGV[1]
+local id = ARGV[2]
+local unit = prefix .. ':unit:' .. id
+local fields = redis.call('HMGET', unit, 'state', 'worker', 'kind')
+if fields[1] ~= 'leased' or fields[2] ~= ARGV[3] then
+    return 0
+end
+if ARGV[4] == 'heartbeat' then
+    local time = redis.call('TIME')
+    local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+    redis.call('ZADD', prefix .. ':leased', now + ARGV[5], id)
+    return 1
+end
+redis.call('ZREM', prefix .. ':leased', id)
+redis.call('HINCRBY', prefix .. ':counts', 'leased', -1)
+if ARGV[4] == 'complete' then
+    redis.call('HSET', unit, 'state', 'done', 'result', ARGV[5])
+    redis.call('HDEL', unit, 'error')
+    redis.call('ZADD', prefix .. ':done:' .. fields[3], id, id)
+    redis.call('HINCRBY', prefix .. ':counts', 'done', 1)
+    return 1
+end
+redis.call('HSET', unit, 'state', ARGV[5], 'error', ARGV[6])
+redis.call('HINCRBY', prefix .. ':counts', ARGV[5], 1)
+if ARGV[5] == 'pending' then
+    local priority = redis.call('HGET', unit, 'priority')
+    redis.call('ZADD', prefix .. ':pending', priority * 1e12 + id, id)
+end
+return 1
+"""
+
+
+class RedisWorkQueue:
+    """
+    Work queue backed by a Redis server, or any server speaking its
+    protocol, e.g. Valkey or KeyDB.
+
+    It behaves like the WorkQueue, but workers on any number of hosts may
+    share it. Every change of a unit runs as one Lua script on the server,
+    so two workers never claim the same unit, and leases expire by the
+    clock of the server, not of the hosts. All keys of a queue start with
+    its name, so one server may hold several queues.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        name: str = "tagesschauscraper",
+        lease_seconds: float = 60.0,
+        max_attempts: int = 3,
+        client: Any = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        url : str
+            URL of the server, e.g. redis://host:6379/0.
+        name : str, optional
+            Prefix of all keys of the queue, by default "tagesschauscraper".
+        lease_seconds : float, optional
+            Seconds a claimed unit stays leased without heartbeat, by default
+            60.
+        max_attempts : int, optional
+            Number of claims before a failing unit is given up, by default 3.
+        client : redis.Redis, optional
+            Client used instead of connecting to the URL, it must decode
+            responses.
+
+        Raises
+        ------
+        ImportError
+            When redis is not installed and no client is given.
+        """
+        if client is None:
+            if redis is None:
+                raise ImportError(
+                    "The Redis work queue requires redis, install it with"
+                    " pip install tagesschauscraper[redis]"
+                )
+            client = redis.Redis.from_url(url, decode_responses=True)
+        self.url = url
+        self.name = name
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.client = client
+        self._put = client.register_script(_REDIS_PUT_SCRIPT)
+        self._claim = client.register_script(_REDIS_CLAIM_SCRIPT)
+        self._update = client.register_script(_REDIS_UPDATE_LEASE_SCRIPT)
+
+    def put(self, kind: str, key: str, payload: Dict[str, Any]) -> bool:
+        """
+        Add a unit to the queue.
+
+        Returns
+        -------
+        bool
+            False, when a unit with the key was already added.
+        """
+        if kind not in UNIT_PRIORITIES:
+            raise ValueError(f"Kind must be one of {list(UNIT_PRIORITIES)}.")
+        args = [self.name, kind, key, json.dumps(payload)]
+        added = self._put(args=args + [UNIT_PRIORITIES[kind]])
+        return bool(added)
+
+    def claim(self, worker_id: str) -> Union[Lease, None]:
+        """
+        Lease the next pending unit, or a unit whose lease expired.
+
+        Returns
+        -------
+        Lease or None
+            None, when no unit is available right now.
+        """
+        args = [self.name, worker_id, self.lease_seconds, self.max_attempts]
+        row = self._claim(args=args)
+        if row is None:
+            return None
+        id_, attempts, kind, key, payload = row
+        return Lease(
+            int(id_), kind, key, json.loads(payload), worker_id, int(attempts)
+        )
+
+    def _update_lease(self, lease: Lease, action: str, *params: Any) -> bool:
+        args = [self.name, lease.id, lease.worker_id, action, *params]
+        return bool(self._update(args=args))
+
+    def heartbeat(self, lease: Lease) -> bool:
+        """
+        Extend the lease.
+
+        Returns
+        -------
+        bool
+            False, when the lease was lost, e.g. after it expired and another
+            worker claimed the unit.
+        """
+        return self._update_lease(lease, "heartbeat", self.lease_seconds)
+
+    def complete(self, lease: Lease, result: Any) -> bool:
+        return self._update_lease(lease, "complete", json.dumps(result))
+
+    def fail(self, lease: Lease, error: BaseException) -> bool:
+        """
+        Release the unit after a failed attempt. It is given up after
+        max_attempts attempts.
+        """
+        state = "failed" if lease.attempts >= self.max_attempts else "pending"
+        return self._update_lease(
+            lease, "fail", state, f"{type(error).__name__}: {error}"
+        )
+
+    def get_counts(self) -> Dict[str, int]:
+        """
+        Number of units per state.
+        """
+        counts = self.client.hgetall(f"{self.name}:counts")
+        return {state: int(counts.get(state, 0)) for state in UNIT_STATES}
+
+    def mark_submitted(self) -> None:
+        """
+        Mark that the coordinator added all its units. Units discovered by
+        workers may still be added afterwards.
+        """
+        self.client.set(f"{self.name}:submitted", str(time.time()))
+
+    def clear_submitted(self) -> None:
+        """
+        Mark that the coordinator starts adding the units of a new run.
+        """
+        self.client.delete(f"{self.name}:submitted")
+
+    def is_submitted(self) -> bool:
+        return bool(self.client.exists(f"{self.name}:submitted"))
+
+    def is_finished(self) -> bool:
+        """
+        Check if the queue is submitted and no unit is pending or leased.
+        """
+        if not self.is_submitted():
+            return False
+        counts = self.get_counts()
+        return counts["pending"] == 0 and counts["leased"] == 0
+
+    def get_results(self, kind: str) -> list[Dict[str, Any]]:
+        """
+        Payload and result of all completed units of a kind, in the order
+        they were added.
+        """
+        ids = self.client.zrange(f"{self.name}:done:{kind}", 0, -1)
+        pipeline = self.client.pipeline(transaction=False)
+        for id_ in ids:
+            pipeline.hmget(
+                f"{self.name}:unit:{id_}", "key", "payload", "result"
+            )
+        return [
+            {
+                "key": key,
+                "payload": json.loads(payload),
+                "result": json.loads(result),
+            }
+            for key, payload, result in pipeline.execute()
+        ]
+
+    def close(self) -> None:
+        self.client.close()
+
+    def __enter__(self) -> "RedisWorkQueue":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+AnyWorkQueue = Union[WorkQueue, RedisWorkQueue]
+
+
+def open_work_queue(name: str, **kwargs: Any) -> AnyWorkQueue:
+    """
+    Work queue of the name: a RedisWorkQueue for redis://, rediss:// and
+    unix:// URLs, otherwise a WorkQueue on the database file.
+    """
+    if name.startswith(("redis://", "rediss://", "unix://")):
+        return RedisWorkQueue(name, **kwargs)
+    return WorkQueue(name, **kwargs)
+
+
+class Coordinator:
+    """
+    Split archive filters into work units and collect the scraped records.
+
+    The coordinator only adds the first archive page of every filter. Workers
+    add the further pages and the articles they discover.
+    """
+
+    def __init__(self, queue: AnyWorkQueue) -> None:
+        self.queue = queue
+
+    def submit(self, archive_filters: list[ArchiveFilter]) -> int:
+        """
+        Add the units of the archive filters and mark the queue as
+        submitted, so that idle workers stop once all units are processed.
+        The mark of an earlier run on the same queue is cleared first.
+
+        Returns
+        -------
+        int
+            Number of new units.
+        """
+        self.queue.clear_submitted()
+        count = sum(
+            put_archive_unit(
+                self.queue,
+                archive_filter.processed_params | {"pageIndex": "1"},
+            )
+            for archive_filter in archive_filters
+        )
+        self.queue.mark_submitted()
+        return count
+
+    def wait(self, poll_interval: float = 1.0) -> Dict[str, int]:
+        """
+        Block until all units are done or failed.
+        """
+        while not self.queue.is_finished():
+            time.sleep(poll_interval)
+        counts = self.queue.get_counts()
+        logger.info(f"Work queue finished: {counts}")
+        return counts
+
+    def collect(self) -> Dict[str, list[NewsRecord]]:
+        """
+        News records of all completed article units.
+        """
+        return {
+            "records": [
+                {
+                    "id": unit["payload"]["id"],
+                    "teaser": unit["payload"]["teaser"],
+                    "article": unit["result"],
+                }
+                for unit in self.queue.get_results("article")
+            ]
+        }
+
+
+def put_archive_unit(queue: AnyWorkQueue, params: RequestParams) -> bool:
+    return queue.put(
+        "archive",
+        retrieve.get_request_url(ARCHIVE_URL, params),
+        {"params": params},
+    )
+
+
+class Worker:
+    """
+    Claim and process units until the queue is submitted and finished.
+    """
+
+    def __init__(
+        self,
+        queue: AnyWorkQueue,
+        scraper: Union[TagesschauScraper, None] = None,
+        worker_id: Union[str, None] = None,
+        heartbeat_interval: Union[float, None] = None,
+        poll_interval: float = 1.0,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        queue : WorkQueue or RedisWorkQueue
+            Queue of this process.
+        scraper : TagesschauScraper, optional
+            Scraper used for fetching and extracting, by default a new one.
+        worker_id : str, optional
+            Unique name of the worker, by default host, process and thread.
+        heartbeat_interval : float, optional
+            Seconds between heartbeats, by default a third of the lease.
+        poll_interval : float, optional
+            Seconds to wait, when no unit is available but the queue is not
+            finished yet, e.g. before the coordinator submitted, by default
+            1.
+        """
+        self.queue = queue
+        self.scraper = scraper if scraper is not None else TagesschauScraper()
+        self.worker_id = (
+            worker_id if worker_id is not None else get_worker_id()
+        )
+        self.heartbeat_interval = (
+            heartbeat_interval
+            if heartbeat_interval is not None
+            else queue.lease_seconds / 3
+        )
+        self.poll_interval = poll_interval
+        self.processed = 0
+
+    def run(self) -> int:
+        """
+        Returns
+        -------
+        int
+            Number of units processed by this worker.
+        """
+        while True:
+            lease = self.queue.claim(self.worker_id)
+            if lease is None:
+                if self.queue.is_finished():
+                    break
+                time.sleep(self.poll_interval)
+                continue
+            self.run_unit(lease)
+        logger.info(f"Worker {self.worker_id} processed {self.processed}.")
+        return self.processed
+
+    def run_unit(self, lease: Lease) -> None:
+        stop_event = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat, args=(lease, stop_event), daemon=True
+        )
+        heartbeat.start()
+        try:
+            result = self.process(lease)
+        except Exception as e:
+            logger.exception(f"Unit {lease.key} failed.")
+            self.queue.fail(lease, e)
+        else:
+            if not self.queue.complete(lease, result):
+                logger.warning(f"Lease of unit {lease.key} was lost.")
+            self.processed += 1
+        finally:
+            stop_event.set()
+            heartbeat.join()
+
+    def _heartbeat(self, lease: Lease, stop_event: threading.Event) -> None:
+        while not stop_event.wait(self.heartbeat_interval):
+            if not self.queue.heartbeat(lease):
+                break
+
+    def process(self, lease: Lease) -> Any:
+        if lease.kind == "archive":
+            return self.process_archive_page(lease.payload["params"])
+        return self.scraper.scrape_article(
+            lease.payload["teaser"]["link"], lease.payload["teaser"]
+        )
+
+    def process_archive_page(self, params: RequestParams) -> Dict[str, int]:
+        """
+        Add the articles and, for the first page, the further pages of the
+        archive page to the queue.
+        """
+        scraped = self.scraper.scrape_archive_teaser(params)
+        if scraped is None:
+            # The queue retries the unit
+            raise ValueError(f"Archive page {params} failed.")
+        teasers, archive = scraped
+        if params.get("pageIndex", "1") == "1":
+            for page in archive.extract_pagination()[1:]:
+                put_archive_unit(self.queue, params | page)
+        for teaser in teasers:
+            self.queue.put(
+                "article",
+                teaser["link"],
+                {
+                    "id": helper.get_hash_from_string(teaser["link"]),
+                    "teaser": teaser,
+                },
+            )
+        return {"teaser": len(teasers)}
@@ -0,0 +1,115 @@
+import json
+import os
+import shutil
+import unittest
+from tagesschauscraper import bulkimport
+from tagesschauscraper.db import TagesschauDB
+
+DUMPS = [
+    "tests/data/teaser-article-2023-01-01.json",
+    "tests/data/teaser-article-2023-03-01-2023-03-02.json",
+]
+
+
+class TestIterRecords(unittest.TestCase):
+    def setUp(self) -> None:
+        self.root_dir = "tests/tmp"
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.root_dir)
+
+    def test_records_are_parsed_across_chunks(self) -> None:
+        for file_path in DUMPS + ["tests/data/teaser-2023-01-01.json"]:
+            with open(file_path, "r") as f:
+                expected = json.load(f)["records"]
+            for chunk_size in [7, 100, 1 << 16]:
+                self.assertListEqual(
+                    list(bulkimport.iter_records(file_path, chunk_size)),
+                    expected,
+                )
+
+    def test_empty_list(self) -> None:
+        file_path = os.path.join(self.root_dir, "empty.json")
+        with open(file_path, "w") as f:
+            f.write('{"records": [ ]}')
+        self.assertListEqual(list(bulkimport.iter_records(file_path)), [])
+
+    def test_invalid_files(self) -> None:
+        file_path = os.path.join(self.root_dir, "invalid.json")
+        with open(DUMPS[0], "r") as f:
+            content = f.read()
+        for invalid in ['{"other": []}', content[: len(content) // 2]]:
+            with open(file_path, "w") as f:
+                f.write(invalid)
+            with self.assertRaises(ValueError):
+                list(bulkimport.iter_records(file_path, 100))
+
+    def test_record_to_row(self) -> None:
+        row = bulkimport.record_to_row(
+            {
+                "date": "2023-01-01 21:07:00",
+                "headline": "headline",
+                "link": "https://www.tagesschau.de/ausland/a.html",
+            }
+        )
+        self.assertEqual(len(row["id"]), 40)
+        self.assertEqual(row["tags"], "")
+
+
+class TestImportFiles(unittest.TestCase):
+    def setUp(self) -> None:
+        self.root_dir = "tests/tmp"
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.root_dir)
+
+    def import_files(self, db_name: str, workers: int) -> list[str]:
+        with TagesschauDB(os.path.join(self.root_dir, db_name)) as db:
+            counts = bulkimport.import_files(
+                db, DUMPS, workers=workers, batch_size=10, chunk_rows=7
+            )
+            self.assertDictEqual(
+                counts, {"files": 2, "read": 56, "loaded": 56}
+            )
+            ids = [row["id"] for row in db.query("SELECT id FROM Tagesschau")]
+            self.assertEqual(
+                sum(row["count"] for row in db.get_category_counts()), 56
+            )
+            self.assertTrue(
+                db.query(
+                    "SELECT 1 FROM sqlite_master"
+                    " WHERE name = 'TagesschauTimestamp'"
+                )
+            )
+            counts = bulkimport.import_files(db, DUMPS, workers=workers)
+            self.assertEqual(counts["loaded"], 0)
+        return ids
+
+    def test_import_in_process_and_in_parallel(self) -> None:
+        ids = self.import_files("sequential.db", workers=1)
+        self.assertEqual(len(set(ids)), 56)
+        parallel_ids = self.import_files("parallel.db", workers=2)
+        self.assertSetEqual(set(parallel_ids), set(ids))
+
+    def test_find_dump_files(self) -> None:
+        self.assertListEqual(
+            bulkimport.find_dump_files(["tests/data", DUMPS[0]]),
+            [
+                "tests/data/teaser-2023-01-01.json",
+                DUMPS[0],
+                DUMPS[1],
+                DUMPS[0],
+            ],
+        )
+
+    def test_bulk_load_with_writer_thread(self) -> None:
+        with TagesschauDB(":memory:") as db:
+            db.start_writer()
+            with self.assertRaises(ValueError):
+                db.bulk_load([])
+
+
+if __name__ == "__main__":
+    unittest.main()
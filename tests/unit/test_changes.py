@@ -0,0 +1,185 @@
+import os
+import shutil
+import unittest
+from datetime import date
+from typing import Any, Dict
+from unittest.mock import Mock
+import requests
+from requests import Response
+from tagesschauscraper import tagesschau
+from tagesschauscraper.changes import ArchiveChangeTracker
+from tagesschauscraper.failures import FailureLedger
+
+
+def create_response(
+    status_code: int, text: str = "", headers: Dict[str, str] = {}
+) -> Response:
+    responseMock = Mock(spec=Response)
+    responseMock.status_code = status_code
+    responseMock.text = text
+    responseMock.content = text.encode()
+    responseMock.headers = headers
+    return responseMock
+
+
+class TestArchiveChangeTracker(unittest.TestCase):
+    def setUp(self) -> None:
+        self.root_dir = "tests/tmp"
+        os.makedirs(self.root_dir, exist_ok=True)
+        self.params = {"datum": "2022-03-01", "ressort": "", "pageIndex": "1"}
+        self.tracker = ArchiveChangeTracker()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.root_dir)
+
+    def test_update_returns_new_links(self) -> None:
+        response = create_response(200, "page")
+        self.assertListEqual(
+            self.tracker.update(self.params, response, ["a", "b"]), ["a", "b"]
+        )
+        self.assertListEqual(
+            self.tracker.update(self.params, response, ["c", "a", "b"]), ["c"]
+        )
+        self.assertListEqual(
+            self.tracker.update(self.params, response, ["c", "a", "b"]), []
+        )
+
+    def test_teaser_moved_to_next_page_is_not_new(self) -> None:
+        response = create_response(200, "page")
+        next_page = self.params | {"pageIndex": "2"}
+        self.tracker.update(self.params, response, ["b", "a"])
+        self.tracker.update(next_page, response, [])
+        self.assertListEqual(
+            self.tracker.update(self.params, response, ["c", "b"]), ["c"]
+        )
+        self.assertListEqual(
+            self.tracker.update(next_page, response, ["a"]), []
+        )
+        other_date = self.params | {"datum": "2022-03-02"}
+        self.assertListEqual(
+            self.tracker.update(other_date, response, ["a"]), ["a"]
+        )
+
+    def test_conditional_request_headers(self) -> None:
+        response = create_response(
+            200,
+            "page",
+            {"ETag": '"abc"', "Last-Modified": "Tue, 01 Mar 2022 10:00:00"},
+        )
+        self.assertDictEqual(self.tracker.get_request_headers(self.params), {})
+        self.tracker.update(self.params, response, [])
+        self.assertDictEqual(
+            self.tracker.get_request_headers(self.params),
+            {
+                "If-None-Match": '"abc"',
+                "If-Modified-Since": "Tue, 01 Mar 2022 10:00:00",
+            },
+        )
+
+    def test_is_unchanged(self) -> None:
+        response = create_response(200, "page")
+        self.assertFalse(self.tracker.is_unchanged(self.params, response))
+        self.tracker.update(self.params, response, [])
+        self.assertTrue(self.tracker.is_unchanged(self.params, response))
+        self.assertFalse(
+            self.tracker.is_unchanged(
+                self.params, create_response(200, "changed page")
+            )
+        )
+        self.assertTrue(
+            self.tracker.is_unchanged(self.params, create_response(304))
+        )
+
+    def test_save_and_load(self) -> None:
+        file_path = os.path.join(self.root_dir, "fingerprints.json")
+        tracker = ArchiveChangeTracker(file_path)
+        tracker.update(self.params, create_response(200, "page"), ["a"])
+        tracker.save()
+        loaded_tracker = ArchiveChangeTracker(file_path)
+        self.assertDictEqual(loaded_tracker.pages, tracker.pages)
+        self.assertDictEqual(loaded_tracker.seen_links, tracker.seen_links)
+
+
+class TestGetNewNewsFromArchive(unittest.TestCase):
+    def setUp(self) -> None:
+        with open("tests/data/archive.html", "r") as f:
+            self.archive_response = create_response(
+                200, f.read(), {"ETag": '"v1"'}
+            )
+        with open("tests/data/article.html", "r") as f:
+            self.article_response = create_response(200, f.read())
+        self.session = Mock()
+        self.session.get.side_effect = self.get
+        self.scraper = tagesschau.TagesschauScraper(session=self.session)
+        self.config = Mock(spec=tagesschau.ScraperConfig)
+        self.config.request_params = [
+            {"datum": "2022-03-01", "ressort": "", "pageIndex": "1"}
+        ]
+        self.tracker = ArchiveChangeTracker()
+        self.article_errors = 0
+
+    def get(self, url: str, **kwargs: Any) -> Response:
+        if url == tagesschau.ARCHIVE_URL:
+            if kwargs["headers"].get("If-None-Match") == '"v1"':
+                return create_response(304)
+            return self.archive_response
+        if self.article_errors:
+            self.article_errors -= 1
+            raise requests.ConnectionError()
+        return self.article_response
+
+    def scrape(self) -> list[tagesschau.NewsRecord]:
+        return self.scraper.get_new_news_from_archive(
+            self.config, self.tracker
+        )["records"]
+
+    def test_only_new_teaser_are_scraped(self) -> None:
+        records = self.scraper.get_new_news_from_archive(
+            self.config, self.tracker
+        )["records"]
+        self.assertEqual(len(records), 20)
+        self.assertEqual(self.session.get.call_count, 21)
+        records = self.scraper.get_new_news_from_archive(
+            self.config, self.tracker
+        )["records"]
+        self.assertListEqual(records, [])
+        self.assertEqual(self.session.get.call_count, 22)
+
+    def test_teaser_are_kept_when_an_article_raises(self) -> None:
+        self.article_errors = 1
+        with self.assertRaises(requests.ConnectionError):
+            self.scrape()
+        self.assertEqual(len(self.scrape()), 20)
+        self.assertListEqual(self.scrape(), [])
+
+    def test_failed_articles_are_scraped_again(self) -> None:
+        self.scraper.failure_ledger = FailureLedger()
+        self.article_errors = 1
+        self.assertEqual(len(self.scrape()), 19)
+        self.assertEqual(len(self.scrape()), 1)
+        self.assertListEqual(self.scrape(), [])
+
+    def test_new_pages_are_added(self) -> None:
+        with open("tests/data/archive-pagination.html", "r") as f:
+            self.archive_response = create_response(200, f.read())
+        config = tagesschau.ScraperConfig(
+            tagesschau.ArchiveFilter({"date": date(2022, 3, 1)}),
+            session=self.session,
+            paginate=False,
+        )
+        self.assertEqual(len(config.request_params), 1)
+        self.scraper.get_new_news_from_archive(config, self.tracker)
+        self.assertListEqual(
+            [params["pageIndex"] for params in config.request_params],
+            ["1", "2", "3"],
+        )
+        archive_calls = [
+            call
+            for call in self.session.get.call_args_list
+            if call.args[0] == tagesschau.ARCHIVE_URL
+        ]
+        self.assertEqual(len(archive_calls), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
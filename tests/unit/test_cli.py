@@ -0,0 +1,104 @@
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from tagesschauscraper import cli
+
+# Budget for the cumulative import time of the CLI module in microseconds
+IMPORT_TIME_BUDGET = 150_000
+HEAVY_MODULES = ["requests", "bs4", "sqlite3"]
+
+
+def run_python(code: str, *options: str) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(
+        [sys.executable, *options, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+class TestImportTime(unittest.TestCase):
+    def test_import_time_budget(self) -> None:
+        result = run_python("import tagesschauscraper.cli", "-X", "importtime")
+        cumulative_times = [
+            int(line.split("|")[1])
+            for line in result.stderr.splitlines()
+            if line.endswith(" tagesschauscraper.cli")
+        ]
+        self.assertEqual(len(cumulative_times), 1)
+        self.assertLess(cumulative_times[0], IMPORT_TIME_BUDGET)
+
+    def test_help_does_not_import_heavy_modules(self) -> None:
+        result = run_python(
+            "import sys\n"
+            "from tagesschauscraper import cli\n"
+            "try:\n"
+            "    cli.main(['--help'])\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            f"print([m for m in {HEAVY_MODULES} if m in sys.modules])"
+        )
+        self.assertEqual(result.stdout.splitlines()[-1], "[]")
+
+    def test_db_is_imported_lazily(self) -> None:
+        result = run_python(
+            "import sys\n"
+            "from tagesschauscraper import tagesschau\n"
+            "print('sqlite3' in sys.modules)\n"
+            "tagesschau.TagesschauDB\n"
+            "print('sqlite3' in sys.modules)"
+        )
+        self.assertListEqual(result.stdout.split(), ["False", "True"])
+
+
+class TestChoices(unittest.TestCase):
+    def test_choices_match_their_modules(self) -> None:
+        from tagesschauscraper import profiling, serializers, transport
+
+        self.assertListEqual(cli.PROFILE_MODES, profiling.PROFILE_MODES)
+        self.assertListEqual(cli.TRANSPORTS, transport.TRANSPORTS)
+        self.assertListEqual(cli.FORMATS, list(serializers.SERIALIZERS))
+
+
+class TestQuery(unittest.TestCase):
+    def setUp(self) -> None:
+        self.root_dir = "tests/tmp"
+        os.makedirs(self.root_dir, exist_ok=True)
+        self.db = os.path.join(self.root_dir, "news.db")
+        conn = sqlite3.connect(self.db)
+        with conn:
+            conn.execute(
+                "CREATE TABLE Tagesschau (id text UNIQUE, timestamp datetime,"
+                " topline text, headline text, shorttext text, link text,"
+                " tags text)"
+            )
+            conn.executemany(
+                "INSERT INTO Tagesschau VALUES (?, ?, '', '', '', '', '')",
+                [("a", "2022-03-01 10:00:00"), ("b", "2022-03-01 11:00:00")],
+            )
+        conn.close()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.root_dir)
+
+    def test_query_latest(self) -> None:
+        stdout = StringIO()
+        with redirect_stdout(stdout):
+            exit_code = cli.main(["query", "--db", self.db, "--limit", "1"])
+        self.assertEqual(exit_code, 0)
+        rows = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertListEqual([row["id"] for row in rows], ["b"])
+
+    def test_query_missing_db(self) -> None:
+        missing_db = os.path.join(self.root_dir, "missing.db")
+        self.assertEqual(cli.main(["query", "--db", missing_db]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
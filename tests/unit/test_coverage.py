@@ -0,0 +1,167 @@
+import os
+import shutil
+import unittest
+from datetime import date
+from typing import Any
+from unittest.mock import Mock
+from requests import Response
+from tagesschauscraper import coverage, helper, tagesschau
+from tagesschauscraper.coverage import ArchiveCounts, CoveragePlanner, Gap
+from tagesschauscraper.db import TagesschauDB, news_record_to_row
+from tagesschauscraper.failures import FailureLedger
+
+
+def create_response(file_name: str) -> Response:
+    responseMock = Mock(spec=Response)
+    responseMock.status_code = 200
+    with open(file_name, "r") as f:
+        responseMock.text = f.read()
+    return responseMock
+
+
+class TestParseNumTeaser(unittest.TestCase):
+    def test_parse_num_teaser(self) -> None:
+        self.assertEqual(coverage.parse_num_teaser("418"), 418)
+        self.assertEqual(coverage.parse_num_teaser(" 1.418\n"), 1418)
+        self.assertIsNone(coverage.parse_num_teaser("keine"))
+        self.assertIsNone(coverage.parse_num_teaser(None))
+
+
+class TestCoveragePlanner(unittest.TestCase):
+    def setUp(self) -> None:
+        self.root_dir = "tests/tmp"
+        os.makedirs(self.root_dir, exist_ok=True)
+        self.archive_response = create_response("tests/data/archive.html")
+        self.article_response = create_response("tests/data/article.html")
+        self.session = Mock()
+        self.session.get.side_effect = self.get
+        self.scraper = tagesschau.TagesschauScraper(session=self.session)
+        self.tagesschauDB = TagesschauDB(":memory:")
+        self.tagesschauDB.create_table()
+        self.date = date(2022, 3, 1)
+        self.archive_counts = ArchiveCounts(
+            os.path.join(self.root_dir, "counts.json")
+        )
+        self.planner = self.create_planner()
+
+    def tearDown(self) -> None:
+        self.tagesschauDB.close()
+        shutil.rmtree(self.root_dir)
+
+    def create_planner(self) -> CoveragePlanner:
+        return CoveragePlanner(
+            self.tagesschauDB,
+            scraper=self.scraper,
+            archive_counts=self.archive_counts,
+            today=lambda: date(2023, 1, 1),
+        )
+
+    def get(self, url: str, **kwargs: Any) -> Response:
+        if url == tagesschau.ARCHIVE_URL:
+            return self.archive_response
+        return self.article_response
+
+    def get_requested_links(self) -> list[str]:
+        return [call.args[0] for call in self.session.get.call_args_list]
+
+    def test_plan_finds_gap(self) -> None:
+        self.assertListEqual(
+            self.planner.plan([self.date]), [Gap(self.date, "all", 20, 0, 1)]
+        )
+        self.assertListEqual(
+            self.get_requested_links(), [tagesschau.ARCHIVE_URL]
+        )
+
+    def test_run_scrapes_only_missing_news(self) -> None:
+        teasers = self.scraper.scrape_teaser(self.archive_response)["records"]
+        self.tagesschauDB.insert_many(
+            news_record_to_row(
+                {
+                    "id": helper.get_hash_from_string(teaser["link"]),
+                    "teaser": teaser,
+                }
+            )
+            for teaser in teasers[:15]
+        )
+        records = self.planner.run([self.date])["records"]
+        self.assertSetEqual(
+            {record["id"] for record in records},
+            {
+                helper.get_hash_from_string(teaser["link"])
+                for teaser in teasers[15:]
+            },
+        )
+        self.assertEqual(len(self.get_requested_links()), 1 + 5)
+        self.assertEqual(self.planner.get_stored_count(self.date, "all"), 20)
+
+    def test_complete_settled_dates_need_no_request(self) -> None:
+        self.planner.run([self.date])
+        self.session.get.reset_mock()
+        planner = CoveragePlanner(
+            self.tagesschauDB,
+            scraper=self.scraper,
+            archive_counts=ArchiveCounts(self.archive_counts.file_path),
+            today=lambda: date(2023, 1, 1),
+        )
+        self.assertListEqual(planner.plan([self.date]), [])
+        self.assertListEqual(self.get_requested_links(), [])
+
+    def test_unsettled_dates_are_checked_again(self) -> None:
+        self.planner.run([self.date])
+        self.session.get.reset_mock()
+        self.planner.today = lambda: self.date
+        self.assertListEqual(self.planner.plan([self.date]), [])
+        self.assertListEqual(
+            self.get_requested_links(), [tagesschau.ARCHIVE_URL]
+        )
+
+    def test_fewer_valid_teasers_than_listed(self) -> None:
+        # Three pages listing 418 news, here every page has the same teasers
+        self.archive_response = create_response(
+            "tests/data/archive-pagination.html"
+        )
+        day = date(2022, 1, 26)
+        gap = self.planner.plan([day])[0]
+        self.assertEqual((gap.expected, gap.pages), (418, 3))
+        records = self.planner.fill(gap)
+        self.assertEqual(len(records), 140)
+        self.assertEqual(
+            self.get_requested_links().count(tagesschau.ARCHIVE_URL), 3
+        )
+        self.assertEqual(
+            self.archive_counts.get(day, "all"),
+            {"expected": 418, "pages": 3, "found": 25},
+        )
+        self.assertListEqual(self.planner.plan([day]), [])
+
+    def test_failed_article_leaves_day_unchecked(self) -> None:
+        self.archive_response = create_response(
+            "tests/data/archive-pagination.html"
+        )
+        self.scraper.failure_ledger = FailureLedger()
+        day = date(2022, 1, 26)
+        gap = self.planner.plan([day])[0]
+        teasers = self.scraper.scrape_teaser(self.archive_response)["records"]
+        failed_link = teasers[0]["link"]
+
+        def get(url: str, **kwargs: Any) -> Response:
+            if url == failed_link:
+                raise ValueError("broken")
+            return self.get(url, **kwargs)
+
+        self.session.get.side_effect = get
+        records = self.planner.fill(gap)
+        self.assertEqual(len(records), 139)
+        counts = self.archive_counts.get(day, "all")
+        assert counts is not None
+        self.assertNotIn("found", counts)
+        self.assertTrue(self.scraper.is_failed(failed_link))
+        self.session.get.side_effect = self.get
+        self.assertEqual(len(self.planner.run([day])["records"]), 1)
+        counts = self.archive_counts.get(day, "all")
+        assert counts is not None
+        self.assertEqual(counts["found"], 25)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,273 @@
+import os
+import shutil
+import sqlite3
+import threading
+import unittest
+from unittest.mock import patch
+from tagesschauscraper import db, helper
+
+
+def create_row(id_: str, date: str = "2022-03-01 10:00:00") -> db.Row:
+    return {
+        "id": id_,
+        "date": date,
+        "topline": "topline",
+        "headline": "headline",
+        "shorttext": "shorttext",
+        "link": f"https://www.tagesschau.de/inland/{id_}.html",
+        "tags": "tag1,tag2",
+    }
+
+
+class TestNewsRecordToRow(unittest.TestCase):
+    def test_news_record_to_row(self) -> None:
+        row = create_row("a")
+        record = {
+            "id": "a",
+            "teaser": {
+                key: row[key]
+                for key in ["date", "topline", "headline", "shorttext", "link"]
+            },
+            "article": {"tags": row["tags"]},
+        }
+        self.assertDictEqual(db.news_record_to_row(record), row)
+
+
+class TestTagesschauDB(unittest.TestCase):
+    def setUp(self) -> None:
+        self.root_dir = "tests/tmp"
+        os.makedirs(self.root_dir, exist_ok=True)
+        self.tagesschauDB = db.TagesschauDB(
+            os.path.join(self.root_dir, "news.db"), batch_size=10
+        )
+        self.tagesschauDB.create_table()
+
+    def tearDown(self) -> None:
+        self.tagesschauDB.close()
+        shutil.rmtree(self.root_dir)
+
+    def count(self) -> int:
+        rows = self.tagesschauDB.query("SELECT COUNT(*) AS n FROM Tagesschau")
+        return int(rows[0]["n"])
+
+    def test_insert_and_query(self) -> None:
+        self.tagesschauDB.insert(create_row("a"))
+        self.tagesschauDB.insert(create_row("a"))
+        rows = self.tagesschauDB.query("SELECT id, timestamp FROM Tagesschau")
+        self.assertListEqual(
+            rows, [{"id": "a", "timestamp": "2022-03-01 10:00:00"}]
+        )
+
+    def test_writer_thread_with_concurrent_inserts(self) -> None:
+        self.tagesschauDB.start_writer()
+
+        def insert(thread_number: int) -> None:
+            for i in range(50):
+                self.tagesschauDB.insert(create_row(f"{thread_number}-{i}"))
+
+        threads = [
+            threading.Thread(target=insert, args=(n,)) for n in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.tagesschauDB.flush()
+        self.assertEqual(self.count(), 400)
+        self.tagesschauDB.stop_writer()
+        self.tagesschauDB.insert(create_row("sync"))
+        self.assertEqual(self.count(), 401)
+
+    def test_writer_survives_any_error(self) -> None:
+        self.tagesschauDB.start_writer()
+        errors: list[BaseException] = []
+
+        def flush() -> None:
+            try:
+                self.tagesschauDB.flush()
+            except BaseException as e:
+                errors.append(e)
+
+        with patch.object(
+            db.TagesschauDB, "_write_batch", side_effect=KeyError("tags")
+        ):
+            self.tagesschauDB.insert(create_row("a"))
+            thread = threading.Thread(target=flush, daemon=True)
+            thread.start()
+            thread.join(timeout=10)
+        self.assertFalse(thread.is_alive(), "flush() did not return")
+        self.assertEqual(len(errors), 1)
+        self.assertIsInstance(errors[0], KeyError)
+        self.tagesschauDB.insert(create_row("b"))
+        self.tagesschauDB.flush()
+        self.assertEqual(self.count(), 1)
+
+    def test_query_from_other_thread(self) -> None:
+        self.tagesschauDB.insert_many([create_row("a"), create_row("b")])
+        counts = []
+        thread = threading.Thread(target=lambda: counts.append(self.count()))
+        thread.start()
+        thread.join()
+        self.assertListEqual(counts, [2])
+
+    def test_memory_db_with_writer_thread(self) -> None:
+        tagesschauDB = db.TagesschauDB(":memory:")
+        tagesschauDB.create_table()
+        tagesschauDB.start_writer()
+        tagesschauDB.insert(create_row("a"))
+        tagesschauDB.flush()
+        self.assertEqual(
+            len(tagesschauDB.query("SELECT id FROM Tagesschau")), 1
+        )
+        tagesschauDB.close()
+
+
+class TestUpsert(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tagesschauDB = db.TagesschauDB(":memory:", upsert=True)
+        self.tagesschauDB.create_table()
+
+    def tearDown(self) -> None:
+        self.tagesschauDB.close()
+
+    def get_history(self) -> list[dict[str, str]]:
+        return self.tagesschauDB.query(
+            "SELECT id, headline, content_hash FROM TagesschauHistory"
+        )
+
+    def test_changed_row_is_updated_and_kept_in_history(self) -> None:
+        row = create_row("a")
+        self.tagesschauDB.insert(row)
+        self.tagesschauDB.insert(row | {"headline": "new headline"})
+        rows = self.tagesschauDB.query("SELECT * FROM Tagesschau")
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["headline"], "new headline")
+        self.assertEqual(
+            rows[0]["content_hash"],
+            db.get_row_hash(row | {"headline": "new headline"}),
+        )
+        self.assertListEqual(
+            self.get_history(),
+            [
+                {
+                    "id": "a",
+                    "headline": "headline",
+                    "content_hash": db.get_row_hash(row),
+                }
+            ],
+        )
+
+    def test_unchanged_row_has_no_history(self) -> None:
+        self.tagesschauDB.insert(create_row("a"))
+        self.tagesschauDB.insert(create_row("a"))
+        rows = self.tagesschauDB.query("SELECT * FROM Tagesschau")
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["last_changed"], rows[0]["first_seen"])
+        self.assertListEqual(self.get_history(), [])
+
+    def test_bulk_load_counts_changed_rows(self) -> None:
+        rows = [create_row("a"), create_row("b")]
+        self.assertEqual(self.tagesschauDB.bulk_load(rows), 2)
+        self.assertEqual(self.tagesschauDB.bulk_load(rows), 0)
+        changed = rows[1] | {"headline": "new headline"}
+        self.assertEqual(self.tagesschauDB.bulk_load([rows[0], changed]), 1)
+        self.assertEqual(
+            self.tagesschauDB.bulk_load([create_row("c"), create_row("c")]),
+            1,
+        )
+
+    def test_changed_row_is_ignored_without_upsert(self) -> None:
+        self.tagesschauDB.upsert = False
+        self.tagesschauDB.insert(create_row("a"))
+        self.tagesschauDB.insert(create_row("a") | {"headline": "new"})
+        rows = self.tagesschauDB.query("SELECT headline FROM Tagesschau")
+        self.assertListEqual(rows, [{"headline": "headline"}])
+
+    def test_tracking_columns_are_added_to_existing_table(self) -> None:
+        tagesschauDB = db.TagesschauDB(":memory:", upsert=True)
+        tagesschauDB.conn.execute(
+            "CREATE TABLE Tagesschau (id text UNIQUE, timestamp datetime,"
+            " topline text, headline text, shorttext text, link text,"
+            " tags text)"
+        )
+        tagesschauDB.create_table()
+        tagesschauDB.insert(create_row("a"))
+        rows = tagesschauDB.query("SELECT content_hash FROM Tagesschau")
+        self.assertEqual(
+            rows[0]["content_hash"], db.get_row_hash(create_row("a"))
+        )
+        with self.assertRaises(sqlite3.OperationalError):
+            tagesschauDB.query("SELECT missing FROM Tagesschau")
+        tagesschauDB.close()
+
+
+class TestRollups(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tagesschauDB = db.TagesschauDB(":memory:", upsert=True)
+        self.tagesschauDB.create_table()
+
+    def tearDown(self) -> None:
+        self.tagesschauDB.close()
+
+    def insert_rows(self) -> None:
+        row_c = create_row("c", date="2022-03-02 08:00:00")
+        row_c["link"] = "https://www.tagesschau.de/ausland/europa/c.html"
+        self.tagesschauDB.insert_many(
+            [create_row("a"), create_row("b") | {"tags": "tag2"}, row_c]
+        )
+
+    def test_get_category_from_link(self) -> None:
+        self.assertEqual(
+            helper.get_category_from_link(
+                "https://www.tagesschau.de/ausland/europa/c.html"
+            ),
+            "ausland",
+        )
+        self.assertEqual(helper.get_category_from_link("/a.html"), "")
+
+    def test_counts_are_updated_on_insert(self) -> None:
+        self.insert_rows()
+        self.tagesschauDB.insert(create_row("a"))
+        self.assertListEqual(
+            self.tagesschauDB.get_daily_counts(),
+            [
+                {"day": "2022-03-01", "category": "inland", "count": 2},
+                {"day": "2022-03-02", "category": "ausland", "count": 1},
+            ],
+        )
+        self.assertListEqual(
+            self.tagesschauDB.get_category_counts(end="2022-03-02"),
+            [{"category": "inland", "count": 2}],
+        )
+        self.assertListEqual(
+            self.tagesschauDB.get_tag_counts(limit=1),
+            [{"tag": "tag2", "count": 3}],
+        )
+        self.assertListEqual(
+            self.tagesschauDB.get_tag_counts(category="ausland"),
+            [{"tag": "tag1", "count": 1}, {"tag": "tag2", "count": 1}],
+        )
+
+    def test_counts_follow_upserted_rows(self) -> None:
+        self.insert_rows()
+        self.tagesschauDB.insert(create_row("a") | {"tags": "tag3"})
+        tag_counts = {
+            row["tag"]: row["count"]
+            for row in self.tagesschauDB.get_tag_counts(start="2022-03-01")
+        }
+        self.assertDictEqual(tag_counts, {"tag1": 1, "tag2": 2, "tag3": 1})
+
+    def test_rebuild_rollups(self) -> None:
+        self.insert_rows()
+        daily_counts = self.tagesschauDB.get_daily_counts()
+        tag_counts = self.tagesschauDB.get_tag_counts()
+        self.tagesschauDB.conn.execute("DELETE FROM TagesschauTagCounts")
+        self.tagesschauDB.rebuild_rollups()
+        self.assertListEqual(
+            self.tagesschauDB.get_daily_counts(), daily_counts
+        )
+        self.assertListEqual(self.tagesschauDB.get_tag_counts(), tag_counts)
+
+
+if __name__ == "__main__":
+    unittest.main()
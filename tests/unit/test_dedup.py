@@ -0,0 +1,127 @@
+import os
+import shutil
+import unittest
+from typing import Any
+from unittest.mock import Mock, patch
+from requests import Response
+from tagesschauscraper import db, dedup, tagesschau
+
+
+class TestContentHash(unittest.TestCase):
+    def test_normalize_text(self) -> None:
+        self.assertEqual(
+            dedup.normalize_text(" Die  Nord Stream\n2 AG "),
+            "die nord stream 2 ag",
+        )
+
+    def test_get_content_hash_ignores_whitespace_and_case(self) -> None:
+        self.assertEqual(
+            dedup.get_content_hash("Die Nord Stream 2 AG"),
+            dedup.get_content_hash("die  nord stream\n2 AG"),
+        )
+        self.assertNotEqual(
+            dedup.get_content_hash("Die Nord Stream 2 AG"),
+            dedup.get_content_hash("Die Nord Stream 1 AG"),
+        )
+
+
+class TestContentStore(unittest.TestCase):
+    def setUp(self) -> None:
+        self.root_dir = "tests/tmp"
+        os.makedirs(self.root_dir, exist_ok=True)
+        self.store = dedup.ContentStore()
+        self.article = {"tags": "Insolvenz,Pipeline"}
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.root_dir)
+
+    def test_duplicate_content_under_different_link(self) -> None:
+        content_id = self.store.put("link-a", "Text", self.article)
+        self.assertEqual(
+            self.store.put("link-b", " text ", {"tags": ""}), content_id
+        )
+        self.assertFalse(self.store.is_duplicate("link-a"))
+        self.assertTrue(self.store.is_duplicate("link-b"))
+        self.assertFalse(self.store.is_duplicate("link-c"))
+        self.assertEqual(self.store.get_by_link("link-b"), self.article)
+
+    def test_articles_without_text_are_keyed_by_link(self) -> None:
+        self.store.put("link-a", "", {"tags": "A"})
+        self.store.put("link-b", " \n", {"tags": "B"})
+        self.assertFalse(self.store.is_duplicate("link-a"))
+        self.assertFalse(self.store.is_duplicate("link-b"))
+        self.assertEqual(self.store.get_by_link("link-a"), {"tags": "A"})
+        self.assertEqual(self.store.get_by_link("link-b"), {"tags": "B"})
+
+    def test_save_and_load(self) -> None:
+        file_path = os.path.join(self.root_dir, "contents.json")
+        store = dedup.ContentStore(file_path)
+        store.put("link-a", "Text", self.article, headers={"ETag": '"v1"'})
+        store.save()
+        loaded_store = dedup.ContentStore(file_path)
+        self.assertDictEqual(loaded_store.link_index, store.link_index)
+        self.assertDictEqual(loaded_store.contents, store.contents)
+        self.assertDictEqual(
+            loaded_store.get_request_headers("link-a"),
+            {"If-None-Match": '"v1"'},
+        )
+
+
+class TestScraperWithContentStore(unittest.TestCase):
+    def setUp(self) -> None:
+        responseMock = Mock(spec=Response)
+        responseMock.status_code = 200
+        responseMock.headers = {"ETag": '"v1"'}
+        with open("tests/data/article.html", "r") as f:
+            responseMock.text = f.read()
+        self.response = responseMock
+        self.session = Mock()
+        self.session.get.return_value = responseMock
+        self.store = dedup.ContentStore()
+        self.scraper = tagesschau.TagesschauScraper(
+            session=self.session, content_store=self.store
+        )
+
+    def test_known_link_is_revalidated(self) -> None:
+        article = self.scraper.scrape_article("link-a")
+        self.assertDictEqual(self.session.get.call_args.kwargs, {})
+        not_modified = Mock(spec=Response)
+        not_modified.status_code = 304
+        self.session.get.return_value = not_modified
+        self.assertDictEqual(self.scraper.scrape_article("link-a"), article)
+        self.assertDictEqual(
+            self.session.get.call_args.kwargs,
+            {"headers": {"If-None-Match": '"v1"'}},
+        )
+        self.response.headers = {"ETag": '"v2"'}
+        self.session.get.return_value = self.response
+        self.assertDictEqual(self.scraper.scrape_article("link-a"), article)
+        self.assertDictEqual(
+            self.store.get_request_headers("link-a"),
+            {"If-None-Match": '"v2"'},
+        )
+        self.scraper.scrape_article("link-b")
+        self.assertTrue(self.store.is_duplicate("link-b"))
+
+    def test_duplicate_is_skipped_on_insert(self) -> None:
+        self.scraper.scrape_article("link-a")
+        self.scraper.scrape_article("link-b")
+        content: Any = {
+            "id": "id",
+            "date": "2022-03-01 22:23:00",
+            "topline": "topline",
+            "headline": "headline",
+            "shorttext": "shorttext",
+            "tags": "tags",
+        }
+        with patch.object(db.TagesschauDB, "_DB_NAME", ":memory:"):
+            tagesschauDB = db.TagesschauDB(content_store=self.store)
+        tagesschauDB.create_table()
+        tagesschauDB.insert(content | {"id": "a", "link": "link-a"})
+        tagesschauDB.insert(content | {"id": "b", "link": "link-b"})
+        tagesschauDB.c.execute("SELECT id FROM Tagesschau")
+        self.assertListEqual(tagesschauDB.c.fetchall(), [("a",)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+from bs4 import BeautifulSoup
+from tagesschauscraper.extraction import ExtractionSpec, Field
+
+HTML = """
+<div class="page">
+  <h1 class="title main">Archiv</h1>
+  <div class="item wide"><span class="item__name">A</span>
+    <a class="item__link" href="/a">Link</a></div>
+  <div class="item"><span class="item__name">Ignored</span></div>
+  <div class="item wide"><span class="item__name">B</span>
+    <span class="item__name">Second</span></div>
+  <ul class="pages"><li>1</li><li>2</li></ul>
+  <li>outside</li>
+</div>
+"""
+
+
+class TestExtractionSpec(unittest.TestCase):
+    def setUp(self) -> None:
+        self.soup = BeautifulSoup(HTML, "html.parser")
+
+    def test_extract(self) -> None:
+        spec = ExtractionSpec(
+            [
+                Field("title", class_="main title"),
+                Field("name", class_="item__name"),
+                Field("pages", tag="li", within="pages", multiple=True),
+                Field("missing", class_="missing"),
+            ]
+        )
+        self.assertDictEqual(
+            spec.extract(self.soup),
+            {"title": "Archiv", "name": "A", "pages": ["1", "2"]},
+        )
+
+    def test_extract_all(self) -> None:
+        spec = ExtractionSpec(
+            [
+                Field("name", class_="item__name"),
+                Field("link", class_="item__link", attr="href"),
+            ],
+            root="wide item",
+        )
+        self.assertListEqual(
+            spec.extract_all(self.soup),
+            [{"name": "A", "link": "/a"}, {"name": "B"}],
+        )
+
+    def test_invalid_spec(self) -> None:
+        with self.assertRaises(ValueError):
+            ExtractionSpec([Field("name")])
+        with self.assertRaises(ValueError):
+            ExtractionSpec([Field("name", tag="p")]).extract_all(self.soup)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,203 @@
+import os
+import shutil
+import unittest
+from datetime import date
+from typing import Any
+from unittest.mock import Mock
+import requests
+from requests import Response
+from tagesschauscraper import retrieve, tagesschau
+from tagesschauscraper.failures import FailureLedger, retry_failures
+
+ARTICLE_LINK = "https://www.tagesschau.de/wirtschaft/artikel.html"
+TEASER = {"date": "2022-03-01 10:00:00", "link": ARTICLE_LINK}
+
+
+def create_response(file_name: str, status_code: int = 200) -> Response:
+    responseMock = Mock(spec=Response)
+    responseMock.status_code = status_code
+    responseMock.url = file_name
+    with open(file_name, "r") as f:
+        responseMock.text = f.read()
+    return responseMock
+
+
+class TestHTTPStatusError(unittest.TestCase):
+    def test_get_soup_raises_labeled_error(self) -> None:
+        response = create_response("tests/data/article.html", 503)
+        with self.assertRaises(retrieve.HTTPStatusError) as context:
+            retrieve.get_soup(response)
+        self.assertEqual(context.exception.status_code, 503)
+        self.assertIsInstance(context.exception, ValueError)
+
+
+class TestFailureLedger(unittest.TestCase):
+    def setUp(self) -> None:
+        self.root_dir = "tests/tmp"
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.root_dir)
+
+    def test_record_and_resolve(self) -> None:
+        ledger = FailureLedger()
+        error = retrieve.HTTPStatusError(ARTICLE_LINK, 503)
+        ledger.record(ARTICLE_LINK, error, teaser=TEASER)
+        failure = ledger.record(ARTICLE_LINK, requests.ConnectionError())
+        self.assertEqual(failure["attempts"], 2)
+        self.assertEqual(failure["error"], "ConnectionError")
+        self.assertIsNone(failure["status"])
+        self.assertDictEqual(failure["teaser"], TEASER)
+        self.assertListEqual(ledger.get_failures(max_attempts=2), [])
+        self.assertEqual(len(ledger.get_failures(kind="article")), 1)
+        ledger.resolve(ARTICLE_LINK)
+        self.assertFalse(ARTICLE_LINK in ledger)
+
+    def test_save_and_load(self) -> None:
+        file_path = os.path.join(self.root_dir, "failures.json")
+        ledger = FailureLedger(file_path)
+        ledger.record(
+            ARTICLE_LINK, retrieve.HTTPStatusError(ARTICLE_LINK, 404)
+        )
+        ledger.save()
+        self.assertDictEqual(
+            FailureLedger(file_path).failures, ledger.failures
+        )
+
+    def test_invalid_kind(self) -> None:
+        with self.assertRaises(ValueError):
+            FailureLedger().record(ARTICLE_LINK, ValueError(), kind="teaser")
+
+
+class TestScraperWithFailureLedger(unittest.TestCase):
+    def setUp(self) -> None:
+        self.article_status = 503
+        self.archive_error: Any = None
+        self.session = Mock()
+        self.session.get.side_effect = self.get
+        self.ledger = FailureLedger()
+        self.scraper = tagesschau.TagesschauScraper(
+            session=self.session, failure_ledger=self.ledger
+        )
+
+    def get(self, url: str, **kwargs: Any) -> Response:
+        if url == tagesschau.ARCHIVE_URL:
+            if self.archive_error is not None:
+                raise self.archive_error
+            return create_response("tests/data/archive.html")
+        return create_response("tests/data/article.html", self.article_status)
+
+    def test_failed_article_is_recorded(self) -> None:
+        self.assertDictEqual(self.scraper.scrape_article(ARTICLE_LINK), {})
+        failure = self.ledger.failures[ARTICLE_LINK]
+        self.assertEqual(failure["status"], 503)
+        self.assertEqual(failure["error"], "HTTPStatusError")
+
+    def test_failed_archive_page_is_recorded(self) -> None:
+        params = {"datum": "2022-03-01", "ressort": "", "pageIndex": "1"}
+        url = retrieve.get_request_url(tagesschau.ARCHIVE_URL, params)
+        self.archive_error = requests.ConnectionError()
+        self.assertIsNone(self.scraper.scrape_archive_teaser(params))
+        self.assertEqual(self.ledger.failures[url]["kind"], "pagination")
+        self.archive_error = None
+        scraped = self.scraper.scrape_archive_teaser(params)
+        assert scraped is not None
+        self.assertEqual(len(scraped[0]), 20)
+        self.assertFalse(url in self.ledger)
+
+    def test_failed_article_without_ledger_raises(self) -> None:
+        scraper = tagesschau.TagesschauScraper(session=self.session)
+        with self.assertRaises(retrieve.HTTPStatusError):
+            scraper.scrape_article(ARTICLE_LINK)
+
+    def test_too_many_redirects_is_recorded(self) -> None:
+        self.session.get.side_effect = requests.TooManyRedirects()
+        self.assertDictEqual(self.scraper.scrape_article(ARTICLE_LINK), {})
+        self.assertEqual(
+            self.ledger.failures[ARTICLE_LINK]["error"], "TooManyRedirects"
+        )
+
+    def test_retry_failed_articles(self) -> None:
+        self.scraper._merge_teaser_and_article_tags(TEASER)
+        self.assertEqual(len(self.ledger), 1)
+        self.article_status = 200
+        records = retry_failures(self.scraper)["records"]
+        self.assertEqual(len(records), 1)
+        self.assertDictEqual(records[0]["teaser"], TEASER)  # type: ignore
+        self.assertNotEqual(records[0]["article"], {})
+        self.assertEqual(len(self.ledger), 0)
+
+    def test_retry_failed_article_without_teaser(self) -> None:
+        self.scraper.scrape_article(ARTICLE_LINK)
+        self.assertNotIn("teaser", self.ledger.failures[ARTICLE_LINK])
+        self.article_status = 200
+        self.assertListEqual(retry_failures(self.scraper)["records"], [])
+        self.assertEqual(len(self.ledger), 0)
+
+    def test_retry_failed_archive_page(self) -> None:
+        config = tagesschau.ScraperConfig(
+            [tagesschau.ArchiveFilter({"date": date(2022, 3, 1)})],
+            session=self.session,
+        )
+        self.archive_error = requests.ConnectionError()
+        self.article_status = 200
+        records = self.scraper.get_news_from_archive(config)["records"]
+        self.assertListEqual(records, [])
+        failures = self.ledger.get_failures(kind="archive")
+        self.assertEqual(len(failures), 1)
+        self.assertTrue(failures[0]["url"].startswith(tagesschau.ARCHIVE_URL))
+
+        self.archive_error = None
+        self.session.get.side_effect = lambda url, **kwargs: self.get(
+            url.split("?")[0], **kwargs
+        )
+        records = retry_failures(self.scraper, max_workers=2)["records"]
+        self.assertGreater(len(records), 0)
+        self.assertEqual(len(self.ledger), 0)
+
+    def test_failed_articles_are_left_out(self) -> None:
+        response = create_response("tests/data/archive.html")
+        records = self.scraper.scrape_teaser_and_articles(response)
+        self.assertListEqual(records["records"], [])
+        self.assertEqual(len(self.ledger.get_failures(kind="article")), 20)
+        self.article_status = 200
+        records = retry_failures(self.scraper)
+        self.assertEqual(len(records["records"]), 20)
+        self.assertTrue(
+            all(record["article"] for record in records["records"])
+        )
+
+    def test_failed_pagination_is_recorded(self) -> None:
+        self.archive_error = retrieve.HTTPStatusError(
+            tagesschau.ARCHIVE_URL, 503
+        )
+        config = tagesschau.ScraperConfig(
+            [tagesschau.ArchiveFilter({"date": date(2022, 3, 1)})],
+            session=self.session,
+            failure_ledger=self.ledger,
+        )
+        self.assertListEqual(config.request_params, [])
+        failures = self.ledger.get_failures(kind="pagination")
+        self.assertEqual(len(failures), 1)
+        self.assertEqual(failures[0]["status"], 503)
+
+        self.archive_error = None
+        self.article_status = 200
+        self.session.get.side_effect = lambda url, **kwargs: self.get(
+            url.split("?")[0], **kwargs
+        )
+        records = retry_failures(self.scraper)["records"]
+        self.assertGreater(len(records), 0)
+        self.assertEqual(len(self.ledger), 0)
+
+    def test_failed_pagination_without_ledger_raises(self) -> None:
+        self.archive_error = requests.ConnectionError()
+        with self.assertRaises(requests.ConnectionError):
+            tagesschau.ScraperConfig(
+                [tagesschau.ArchiveFilter({"date": date(2022, 3, 1)})],
+                session=self.session,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+from typing import Any, Dict
+from tagesschauscraper import nearduplicates
+from tagesschauscraper.db import TagesschauDB
+from tagesschauscraper.nearduplicates import MinHasher, NearDuplicateDetector
+
+HEADLINE = "Nord Stream 2 AG meldet Insolvenz an"
+SHORTTEXT = (
+    "Die Betreibergesellschaft der Ostseepipeline Nord Stream 2 hat beim"
+    " Kantonsgericht Zug Insolvenz angemeldet."
+)
+
+RECORDS: list[Dict[str, Any]] = [
+    {"id": "a", "teaser": {"headline": HEADLINE, "shorttext": SHORTTEXT}},
+    {
+        "id": "b",
+        "teaser": {
+            "headline": HEADLINE + ".",
+            "shorttext": SHORTTEXT.replace("hat", "habe"),
+        },
+    },
+    {
+        "id": "c",
+        "teaser": {
+            "headline": "DAX schließt im Plus",
+            "shorttext": "Der deutsche Leitindex legte am Freitag zu.",
+        },
+    },
+    {
+        "id": "d",
+        "teaser": {"headline": HEADLINE.upper(), "shorttext": SHORTTEXT},
+    },
+]
+
+
+class TestMinHash(unittest.TestCase):
+    def test_shingles(self) -> None:
+        self.assertSetEqual(
+            nearduplicates.get_shingles("Ab  CDE", 3),
+            {"ab ", "b c", " cd", "cde"},
+        )
+        self.assertSetEqual(nearduplicates.get_shingles("ab", 3), {"ab"})
+        self.assertSetEqual(nearduplicates.get_shingles(" ", 3), set())
+
+    def test_similarity(self) -> None:
+        minHasher = MinHasher(num_perm=128)
+        signature = minHasher.get_signature(HEADLINE + SHORTTEXT)
+        self.assertEqual(len(signature), 128)
+        self.assertEqual(
+            nearduplicates.get_similarity(
+                signature, minHasher.get_signature(HEADLINE + SHORTTEXT)
+            ),
+            1.0,
+        )
+        self.assertGreater(
+            nearduplicates.get_similarity(
+                signature,
+                minHasher.get_signature(HEADLINE + "!" + SHORTTEXT),
+            ),
+            0.7,
+        )
+        self.assertLess(
+            nearduplicates.get_similarity(
+                signature, minHasher.get_signature("DAX schließt im Plus")
+            ),
+            0.2,
+        )
+
+    def test_lsh_parameters(self) -> None:
+        bands, rows = nearduplicates.get_lsh_parameters(64, 0.7)
+        self.assertTupleEqual((bands, rows), (16, 4))
+        self.assertLess((1 / bands) ** (1 / rows), 0.7)
+        self.assertGreater(
+            nearduplicates.get_candidate_probability(0.7, bands, rows), 0.95
+        )
+        self.assertTupleEqual(
+            nearduplicates.get_lsh_parameters(8, 0.1), (8, 1)
+        )
+
+
+class TestNearDuplicateDetector(unittest.TestCase):
+    def test_clusters(self) -> None:
+        detector = NearDuplicateDetector()
+        records = [dict(record) for record in RECORDS]
+        detector.add_records(records)
+        self.assertListEqual(
+            [record["cluster_id"] for record in records], ["a", "a", "c", "a"]
+        )
+        self.assertListEqual(
+            detector.get_duplicate_groups(), [["a", "b", "d"]]
+        )
+
+    def test_empty_texts_are_not_clustered(self) -> None:
+        detector = NearDuplicateDetector()
+        self.assertEqual(detector.add("x", " "), "x")
+        self.assertEqual(detector.add("y", ""), "y")
+        self.assertListEqual(detector.get_duplicate_groups(), [])
+
+    def test_merge_keeps_oldest_cluster_id(self) -> None:
+        detector = NearDuplicateDetector()
+        detector.add("x", "abcdefghij klmnopqrst")
+        detector.add("y", "uvwxyz0123 456789ABCD")
+        self.assertEqual(detector._union("y", "x"), "x")
+        self.assertEqual(detector.get_cluster_id("y"), "x")
+
+    def test_cluster_db(self) -> None:
+        with TagesschauDB(":memory:") as tagesschauDB:
+            tagesschauDB.create_table()
+            for i, record in enumerate(RECORDS):
+                teaser = {"date": f"2022-03-0{i + 1}", "link": record["id"]}
+                tagesschauDB.insert_record(
+                    {"id": record["id"], "teaser": record["teaser"] | teaser}
+                )
+            clusters = NearDuplicateDetector().cluster_db(tagesschauDB)
+            rows = tagesschauDB.query(
+                "SELECT id, cluster_id FROM Tagesschau ORDER BY id"
+            )
+        self.assertEqual(clusters["d"], "a")
+        self.assertDictEqual(
+            {row["id"]: row["cluster_id"] for row in rows},
+            {"a": "a", "b": "a", "c": "c", "d": "a"},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
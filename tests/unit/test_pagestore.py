@@ -0,0 +1,131 @@
+import os
+import shutil
+import unittest
+from typing import Any
+from unittest.mock import patch
+from tagesschauscraper import helper
+from tagesschauscraper.pagestore import PageStore
+
+
+class TestPageStore(unittest.TestCase):
+    def setUp(self) -> None:
+        self.root_dir = "tests/tmp"
+        os.makedirs(self.root_dir, exist_ok=True)
+        self.path = os.path.join(self.root_dir, "pages")
+        self.pageStore = PageStore(self.path)
+        with open("tests/data/article.html", "rb") as f:
+            self.article = f.read()
+        self.link = "https://www.tagesschau.de/wirtschaft/article-1.html"
+
+    def tearDown(self) -> None:
+        self.pageStore.close()
+        shutil.rmtree(self.root_dir)
+
+    def test_put_and_get(self) -> None:
+        id_ = self.pageStore.put_page(self.link, self.article)
+        self.assertEqual(id_, helper.get_hash_from_string(self.link))
+        page = self.pageStore.get(id_)
+        assert page is not None
+        self.assertEqual(page.tobytes(), self.article)
+        page.release()
+        self.assertIsNone(self.pageStore.get_page("https://missing"))
+
+    def test_get_after_append(self) -> None:
+        self.pageStore.put_page("link-a", b"<html>a</html>")
+        page_a = self.pageStore.get_page("link-a")
+        self.pageStore.put_page("link-b", b"<html>b</html>")
+        page_b = self.pageStore.get_page("link-b")
+        assert page_a is not None and page_b is not None
+        self.assertEqual(page_a.tobytes(), b"<html>a</html>")
+        self.assertEqual(page_b.tobytes(), b"<html>b</html>")
+        page_a.release()
+        page_b.release()
+
+    def test_reopen(self) -> None:
+        self.pageStore.put_page("link-a", b"a")
+        self.pageStore.put_page("link-a", b"a2")
+        self.pageStore.put_page("link-b", b"b")
+        self.pageStore.delete(PageStore.get_id("link-b"))
+        self.pageStore.close()
+        self.pageStore = PageStore(self.path)
+        self.assertEqual(len(self.pageStore), 1)
+        page = self.pageStore.get_page("link-a")
+        assert page is not None
+        self.assertEqual(page.tobytes(), b"a2")
+        page.release()
+
+    def test_compact(self) -> None:
+        self.pageStore.put_page("link-a", self.article)
+        self.pageStore.put_page("link-a", b"a2")
+        self.pageStore.put_page("link-b", b"b")
+        self.pageStore.put_page("link-c", b"c")
+        self.pageStore.delete(PageStore.get_id("link-c"))
+        self.assertEqual(
+            self.pageStore.get_garbage_size(), len(self.article) + 1
+        )
+        self.pageStore.compact()
+        self.assertEqual(self.pageStore.get_garbage_size(), 0)
+        self.assertEqual(os.path.getsize(self.path + ".pack"), 3)
+        page = self.pageStore.get_page("link-a")
+        assert page is not None
+        self.assertEqual(page.tobytes(), b"a2")
+        page.release()
+        self.pageStore.close()
+        self.pageStore = PageStore(self.path)
+        self.assertEqual(len(self.pageStore), 2)
+
+    def test_torn_index_entry_is_truncated(self) -> None:
+        self.pageStore.put_page("link-a", b"a")
+        self.pageStore.close()
+        with open(self.path + ".idx", "ab") as f:
+            f.write(b"torn")
+        self.pageStore = PageStore(self.path)
+        self.pageStore.put_page("link-b", b"b")
+        self.pageStore.close()
+        self.pageStore = PageStore(self.path)
+        for link, content in [("link-a", b"a"), ("link-b", b"b")]:
+            page = self.pageStore.get_page(link)
+            assert page is not None
+            self.assertEqual(page.tobytes(), content)
+            page.release()
+
+    def test_interrupted_compaction_is_finished(self) -> None:
+        self.pageStore.put_page("link-a", b"a")
+        self.pageStore.put_page("link-a", b"a2")
+        self.pageStore.put_page("link-b", b"b")
+        replace = os.replace
+
+        def crash_after_index(src: Any, dst: Any) -> None:
+            if src.endswith(".pack.tmp"):
+                raise OSError("crash")
+            replace(src, dst)
+
+        with patch("os.replace", side_effect=crash_after_index):
+            with self.assertRaises(OSError):
+                self.pageStore.compact()
+        self.pageStore = PageStore(self.path)
+        self.assertEqual(self.pageStore.get_garbage_size(), 0)
+        self.assertFalse(os.path.exists(self.path + ".pack.tmp"))
+        for link, content in [("link-a", b"a2"), ("link-b", b"b")]:
+            page = self.pageStore.get_page(link)
+            assert page is not None
+            self.assertEqual(page.tobytes(), content)
+            page.release()
+
+    def test_uncommitted_compaction_is_dropped(self) -> None:
+        self.pageStore.put_page("link-a", b"a")
+        self.pageStore.close()
+        for extension in [".idx.tmp", ".pack.tmp"]:
+            with open(self.path + extension, "wb") as f:
+                f.write(b"partial")
+        self.pageStore = PageStore(self.path)
+        self.assertFalse(os.path.exists(self.path + ".idx.tmp"))
+        self.assertFalse(os.path.exists(self.path + ".pack.tmp"))
+        page = self.pageStore.get_page("link-a")
+        assert page is not None
+        self.assertEqual(page.tobytes(), b"a")
+        page.release()
+
+
+if __name__ == "__main__":
+    unittest.main()
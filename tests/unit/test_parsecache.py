@@ -0,0 +1,167 @@
+import os
+import shutil
+import unittest
+from datetime import date
+from typing import Union
+from unittest.mock import Mock, patch
+from requests import Response
+from tagesschauscraper import retrieve, tagesschau
+from tagesschauscraper.extraction import ExtractionSpec, Field
+from tagesschauscraper.parsecache import ParseCache, get_page_hash
+
+
+def create_response(file_name: str) -> Response:
+    responseMock = Mock(spec=Response)
+    responseMock.status_code = 200
+    with open(file_name, "r") as f:
+        responseMock.text = f.read()
+    return responseMock
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.root_dir = "tests/tmp"
+        os.makedirs(self.root_dir, exist_ok=True)
+        self.cache = ParseCache()
+        self.extract = Mock(return_value={"tags": ["Pipeline"]})
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.root_dir)
+
+    def test_unchanged_page_is_extracted_once(self) -> None:
+        contents: list[Union[str, bytes]] = ["<html>", "<html>", b"<html>"]
+        for content in contents:
+            self.assertEqual(
+                self.cache.get_or_extract(
+                    "article", "1", content, self.extract
+                ),
+                {"tags": ["Pipeline"]},
+            )
+        self.assertEqual(self.extract.call_count, 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 1))
+        self.cache.get_or_extract("article", "1", "<html> ", self.extract)
+        self.assertEqual(self.extract.call_count, 2)
+
+    def test_version_change_drops_results(self) -> None:
+        self.cache.get_or_extract("article", "1", "a", self.extract)
+        self.cache.get_or_extract("teaser", "1", "a", self.extract)
+        self.cache.get_or_extract("article", "2", "a", self.extract)
+        self.assertEqual(self.extract.call_count, 3)
+        self.assertIsNone(self.cache.get("article", "1", get_page_hash("a")))
+        self.assertIsNotNone(self.cache.get("teaser", "1", get_page_hash("a")))
+
+    def test_results_are_copies(self) -> None:
+        result = self.cache.get_or_extract("article", "1", "a", self.extract)
+        result["tags"].append("Insolvenz")
+        self.assertEqual(
+            self.cache.get("article", "1", get_page_hash("a")),
+            {"tags": ["Pipeline"]},
+        )
+
+    def test_save_and_load(self) -> None:
+        file_path = os.path.join(self.root_dir, "parsed.json")
+        cache = ParseCache(file_path)
+        cache.get_or_extract("article", "1", "a", self.extract)
+        cache.save()
+        self.assertEqual(len(ParseCache(file_path)), 1)
+        self.assertEqual(
+            ParseCache(file_path).get("article", "1", get_page_hash("a")),
+            {"tags": ["Pipeline"]},
+        )
+
+    def test_spec_version_changes_with_fields(self) -> None:
+        fields = [Field("tags", class_="tag-btn", multiple=True)]
+        version = ExtractionSpec(fields).version
+        self.assertEqual(ExtractionSpec(list(fields)).version, version)
+        self.assertNotEqual(
+            ExtractionSpec(fields, revision=2).version, version
+        )
+        self.assertNotEqual(
+            ExtractionSpec([Field("tags", class_="tag")]).version, version
+        )
+
+
+class TestScraperWithParseCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.archive_response = create_response("tests/data/archive.html")
+        self.article_response = create_response("tests/data/article.html")
+        self.session = Mock()
+        self.session.get.side_effect = lambda url, **kwargs: (
+            self.archive_response
+            if url == tagesschau.ARCHIVE_URL
+            else self.article_response
+        )
+        self.cache = ParseCache()
+
+    def test_unchanged_pages_are_not_parsed_again(self) -> None:
+        uncached = tagesschau.TagesschauScraper(session=self.session)
+        expected = uncached.scrape_teaser_and_articles(self.archive_response)
+        scraper = tagesschau.TagesschauScraper(
+            session=self.session, parse_cache=self.cache
+        )
+        self.assertEqual(
+            scraper.scrape_teaser_and_articles(self.archive_response),
+            expected,
+        )
+        with patch.object(
+            retrieve, "get_soup", wraps=retrieve.get_soup
+        ) as get_soup:
+            self.assertEqual(
+                scraper.scrape_teaser_and_articles(self.archive_response),
+                expected,
+            )
+            self.assertEqual(get_soup.call_count, 0)
+        # Every article has the same page, so only two pages are parsed
+        self.assertEqual((self.cache.hits, self.cache.misses), (19 + 21, 2))
+
+    def test_pagination_from_cache(self) -> None:
+        archive_filter = tagesschau.ArchiveFilter({"date": date(2022, 3, 1)})
+        config = tagesschau.ScraperConfig(
+            archive_filter, session=self.session, parse_cache=self.cache
+        )
+        with patch.object(
+            retrieve, "get_soup", wraps=retrieve.get_soup
+        ) as get_soup:
+            self.assertListEqual(
+                tagesschau.ScraperConfig(
+                    archive_filter,
+                    session=self.session,
+                    parse_cache=self.cache,
+                ).request_params,
+                config.request_params,
+            )
+            self.assertEqual(get_soup.call_count, 0)
+
+    def test_archive_page_is_parsed_once(self) -> None:
+        scraper = tagesschau.TagesschauScraper(
+            session=self.session, parse_cache=self.cache
+        )
+        params = {"datum": "2022-03-01", "ressort": "", "pageIndex": "1"}
+        with patch.object(
+            retrieve, "get_soup", wraps=retrieve.get_soup
+        ) as get_soup:
+            scraped = scraper.scrape_archive_teaser(params)
+            self.assertEqual(get_soup.call_count, 1)
+            cached = scraper.scrape_archive_teaser(params)
+            self.assertEqual(get_soup.call_count, 1)
+        assert scraped is not None and cached is not None
+        self.assertEqual(len(scraped[0]), 20)
+        self.assertListEqual(cached[0], scraped[0])
+        self.assertListEqual(
+            cached[1].extract_pagination(), scraped[1].extract_pagination()
+        )
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 2))
+
+    def test_failed_page_is_not_cached(self) -> None:
+        self.archive_response.status_code = 404
+        self.archive_response.url = tagesschau.ARCHIVE_URL
+        scraper = tagesschau.TagesschauScraper(
+            session=self.session, parse_cache=self.cache
+        )
+        with self.assertRaises(retrieve.HTTPStatusError):
+            scraper.scrape_teaser(self.archive_response)
+        self.assertEqual(len(self.cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
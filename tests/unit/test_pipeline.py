@@ -0,0 +1,165 @@
+import threading
+import time
+import unittest
+from typing import Any, Iterable
+from unittest.mock import Mock, patch
+from requests import Response
+from tagesschauscraper import tagesschau
+from tagesschauscraper.dedup import ContentStore
+from tagesschauscraper.failures import FailureLedger
+from tagesschauscraper.pipeline import Pipeline, ScraperPipeline, Stage
+
+
+def create_response(file_name: str) -> Response:
+    responseMock = Mock(spec=Response)
+    responseMock.status_code = 200
+    with open(file_name, "r") as f:
+        responseMock.text = f.read()
+    return responseMock
+
+
+class TestPipeline(unittest.TestCase):
+    def test_run(self) -> None:
+        def double(x: int) -> Iterable[int]:
+            yield x
+            yield x
+
+        def square(x: int) -> Iterable[int]:
+            yield x * x
+
+        pipeline = Pipeline(
+            [Stage("double", double, 3), Stage("square", square, 2)]
+        )
+        self.assertListEqual(
+            sorted(pipeline.run(range(5))), [0, 0, 1, 1, 4, 4, 9, 9, 16, 16]
+        )
+
+    def test_backpressure(self) -> None:
+        queue_size = 2
+        produced: list[int] = []
+        consumed: list[int] = []
+        lock = threading.Lock()
+
+        def produce(x: int) -> Iterable[int]:
+            with lock:
+                produced.append(x)
+                self.assertLessEqual(
+                    len(produced) - len(consumed), 2 * queue_size + 3
+                )
+            yield x
+
+        def consume(x: int) -> Iterable[int]:
+            time.sleep(0.001)
+            with lock:
+                consumed.append(x)
+            yield x
+
+        pipeline = Pipeline(
+            [Stage("produce", produce), Stage("consume", consume)],
+            queue_size=queue_size,
+        )
+        self.assertEqual(len(pipeline.run(range(50))), 50)
+
+    def test_error_is_raised(self) -> None:
+        def fail(x: int) -> Iterable[int]:
+            if x == 3:
+                raise KeyError(x)
+            yield x
+
+        pipeline = Pipeline([Stage("fail", fail, 2)], queue_size=1)
+        with self.assertRaises(KeyError):
+            pipeline.run(range(100))
+
+    def test_stage_without_worker(self) -> None:
+        with self.assertRaises(ValueError):
+            Stage("empty", lambda x: [x], workers=0)
+
+
+class TestScraperPipeline(unittest.TestCase):
+    def setUp(self) -> None:
+        self.archive_response = create_response("tests/data/archive.html")
+        self.article_response = create_response("tests/data/article.html")
+        session = Mock()
+        session.get.side_effect = self.get
+        self.scraper = tagesschau.TagesschauScraper(session=session)
+        self.config = Mock(spec=tagesschau.ScraperConfig)
+        self.config.request_params = [
+            {"datum": "2022-03-01", "ressort": "", "pageIndex": "1"}
+        ]
+
+    def get(self, url: str, **kwargs: Any) -> Response:
+        if url == tagesschau.ARCHIVE_URL:
+            return self.archive_response
+        return self.article_response
+
+    def test_run_equals_sequential_scraper(self) -> None:
+        expected_records = self.scraper.get_news_from_archive(self.config)
+        records = ScraperPipeline(self.scraper).run(self.config)
+        self.assertListEqual(
+            sorted(records["records"], key=lambda r: str(r["id"])),
+            sorted(expected_records["records"], key=lambda r: str(r["id"])),
+        )
+
+    def test_run_with_writer(self) -> None:
+        written: list[tagesschau.NewsRecord] = []
+        scraperPipeline = ScraperPipeline(self.scraper, writer=written.append)
+        self.assertDictEqual(scraperPipeline.run(self.config), {"records": []})
+        self.assertEqual(len(written), 20)
+
+    def test_fetch_and_parse_run_in_their_stages(self) -> None:
+        stages: list[tuple[str, str]] = []
+
+        def get_stage() -> str:
+            return threading.current_thread().name.rsplit("-", 1)[0]
+
+        def get(url: str, **kwargs: Any) -> Response:
+            stages.append(("fetch", get_stage()))
+            if url == "stored-link":
+                return not_modified
+            return self.get(url)
+
+        def extract_article(
+            link: str, response: Response
+        ) -> tagesschau.ArticleRecord:
+            stages.append(("parse", get_stage()))
+            if link == failed_link:
+                raise ValueError("broken")
+            return {"tags": link}
+
+        self.scraper.session.get.side_effect = get  # type: ignore
+        self.scraper.failure_ledger = FailureLedger()
+        self.scraper.content_store = ContentStore()
+        self.scraper.content_store.put(
+            "stored-link", "text", {"tags": "A"}, headers={"ETag": '"v1"'}
+        )
+        not_modified = Mock(spec=Response)
+        not_modified.status_code = 304
+        teasers = self.scraper.scrape_teaser(self.archive_response)["records"]
+        teasers[0]["link"] = "stored-link"
+        failed_link = teasers[1]["link"]
+        with patch.object(
+            self.scraper, "extract_article", side_effect=extract_article
+        ), patch.object(
+            self.scraper,
+            "scrape_teaser",
+            return_value={"records": teasers},
+        ):
+            records = ScraperPipeline(self.scraper).run(self.config)
+        fetch_stages = {stage for step, stage in stages if step == "fetch"}
+        parse_stages = {stage for step, stage in stages if step == "parse"}
+        self.assertSetEqual(fetch_stages, {"fetch-archive", "fetch-article"})
+        self.assertSetEqual(parse_stages, {"parse-article"})
+        # The stored article is revalidated, but not parsed again
+        self.assertEqual(len(stages), 1 + len(teasers) + len(teasers) - 1)
+        links = [
+            record["teaser"]["link"]  # type: ignore
+            for record in records["records"]
+        ]
+        self.assertEqual(len(links), len(teasers) - 1)
+        self.assertIn("stored-link", links)
+        self.assertNotIn(failed_link, links)
+        self.assertTrue(self.scraper.is_failed(failed_link))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import threading
+import unittest
+from datetime import date
+from typing import Any
+from unittest.mock import Mock
+from requests import Response
+from tagesschauscraper import planner, tagesschau
+
+
+def create_response(file_name: str) -> Response:
+    responseMock = Mock(spec=Response)
+    responseMock.status_code = 200
+    with open(file_name, "r") as f:
+        responseMock.text = f.read()
+    return responseMock
+
+
+class TestCategoryFanOutPlanner(unittest.TestCase):
+    def setUp(self) -> None:
+        self.archive_response = create_response("tests/data/archive.html")
+        self.article_response = create_response("tests/data/article.html")
+        self.session = Mock()
+        self.session.get.side_effect = self.get
+        scraper = tagesschau.TagesschauScraper(session=self.session)
+        self.dates = [date(2022, 3, 1)]
+        self.planner = planner.CategoryFanOutPlanner(
+            self.dates,
+            scraper=scraper,
+            max_workers=4,
+            session_factory=lambda: self.session,
+        )
+
+    def get(self, url: str, **kwargs: Any) -> Response:
+        if url == tagesschau.ARCHIVE_URL:
+            return self.archive_response
+        return self.article_response
+
+    def test_plan(self) -> None:
+        expected_plan = [
+            planner.WorkUnit(date(2022, 3, 1), category, 1)
+            for category in tagesschau.NEWS_CATEGORIES
+        ]
+        self.assertListEqual(self.planner.plan(), expected_plan)
+
+    def test_work_unit_to_archive_filter(self) -> None:
+        unit = planner.WorkUnit(date(2022, 3, 1), "inland", 2)
+        self.assertDictEqual(
+            unit.to_archive_filter().processed_params,
+            {"datum": "2022-03-01", "ressort": "inland", "pageIndex": "2"},
+        )
+
+    def test_run_fetches_each_article_once(self) -> None:
+        records = self.planner.run()["records"]
+        links = [call.args[0] for call in self.session.get.call_args_list]
+        article_links = [
+            link for link in links if link != tagesschau.ARCHIVE_URL
+        ]
+        self.assertEqual(links.count(tagesschau.ARCHIVE_URL), 3)
+        self.assertEqual(len(article_links), len(set(article_links)))
+        self.assertEqual(len(records), len(article_links))
+        for record in records:
+            self.assertListEqual(
+                record["categories"],  # type: ignore
+                sorted(tagesschau.NEWS_CATEGORIES),
+            )
+
+    def test_one_session_per_worker_thread(self) -> None:
+        threads: dict[int, set[int]] = {}
+
+        def create_session() -> Mock:
+            session = Mock()
+
+            def get(url: str, **kwargs: Any) -> Response:
+                thread_ids = threads.setdefault(id(session), set())
+                thread_ids.add(threading.get_ident())
+                return self.get(url, **kwargs)
+
+            session.get.side_effect = get
+            return session
+
+        self.planner.session_factory = create_session
+        records = self.planner.run()["records"]
+        self.assertGreater(len(records), 0)
+        self.assertLessEqual(len(threads), self.planner.max_workers)
+        for thread_ids in threads.values():
+            self.assertEqual(len(thread_ids), 1)
+        self.session.get.assert_not_called()
+        self.assertListEqual(self.planner._sessions, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import os
+import pstats
+import shutil
+import threading
+import time
+import unittest
+from tagesschauscraper import profiling
+
+
+def busy_wait(seconds: float) -> None:
+    end = time.time() + seconds
+    while time.time() < end:
+        pass
+
+
+class TestSamplingProfiler(unittest.TestCase):
+    def test_samples_other_threads(self) -> None:
+        sampler = profiling.SamplingProfiler(interval=0.001)
+        sampler.start()
+        worker = threading.Thread(target=busy_wait, args=(0.2,), name="worker")
+        worker.start()
+        worker.join()
+        sampler.stop()
+        self.assertGreater(sampler.samples, 0)
+        worker_stacks = [
+            stack
+            for stack in sampler.stacks
+            if stack.startswith("worker;") and "busy_wait" in stack
+        ]
+        self.assertGreater(len(worker_stacks), 0)
+        self.assertNotIn("sampling-profiler", sampler.get_folded_stacks())
+        self.assertIn("busy_wait", sampler.get_summary())
+
+
+class TestAllocationTracker(unittest.TestCase):
+    def test_tracks_stages(self) -> None:
+        tracker = profiling.AllocationTracker()
+        tracker.start()
+        kept = []
+        for _ in range(3):
+            with profiling.stage("allocate"):
+                kept.append(bytearray(1 << 20))
+            with profiling.stage("temporary"):
+                bytearray(1 << 20)
+        tracker.stop()
+        self.assertEqual(tracker.stages["allocate"].calls, 3)
+        self.assertGreater(tracker.stages["allocate"].net, 3 << 20)
+        self.assertLess(tracker.stages["temporary"].net, 1 << 16)
+        self.assertGreater(tracker.stages["temporary"].peak, 1 << 20)
+        report = tracker.get_report()
+        self.assertIn("allocate", report)
+        self.assertIn("allocation sites", report)
+
+    def test_stage_without_tracker(self) -> None:
+        with profiling.stage("allocate"):
+            pass
+        self.assertIsNone(profiling._tracker)
+
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self) -> None:
+        self.root_dir = "tests/tmp"
+        os.makedirs(self.root_dir, exist_ok=True)
+        self.path_prefix = os.path.join(self.root_dir, "run")
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.root_dir)
+
+    def test_writes_all_profiles(self) -> None:
+        with profiling.Profiler(self.path_prefix, interval=0.001) as profiler:
+            busy_wait(0.05)
+        self.assertDictEqual(
+            profiler.files,
+            {
+                "cprofile": self.path_prefix + ".prof",
+                "folded": self.path_prefix + ".folded",
+                "summary": self.path_prefix + ".profile.txt",
+            },
+        )
+        stats = pstats.Stats(profiler.files["cprofile"])
+        self.assertTrue(
+            any(func[2] == "busy_wait" for func in stats.stats)  # type: ignore
+        )
+        with open(profiler.files["summary"]) as f:
+            summary = f.read()
+        self.assertIn("cumulative time", summary)
+        self.assertIn("Sampling profiler", summary)
+
+    def test_cprofile_only(self) -> None:
+        with profiling.Profiler(self.path_prefix, mode="cprofile") as profiler:
+            busy_wait(0.01)
+        self.assertListEqual(sorted(profiler.files), ["cprofile", "summary"])
+        self.assertFalse(os.path.exists(self.path_prefix + ".folded"))
+
+    def test_memory_only(self) -> None:
+        with profiling.Profiler(self.path_prefix, mode="memory") as profiler:
+            with profiling.stage("allocate"):
+                bytearray(1 << 20)
+        self.assertListEqual(sorted(profiler.files), ["memory", "summary"])
+        with open(profiler.files["memory"]) as f:
+            self.assertIn("allocate", f.read())
+        self.assertIsNone(profiling._tracker)
+
+    def test_invalid_mode(self) -> None:
+        with self.assertRaises(ValueError):
+            profiling.Profiler(self.path_prefix, mode="perf")
+
+
+if __name__ == "__main__":
+    unittest.main()
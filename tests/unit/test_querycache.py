@@ -0,0 +1,137 @@
+import unittest
+from typing import Any
+from tagesschauscraper import db
+from tagesschauscraper.querycache import QueryCache
+
+
+def create_row(id_: str, date: str, category: str = "inland") -> db.Row:
+    return {
+        "id": id_,
+        "date": date,
+        "topline": "topline",
+        "headline": "headline",
+        "shorttext": "shorttext",
+        "link": f"https://www.tagesschau.de/{category}/{id_}.html",
+        "tags": "",
+    }
+
+
+class TestQueryCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.now = 0.0
+        self.cache = QueryCache(max_size=2, ttl=10, clock=lambda: self.now)
+        self.calls = 0
+
+    def compute(self) -> int:
+        self.calls += 1
+        return self.calls
+
+    def test_hit_and_miss(self) -> None:
+        self.assertEqual(self.cache.get("a", self.compute), 1)
+        self.assertEqual(self.cache.get("a", self.compute), 1)
+        stats = self.cache.get_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+    def test_lru_eviction(self) -> None:
+        self.cache.get("a", self.compute)
+        self.cache.get("b", self.compute)
+        self.cache.get("a", self.compute)
+        self.cache.get("c", self.compute)
+        self.assertEqual(self.cache.get("a", self.compute), 1)
+        self.assertEqual(self.cache.get("b", self.compute), 4)
+        self.assertEqual(self.cache.get_stats()["evictions"], 2)
+
+    def test_ttl(self) -> None:
+        self.cache.get("a", self.compute)
+        self.now = 10.0
+        self.assertEqual(self.cache.get("a", self.compute), 2)
+        self.assertEqual(self.cache.get_stats()["expirations"], 1)
+
+    def test_invalidate_by_range_and_category(self) -> None:
+        self.cache.max_size = 10
+        self.cache.get("march", self.compute, "2022-03-01", "2022-04-01")
+        self.cache.get("inland", self.compute, category="inland")
+        self.cache.get("ausland", self.compute, category="ausland")
+        self.assertEqual(self.cache.invalidate([("2022-04-01", "inland")]), 1)
+        self.assertListEqual(list(self.cache._entries), ["march", "ausland"])
+        self.assertEqual(self.cache.invalidate([("2022-03-31", "wetter")]), 1)
+        self.assertListEqual(list(self.cache._entries), ["ausland"])
+
+    def test_result_computed_during_invalidation_is_not_stored(self) -> None:
+        def compute() -> int:
+            self.cache.invalidate([("2022-03-01", "inland")])
+            return 1
+
+        self.cache.get("a", compute)
+        self.assertEqual(len(self.cache), 0)
+
+
+class TestCachedQueries(unittest.TestCase):
+    def setUp(self) -> None:
+        self.cache = QueryCache()
+        self.tagesschauDB = db.TagesschauDB(":memory:", query_cache=self.cache)
+        self.tagesschauDB.create_table()
+        self.tagesschauDB.insert_many(
+            [
+                create_row("a", "2022-03-01 10:00:00"),
+                create_row("b", "2022-03-02 10:00:00", "ausland"),
+                create_row("c", "2022-03-03 10:00:00"),
+            ]
+        )
+
+    def tearDown(self) -> None:
+        self.tagesschauDB.close()
+
+    def get_latest_ids(self, **kwargs: Any) -> list[str]:
+        return [row["id"] for row in self.tagesschauDB.get_latest(**kwargs)]
+
+    def test_get_latest(self) -> None:
+        self.assertListEqual(self.get_latest_ids(), ["c", "b", "a"])
+        self.assertListEqual(
+            self.get_latest_ids(category="inland"), ["c", "a"]
+        )
+        self.assertListEqual(
+            self.get_latest_ids(start="2022-03-02", end="2022-03-03"), ["b"]
+        )
+        self.assertListEqual(self.get_latest_ids(), ["c", "b", "a"])
+        self.assertEqual(self.cache.get_stats()["hits"], 1)
+
+    def test_insert_invalidates_affected_results(self) -> None:
+        self.get_latest_ids(category="inland")
+        self.get_latest_ids(category="ausland")
+        self.get_latest_ids(end="2022-03-02")
+        self.tagesschauDB.insert(create_row("d", "2022-03-04 10:00:00"))
+        self.assertEqual(self.cache.get_stats()["invalidations"], 1)
+        self.assertListEqual(
+            self.get_latest_ids(category="inland"), ["d", "c", "a"]
+        )
+        self.assertEqual(self.cache.get_stats()["hits"], 0)
+        self.assertListEqual(self.get_latest_ids(category="ausland"), ["b"])
+        self.assertListEqual(self.get_latest_ids(end="2022-03-02"), ["a"])
+        self.assertEqual(self.cache.get_stats()["hits"], 2)
+
+    def test_ignored_insert_keeps_cache(self) -> None:
+        self.get_latest_ids()
+        self.tagesschauDB.insert(create_row("a", "2022-03-01 10:00:00"))
+        self.assertEqual(len(self.cache), 1)
+
+    def test_cached_rollups(self) -> None:
+        counts = self.tagesschauDB.get_category_counts()
+        counts[0]["count"] = 100
+        self.assertListEqual(
+            self.tagesschauDB.get_category_counts(),
+            [
+                {"category": "ausland", "count": 1},
+                {"category": "inland", "count": 2},
+            ],
+        )
+        self.tagesschauDB.insert(create_row("d", "2022-03-04 10:00:00"))
+        self.assertEqual(
+            self.tagesschauDB.get_category_counts()[1]["count"], 3
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
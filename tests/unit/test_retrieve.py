@@ -1,6 +1,19 @@
+from pathlib import Path
+from typing import Any
 from unittest.mock import Mock
-from tagesschauscraper.retrieve import WebsiteTest
-from requests import Response
+from tagesschauscraper.retrieve import (
+    PackedResponseArchive,
+    RecordingSession,
+    ReplaySession,
+    ResponseNotRecordedError,
+    WebsiteTest,
+    open_response_archive,
+)
+from tagesschauscraper.helper import get_hash_from_string
+from tagesschauscraper.tagesschau import ARCHIVE_URL, TagesschauScraper
+from requests import PreparedRequest, Response
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
 import pytest
 
 
@@ -25,3 +38,120 @@ def test_is_text_in_element(response_mock: Response) -> None:
     text = "Nordstream-Betreiber offenbar insolvent"
     attrs = {"class": "teaser-xs__headline-wrapper"}
     assert websiteTest.is_text_in_element(target_text=text, attrs=attrs)
+
+
+class FileAdapter(BaseAdapter):
+    """
+    Transport adapter answering every request with a file from tests/data.
+    """
+
+    def __init__(self, file_name: str, status_code: int = 200) -> None:
+        super().__init__()
+        self.file_name = file_name
+        self.status_code = status_code
+        self.requested_urls: list[str] = []
+
+    def send(  # type: ignore[override]
+        self, request: PreparedRequest, **kwargs: Any
+    ) -> Response:
+        self.requested_urls.append(str(request.url))
+        response = Response()
+        response.status_code = self.status_code
+        response.headers = CaseInsensitiveDict(
+            {"Content-Type": "text/html; charset=utf-8"}
+        )
+        response.encoding = "utf-8"
+        with open(self.file_name, "rb") as f:
+            response._content = f.read()
+        response.url = str(request.url)
+        response.request = request
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+@pytest.fixture(params=["responses.db", "responses.pack"])
+def archive_path(tmp_path: Path, request: pytest.FixtureRequest) -> str:
+    return str(tmp_path / request.param)
+
+
+def test_record_and_replay(archive_path: str) -> None:
+    adapter = FileAdapter("tests/data/archive.html")
+    recordingSession = RecordingSession(open_response_archive(archive_path))
+    recordingSession.mount("https://", adapter)
+    params = {"datum": "2022-03-01", "ressort": "", "pageIndex": "1"}
+    recorded_response = recordingSession.get(ARCHIVE_URL, params=params)
+    assert len(adapter.requested_urls) == 1
+
+    replaySession = ReplaySession(open_response_archive(archive_path))
+    replayed_response = replaySession.get(ARCHIVE_URL, params=params)
+    assert replayed_response.status_code == 200
+    assert replayed_response.text == recorded_response.text
+    assert replayed_response.headers["content-type"].startswith("text/html")
+    assert b"".join(replayed_response.iter_content(1000)) == (
+        recorded_response.content
+    )
+
+
+def test_recorded_page_is_kept_on_error(archive_path: str) -> None:
+    responseArchive = open_response_archive(archive_path)
+    recordingSession = RecordingSession(responseArchive)
+    link = "https://www.tagesschau.de/wirtschaft/article-1.html"
+    for status_code in [404, 200, 304, 500]:
+        recordingSession.mount(
+            "https://", FileAdapter("tests/data/article.html", status_code)
+        )
+        recordingSession.get(link)
+        replayed_response = responseArchive.get(link)
+        assert replayed_response is not None
+        assert replayed_response.status_code == (
+            404 if status_code == 404 else 200
+        )
+    responseArchive.close()
+
+
+def test_packed_body_is_not_copied(tmp_path: Path) -> None:
+    responseArchive = PackedResponseArchive(str(tmp_path / "pages.pack"))
+    recordingSession = RecordingSession(responseArchive)
+    recordingSession.mount("https://", FileAdapter("tests/data/article.html"))
+    link = "https://www.tagesschau.de/wirtschaft/article-1.html"
+    recorded_response = recordingSession.get(link)
+    replayed_response = responseArchive.get(link)
+    assert replayed_response is not None
+    assert isinstance(replayed_response.content, memoryview)
+    assert replayed_response.content == recorded_response.content
+    assert replayed_response.text == recorded_response.text
+    replayed_response.encoding = None
+    assert replayed_response.apparent_encoding == "utf-8"
+    responseArchive.close()
+    assert replayed_response.content == recorded_response.content
+
+
+def test_replay_not_recorded(archive_path: str) -> None:
+    replaySession = ReplaySession(open_response_archive(archive_path))
+    with pytest.raises(ResponseNotRecordedError):
+        replaySession.get(ARCHIVE_URL, params={"datum": "2022-03-01"})
+
+
+def test_scraper_with_replay_session(archive_path: str) -> None:
+    responseArchive = open_response_archive(archive_path)
+    recordingSession = RecordingSession(responseArchive)
+    recordingSession.mount("https://", FileAdapter("tests/data/archive.html"))
+    params = {"datum": "2022-03-01", "ressort": "", "pageIndex": "1"}
+    recordingSession.get(ARCHIVE_URL, params=params)
+    scraper = TagesschauScraper(session=ReplaySession(responseArchive))
+    response = scraper.get_archive_response(params)
+    assert len(scraper.scrape_teaser(response)["records"]) == 20
+
+
+def test_packed_archive_is_keyed_by_news_id(tmp_path: Path) -> None:
+    link = "https://www.tagesschau.de/wirtschaft/article-1.html"
+    responseArchive = PackedResponseArchive(str(tmp_path / "pages.pack"))
+    recordingSession = RecordingSession(responseArchive)
+    recordingSession.mount("https://", FileAdapter("tests/data/article.html"))
+    recordingSession.get(link)
+    assert link in responseArchive
+    assert get_hash_from_string(link) in responseArchive.pageStore
+    assert (tmp_path / "pages.idx").exists()
+    responseArchive.close()
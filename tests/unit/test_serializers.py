@@ -0,0 +1,123 @@
+import io
+import json
+import os
+import shutil
+import unittest
+from tagesschauscraper import serializers
+from tagesschauscraper.serializers import (
+    JSONSerializer,
+    MsgpackSerializer,
+    OrjsonSerializer,
+    Serializer,
+)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+FIXTURES = [
+    "tests/data/teaser-2023-01-01.json",
+    "tests/data/teaser-article-2023-01-01.json",
+    "tests/data/teaser-article-2023-03-01-2023-03-02.json",
+]
+
+
+def get_available_serializers() -> list[Serializer]:
+    available: list[Serializer] = [JSONSerializer(), JSONSerializer(None)]
+    if orjson is not None:
+        available.append(OrjsonSerializer())
+    if msgpack is not None:
+        available.append(MsgpackSerializer())
+    return available
+
+
+class TestSerializers(unittest.TestCase):
+    def setUp(self) -> None:
+        self.root_dir = "tests/tmp"
+        os.makedirs(self.root_dir, exist_ok=True)
+        self.fixtures = []
+        for file_path in FIXTURES:
+            with open(file_path, "r") as f:
+                self.fixtures.append(json.load(f))
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.root_dir)
+
+    def test_json_output_is_unchanged(self) -> None:
+        for data in self.fixtures + [{"records": []}]:
+            for indent in [4, 2, None]:
+                fp = io.BytesIO()
+                JSONSerializer(indent).dump(data, fp)
+                self.assertEqual(
+                    fp.getvalue().decode(), json.dumps(data, indent=indent)
+                )
+
+    def test_round_trip(self) -> None:
+        for serializer in get_available_serializers():
+            for data in self.fixtures + [{"records": []}]:
+                fp = io.BytesIO()
+                self.assertEqual(
+                    serializer.dump_records(iter(data["records"]), fp),
+                    len(data["records"]),
+                )
+                for chunk_size in [7, 1 << 16]:
+                    fp.seek(0)
+                    self.assertListEqual(
+                        list(serializer.iter_records(fp, chunk_size)),
+                        data["records"],
+                    )
+                fp.seek(0)
+                self.assertDictEqual(serializer.load(fp), data)
+
+    def test_write_and_read_records(self) -> None:
+        for serializer in get_available_serializers():
+            file_path = os.path.join(
+                self.root_dir, "records" + serializer.extension
+            )
+            serializers.write_records(file_path, self.fixtures[1], serializer)
+            self.assertListEqual(
+                list(serializers.read_records(file_path)),
+                self.fixtures[1]["records"],
+            )
+
+    def test_truncated_file(self) -> None:
+        for serializer in get_available_serializers():
+            file_path = os.path.join(
+                self.root_dir, "records" + serializer.extension
+            )
+            serializers.write_records(file_path, self.fixtures[1], serializer)
+            with open(file_path, "rb+") as f:
+                f.truncate(os.path.getsize(file_path) - 10)
+            with self.assertRaises(ValueError):
+                list(serializers.read_records(file_path))
+
+    def test_incomplete_serializer(self) -> None:
+        class IncompleteSerializer(serializers._JSONLayout):
+            pass
+
+        with self.assertRaises(TypeError):
+            IncompleteSerializer()  # type: ignore[abstract]
+
+    def test_get_serializer(self) -> None:
+        self.assertIsInstance(serializers.get_serializer(), JSONSerializer)
+        with self.assertRaises(ValueError):
+            serializers.get_serializer("xml")
+        self.assertEqual(
+            serializers.get_serializer_for_path("data/a.json").extension,
+            ".json",
+        )
+
+    @unittest.skipUnless(msgpack is None, "msgpack is installed")
+    def test_msgpack_not_installed(self) -> None:
+        with self.assertRaises(ImportError):
+            serializers.get_serializer("msgpack")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import json
+import threading
+import unittest
+import urllib.request
+from datetime import date
+from typing import Any
+from unittest.mock import Mock
+from requests import Response
+from tagesschauscraper import tagesschau
+from tagesschauscraper.service import ControlServer, ScraperService
+
+
+def create_response(file_name: str) -> Response:
+    responseMock = Mock(spec=Response)
+    responseMock.status_code = 200
+    with open(file_name, "r") as f:
+        responseMock.text = f.read()
+    responseMock.content = responseMock.text.encode()
+    responseMock.headers = {}
+    return responseMock
+
+
+class TestScraperService(unittest.TestCase):
+    def setUp(self) -> None:
+        self.archive_response = create_response("tests/data/archive.html")
+        self.article_response = create_response("tests/data/article.html")
+        session = Mock()
+        session.get.side_effect = self.get
+        self.written: list[list[tagesschau.NewsRecord]] = []
+        self.today = date(2022, 3, 1)
+        self.archive_dates: list[str] = []
+        self.service = ScraperService(
+            self.written.append,
+            interval=0.01,
+            scraper=tagesschau.TagesschauScraper(session=session),
+            today=lambda: self.today,
+        )
+
+    def get(self, url: str, **kwargs: Any) -> Response:
+        if url == tagesschau.ARCHIVE_URL:
+            self.archive_dates.append(kwargs["params"]["datum"])
+            return self.archive_response
+        return self.article_response
+
+    def test_poll_writes_only_new_records(self) -> None:
+        self.assertEqual(len(self.service.poll()), 20)
+        self.assertEqual(len(self.service.poll()), 0)
+        self.assertEqual(len(self.written), 1)
+        status = self.service.get_status()
+        self.assertEqual(status["polls"], 2)
+        self.assertEqual(status["records"], 20)
+        self.assertEqual(status["seen_ids"], 20)
+
+    def test_records_are_kept_when_the_writer_fails(self) -> None:
+        self.service.writer = Mock(side_effect=[OSError(), None])
+        with self.assertRaises(OSError):
+            self.service.poll()
+        self.assertEqual(self.service.get_status()["seen_ids"], 0)
+        self.assertEqual(len(self.service.poll()), 20)
+        self.assertEqual(len(self.service.writer.call_args.args[0]), 20)
+
+    def test_poll_fetches_archive_page_once(self) -> None:
+        self.service.poll()
+        self.service.poll()
+        self.assertListEqual(self.archive_dates, ["2022-03-01"] * 2)
+
+    def test_day_roll_over(self) -> None:
+        self.service.poll()
+        self.today = date(2022, 3, 2)
+        self.archive_dates.clear()
+        self.assertEqual(len(self.service.poll()), 20)
+        # The previous day is polled a last time before the new day
+        self.assertListEqual(self.archive_dates, ["2022-03-01", "2022-03-02"])
+        self.assertEqual(self.service.get_status()["seen_ids"], 20)
+        self.assertTrue(
+            all(
+                "datum=2022-03-02" in key for key in self.service.tracker.pages
+            )
+        )
+        self.assertEqual(len(self.service.tracker.seen_links), 1)
+
+    def test_control_server(self) -> None:
+        controlServer = ControlServer(self.service)
+        controlServer.start()
+        thread = threading.Thread(target=self.service.run)
+        thread.start()
+        url = f"http://127.0.0.1:{controlServer.port}"
+        try:
+            with urllib.request.urlopen(url + "/status") as response:
+                status = json.load(response)
+            self.assertIn("polls", status)
+            request = urllib.request.Request(url + "/stop", method="POST")
+            with urllib.request.urlopen(request) as response:
+                self.assertEqual(response.status, 202)
+            thread.join(timeout=10)
+            self.assertFalse(thread.is_alive())
+        finally:
+            self.service.stop()
+            controlServer.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+from typing import Iterator
+from unittest.mock import Mock
+from bs4 import BeautifulSoup
+from requests import Response
+from tagesschauscraper import tagesschau
+from tagesschauscraper.streaming import StreamingArticle
+
+
+def read_chunks(file_name: str, chunk_size: int) -> Iterator[bytes]:
+    with open(file_name, "rb") as f:
+        while chunk := f.read(chunk_size):
+            yield chunk
+
+
+class TestStreamingArticle(unittest.TestCase):
+    def setUp(self) -> None:
+        self.file_name = "tests/data/article.html"
+        self.streaming_article = StreamingArticle()
+
+    def test_extract_from_chunks(self) -> None:
+        article_data = self.streaming_article.extract_from_chunks(
+            read_chunks(self.file_name, 1000)
+        )
+        self.assertEqual(
+            article_data["tags"],
+            ",".join(sorted(["Marktbericht", "Börse", "DAX", "Dow Jones"])),
+        )
+        self.assertEqual(article_data["topline"], "Deutliche Verluste")
+        self.assertEqual(
+            article_data["headline"], "Der Krieg lastet auf der Wall Street"
+        )
+        self.assertEqual(article_data["author"], "tagesschau.de")
+        self.assertEqual(article_data["date_published"], "2022-03-01T22:26:00")
+        self.assertListEqual(
+            article_data["subheadings"].splitlines()[:3],
+            [
+                '"Sichere Häfen" gesucht',
+                "Bankaktien geben nach",
+                "DAX unter 14.000 Punkte",
+            ],
+        )
+        self.assertTrue(
+            article_data["text"].startswith(
+                "Die intensiven Kämpfe in der Ukraine und die Auswirkungen"
+            )
+        )
+
+    def test_text_equals_tree_extraction(self) -> None:
+        with open(self.file_name, "r") as f:
+            soup = BeautifulSoup(f.read(), "html.parser")
+        article_data = self.streaming_article.extract_from_chunks(
+            read_chunks(self.file_name, 333)
+        )
+        expected_text = tagesschau.Article(soup).extract_article_text()
+        self.assertEqual(
+            "".join(article_data["text"].split()),
+            "".join(expected_text.split()),
+        )
+
+    def test_stops_after_article_content(self) -> None:
+        chunk_size = 1000
+        chunks = read_chunks(self.file_name, chunk_size)
+        self.streaming_article.extract_from_chunks(chunks)
+        self.assertGreater(len(list(chunks)), 0)
+
+    def test_memory_cap(self) -> None:
+        streaming_article = StreamingArticle(max_bytes=10000)
+        article_data = streaming_article.extract_from_chunks(
+            read_chunks(self.file_name, 1000)
+        )
+        self.assertEqual(article_data["text"], "")
+        self.assertEqual(article_data["author"], "tagesschau.de")
+
+    def test_extract_from_response(self) -> None:
+        responseMock = Mock(spec=Response)
+        responseMock.status_code = 200
+        responseMock.encoding = "utf-8"
+        responseMock.iter_content.return_value = read_chunks(
+            self.file_name, 1000
+        )
+        article_data = self.streaming_article.extract_from_response(
+            responseMock
+        )
+        self.assertEqual(article_data["author"], "tagesschau.de")
+        responseMock.close.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
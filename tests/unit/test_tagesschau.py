@@ -1,8 +1,12 @@
+import gc
+import os
 import unittest
 from datetime import date
+from unittest.mock import Mock
 from bs4 import BeautifulSoup
+from requests import Response, Session
 from tagesschauscraper import tagesschau
-from typing import Union, Dict
+from typing import Any, Union, Dict
 
 
 class TestTagesschauScraper(unittest.TestCase):
@@ -185,6 +189,22 @@ class TestArticle(unittest.TestCase):
         }
         self.assertDictEqual(article_tags, expected_article_tags)
 
+    def test_extract_article_text(self) -> None:
+        article_text = self.article.extract_article_text()
+        self.assertTrue(
+            article_text.startswith(
+                "Die intensiven Kämpfe in der Ukraine und die Auswirkungen"
+            )
+        )
+        self.assertNotIn("Marktbericht", article_text.splitlines())
+
+    def test_release_keeps_information(self) -> None:
+        expected = self.article.get_data()
+        self.article.release()
+        self.assertIsNone(self.article.article_soup)
+        self.assertTrue(self.soup.decomposed)
+        self.assertDictEqual(self.article.get_data(), expected)
+
 
 class TestArchive(unittest.TestCase):
     def setUp(self) -> None:
@@ -224,6 +244,14 @@ class TestArchive(unittest.TestCase):
         true_archive_info = {"headline": "1. März 2022", "num_teaser": "20"}
         self.assertEqual(archive_info, true_archive_info)
 
+    def test_release_keeps_information(self) -> None:
+        self.archive.release()
+        self.assertIsNone(self.archive.archive_soup)
+        self.assertEqual(
+            self.archive.extract_info_from_archive(),
+            {"headline": "1. März 2022", "num_teaser": "20"},
+        )
+
 
 class TestArchiveFilter(unittest.TestCase):
     def test_input_processing(self) -> None:
@@ -240,5 +268,98 @@ class TestArchiveFilter(unittest.TestCase):
         )
 
 
+def create_response(text: str) -> Response:
+    responseMock = Mock(spec=Response)
+    responseMock.status_code = 200
+    responseMock.text = text
+    return responseMock
+
+
+class FakeSession(Session):
+    """
+    Session answering with small synthetic pages. Unlike a Mock it does not
+    record its calls, which would grow memory in the soak test.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        teaser = "".join(
+            '<li class="columns teaser-xs twelve teaser-xs__wide">'
+            '<a class="teaser-xs__link"'
+            f' href="https://www.tagesschau.de/inland/news-{i}.html">'
+            '<span class="teaser-xs__date">01.03.2022 - 18:54 Uhr</span>'
+            '<span class="teaser-xs__topline">Pipeline-Projekt</span>'
+            '<span class="teaser-xs__headline">Betreiber insolvent</span>'
+            '<p class="teaser-xs__shorttext">Die AG ist insolvent.</p>'
+            "</a></li>"
+            for i in range(2)
+        )
+        tags = "".join(
+            f'<a class="tag-btn tag-btn--light-grey">Tag {i}</a>'
+            for i in range(5)
+        )
+        paragraphs = "".join(
+            f'<p class="textabsatz">Absatz {i} <strong>mit</strong> Text.</p>'
+            for i in range(30)
+        )
+        self.archive = create_response(
+            '<h2 class="archive__headline">1. März 2022</h2>'
+            f"<ul>{teaser}</ul>"
+        )
+        self.article = create_response(
+            f'<div class="taglist">{tags}</div>{paragraphs}'
+        )
+
+    def get(self, url: Any, **kwargs: Any) -> Response:
+        if url == tagesschau.ARCHIVE_URL:
+            return self.archive
+        return self.article
+
+
+def get_rss() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+class TestBoundedMemory(unittest.TestCase):
+    def setUp(self) -> None:
+        self.session = FakeSession()
+
+    def test_same_records(self) -> None:
+        records = tagesschau.TagesschauScraper(
+            session=self.session
+        ).scrape_archive_page(tagesschau.ARCHIVE_URL)
+        self.assertEqual(len(records), 2)
+        self.assertListEqual(
+            tagesschau.TagesschauScraper(
+                session=self.session, bounded_memory=True
+            ).scrape_archive_page(tagesschau.ARCHIVE_URL),
+            records,
+        )
+
+    @unittest.skipUnless(
+        os.path.exists("/proc/self/statm"), "RSS is not available"
+    )
+    def test_soak(self) -> None:
+        # Without the cyclic garbage collector, only trees that are torn
+        # down are freed. Thousands of pages expose slow leaks as well,
+        # unbounded they grow RSS by about 200 MiB per 1000 pages.
+        scraper = tagesschau.TagesschauScraper(
+            session=self.session, bounded_memory=True
+        )
+        gc.collect()
+        gc.disable()
+        try:
+            for _ in range(50):
+                scraper.scrape_archive_page(tagesschau.ARCHIVE_URL)
+            rss = get_rss()
+            for _ in range(3000):
+                scraper.scrape_archive_page(tagesschau.ARCHIVE_URL)
+            growth = get_rss() - rss
+        finally:
+            gc.enable()
+        self.assertLess(growth, 4 * 2**20)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,130 @@
+import os
+import shutil
+import unittest
+from tagesschauscraper import tagindex
+from tagesschauscraper.db import TagesschauDB
+from tagesschauscraper.tagindex import TagIndex
+
+RECORDS = [
+    {"id": "a", "article": {"tags": "Börse,DAX,Dow Jones"}},
+    {"id": "b", "article": {"tags": "Börse,DAX"}},
+    {"id": "c", "article": {"tags": "Insolvenz,Pipeline"}},
+    {"id": "d", "article": {}},
+]
+
+
+class TestPostings(unittest.TestCase):
+    def test_encode_and_decode(self) -> None:
+        positions = [0, 1, 127, 128, 300, 100_000]
+        encoded = tagindex.encode_postings(positions)
+        self.assertListEqual(
+            list(tagindex.decode_postings(encoded)), positions
+        )
+
+    def test_iter_bits(self) -> None:
+        bitmap = (1 << 0) | (1 << 9) | (1 << 1000)
+        self.assertListEqual(list(tagindex.iter_bits(bitmap)), [0, 9, 1000])
+
+
+class TestTagIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        self.root_dir = "tests/tmp"
+        os.makedirs(self.root_dir, exist_ok=True)
+        self.tagIndex = TagIndex.from_records(RECORDS)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.root_dir)
+
+    def test_queries(self) -> None:
+        self.assertListEqual(
+            self.tagIndex.query_and(["DAX", "Börse"]), ["a", "b"]
+        )
+        self.assertListEqual(
+            self.tagIndex.query_and(["DAX", "Dow Jones"]), ["a"]
+        )
+        self.assertListEqual(self.tagIndex.query_and(["DAX", "Unknown"]), [])
+        self.assertListEqual(
+            self.tagIndex.query_or(["Dow Jones", "Pipeline"]), ["a", "c"]
+        )
+        self.assertEqual(self.tagIndex.count_or(["Börse", "Insolvenz"]), 3)
+        self.assertEqual(len(self.tagIndex), 4)
+
+    def test_cooccurrences_and_counts(self) -> None:
+        self.assertListEqual(
+            self.tagIndex.get_cooccurrences("DAX"),
+            [("Börse", 2), ("Dow Jones", 1)],
+        )
+        self.assertEqual(self.tagIndex.get_tag_counts()["Börse"], 2)
+
+    def test_add_replaces_tags(self) -> None:
+        self.tagIndex.add("a", ["Pipeline"])
+        self.assertListEqual(self.tagIndex.query_and(["DAX"]), ["b"])
+        self.assertListEqual(self.tagIndex.query_and(["Pipeline"]), ["a", "c"])
+        self.tagIndex.remove("c")
+        self.assertListEqual(self.tagIndex.query_and(["Pipeline"]), ["a"])
+
+    def test_save_and_load(self) -> None:
+        file_path = os.path.join(self.root_dir, "tags.idx")
+        self.tagIndex.save(file_path)
+        loaded = TagIndex.load(file_path)
+        self.assertListEqual(loaded.tags, self.tagIndex.tags)
+        self.assertDictEqual(
+            loaded.get_tag_counts(), self.tagIndex.get_tag_counts()
+        )
+        self.assertListEqual(loaded.query_and(["DAX", "Börse"]), ["a", "b"])
+
+    def test_sparse_and_dense_postings(self) -> None:
+        tagIndex = TagIndex()
+        for i in range(1000):
+            tags = ["frequent", f"rare-{i}"] + ["odd"] * (i % 2)
+            tagIndex.add(str(i), tags + ["late"] * (i == 999))
+        self.assertIsInstance(tagIndex.postings[0], bytearray)
+        for tag in ["rare-700", "late"]:
+            posting = tagIndex.postings[tagIndex.tag_ids[tag]]
+            self.assertNotIsInstance(posting, bytearray)
+        self.assertListEqual(tagIndex.query_and(["frequent", "rare-7"]), ["7"])
+        self.assertListEqual(tagIndex.query_and(["odd", "rare-7"]), ["7"])
+        self.assertListEqual(tagIndex.query_and(["odd", "rare-8"]), [])
+        self.assertEqual(tagIndex.count_and(["frequent", "odd"]), 500)
+        self.assertEqual(tagIndex.count_or(["rare-1", "odd", "late"]), 500)
+        self.assertEqual(
+            tagIndex.get_cooccurrences("rare-3")[0], ("frequent", 1)
+        )
+        self.assertEqual(
+            tagIndex.get_cooccurrences("frequent")[0], ("odd", 500)
+        )
+        tagIndex.add("7", ["rare-8"])
+        self.assertListEqual(
+            tagIndex.query_or(["rare-7", "rare-8"]), ["7", "8"]
+        )
+        self.assertEqual(tagIndex.get_tag_counts()["frequent"], 999)
+
+    def test_dense_tag_becomes_sparse(self) -> None:
+        tagIndex = TagIndex()
+        tagIndex.add("a", ["tag"])
+        for i in range(1000):
+            tagIndex.add(str(i), [])
+        tagIndex.add("b", ["tag"])
+        posting = tagIndex.postings[tagIndex.tag_ids["tag"]]
+        self.assertNotIsInstance(posting, bytearray)
+        self.assertListEqual(tagIndex.query_and(["tag"]), ["a", "b"])
+
+    def test_load_invalid_file(self) -> None:
+        file_path = os.path.join(self.root_dir, "tags.idx")
+        with open(file_path, "wb") as f:
+            f.write(b"\x00" * 16)
+        with self.assertRaises(ValueError):
+            TagIndex.load(file_path)
+
+    def test_from_db(self) -> None:
+        with TagesschauDB(":memory:") as tagesschauDB:
+            tagesschauDB.create_table()
+            for record in RECORDS:
+                teaser = {"date": "2022-03-01", "link": record["id"]}
+                tagesschauDB.insert_record(record | {"teaser": teaser})
+            tagIndex = TagIndex.from_db(tagesschauDB)
+        self.assertListEqual(tagIndex.query_and(["Börse"]), ["a", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
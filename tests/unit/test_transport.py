@@ -0,0 +1,90 @@
+import gzip
+import unittest
+import requests
+from tagesschauscraper import tagesschau, transport
+from tagesschauscraper.transport import HTTP2Session
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+
+class TestCreateSession(unittest.TestCase):
+    def test_create_session(self) -> None:
+        self.assertIsInstance(
+            transport.create_session("requests"), requests.Session
+        )
+        with self.assertRaises(ValueError):
+            transport.create_session("ftp")
+
+    @unittest.skipUnless(httpx is None, "httpx is installed")
+    def test_http2_without_httpx(self) -> None:
+        with self.assertRaises(ImportError):
+            HTTP2Session()
+
+
+@unittest.skipIf(httpx is None, "httpx is not installed")
+class TestHTTP2Session(unittest.TestCase):
+    def setUp(self) -> None:
+        with open("tests/data/archive.html", "rb") as f:
+            self.archive = f.read()
+        self.requests: list["httpx.Request"] = []
+        self.session = HTTP2Session(
+            http2=False, transport=httpx.MockTransport(self.handle)
+        )
+
+    def tearDown(self) -> None:
+        self.session.close()
+
+    def handle(self, request: "httpx.Request") -> "httpx.Response":
+        self.requests.append(request)
+        if request.url.path == "/loop":
+            return httpx.Response(302, headers={"Location": "/loop"})
+        if request.url.path == "/down":
+            raise httpx.ConnectError("down", request=request)
+        return httpx.Response(
+            200,
+            headers={
+                "Content-Type": "text/html; charset=utf-8",
+                "Content-Encoding": "gzip",
+            },
+            content=gzip.compress(self.archive),
+        )
+
+    def test_get(self) -> None:
+        response = self.session.get(
+            tagesschau.ARCHIVE_URL,
+            params={"datum": "2022-03-01"},
+            headers={"X-Test": "1"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, self.archive)
+        self.assertEqual(response.encoding, "utf-8")
+        self.assertEqual(
+            response.url, tagesschau.ARCHIVE_URL + "?datum=2022-03-01"
+        )
+        self.assertEqual(self.requests[0].headers["X-Test"], "1")
+        self.assertIn("gzip", self.requests[0].headers["Accept-Encoding"])
+
+    def test_streamed_response_is_decompressed_in_chunks(self) -> None:
+        response = self.session.get(tagesschau.ARCHIVE_URL, stream=True)
+        chunks = list(response.iter_content(chunk_size=1000))
+        response.close()
+        self.assertEqual(b"".join(chunks), self.archive)
+        self.assertEqual(len(chunks[0]), 1000)
+
+    def test_scraper_with_http2_session(self) -> None:
+        scraper = tagesschau.TagesschauScraper(session=self.session)
+        response = scraper.get_archive_response({"datum": "2022-03-01"})
+        self.assertEqual(len(scraper.scrape_teaser(response)["records"]), 20)
+
+    def test_errors_are_translated(self) -> None:
+        with self.assertRaises(requests.exceptions.TooManyRedirects):
+            self.session.get("https://www.tagesschau.de/loop")
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self.session.get("https://www.tagesschau.de/down")
+
+
+if __name__ == "__main__":
+    unittest.main()
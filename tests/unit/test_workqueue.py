@@ -0,0 +1,205 @@
+import os
+import shutil
+import threading
+import time
+import unittest
+from datetime import date
+from typing import Any
+from unittest.mock import Mock, patch
+from requests import Response
+from tagesschauscraper import tagesschau, workqueue
+from tagesschauscraper.workqueue import (
+    Coordinator,
+    RedisWorkQueue,
+    WorkQueue,
+    Worker,
+)
+
+try:
+    import redis
+except ImportError:  # pragma: no cover
+    redis = None
+
+# URL of a Redis server for the tests of the RedisWorkQueue
+REDIS_URL = os.environ.get("TAGESSCHAUSCRAPER_TEST_REDIS_URL")
+
+
+def create_response(file_name: str) -> Response:
+    responseMock = Mock(spec=Response)
+    responseMock.status_code = 200
+    with open(file_name, "r") as f:
+        responseMock.text = f.read()
+    return responseMock
+
+
+def get(url: str, **kwargs: Any) -> Response:
+    if url == tagesschau.ARCHIVE_URL:
+        return create_response("tests/data/archive.html")
+    return create_response("tests/data/article.html")
+
+
+class TestWorkQueue(unittest.TestCase):
+    def setUp(self) -> None:
+        self.root_dir = "tests/tmp"
+        os.makedirs(self.root_dir, exist_ok=True)
+        self.db_name = os.path.join(self.root_dir, "queue.db")
+        self.queue = self.open_queue()
+
+    def tearDown(self) -> None:
+        self.queue.close()
+        shutil.rmtree(self.root_dir)
+
+    def open_queue(self) -> workqueue.AnyWorkQueue:
+        return WorkQueue(self.db_name, max_attempts=2)
+
+    def test_put_is_unique_by_key(self) -> None:
+        self.assertTrue(self.queue.put("article", "a", {}))
+        self.assertFalse(self.queue.put("article", "a", {}))
+        self.assertEqual(self.queue.get_counts()["pending"], 1)
+
+    def test_archive_units_are_claimed_first(self) -> None:
+        self.queue.put("article", "a", {})
+        self.queue.put("archive", "b", {})
+        lease = self.queue.claim("worker")
+        assert lease is not None
+        self.assertEqual(lease.key, "b")
+
+    def test_claim_and_complete(self) -> None:
+        self.queue.put("article", "a", {"x": 1})
+        lease = self.queue.claim("worker-1")
+        assert lease is not None
+        self.assertIsNone(self.queue.claim("worker-2"))
+        self.assertTrue(self.queue.heartbeat(lease))
+        self.assertTrue(self.queue.complete(lease, {"tags": "A"}))
+        self.assertFalse(self.queue.is_finished())
+        self.queue.mark_submitted()
+        self.assertTrue(self.queue.is_finished())
+        self.assertListEqual(
+            self.queue.get_results("article"),
+            [{"key": "a", "payload": {"x": 1}, "result": {"tags": "A"}}],
+        )
+
+    def test_expired_lease_is_claimed_again(self) -> None:
+        self.queue.put("article", "a", {})
+        self.queue.lease_seconds = -1
+        lease = self.queue.claim("worker-1")
+        assert lease is not None
+        other_queue = self.open_queue()
+        other_lease = other_queue.claim("worker-2")
+        other_queue.close()
+        assert other_lease is not None
+        self.assertEqual(other_lease.attempts, 2)
+        self.assertFalse(self.queue.heartbeat(lease))
+        self.assertFalse(self.queue.complete(lease, {}))
+
+    def test_failed_unit_is_given_up(self) -> None:
+        self.queue.put("article", "a", {})
+        for _ in range(2):
+            lease = self.queue.claim("worker")
+            assert lease is not None
+            self.queue.fail(lease, ValueError("broken"))
+        self.assertIsNone(self.queue.claim("worker"))
+        self.assertEqual(self.queue.get_counts()["failed"], 1)
+
+    def test_submitted_mark_is_cleared_for_new_run(self) -> None:
+        self.queue.mark_submitted()
+        self.assertTrue(self.queue.is_finished())
+        submitted = []
+        put = self.queue.put
+
+        def record_put(*args: Any) -> bool:
+            submitted.append(self.queue.is_submitted())
+            return put(*args)
+
+        archive_filter = tagesschau.ArchiveFilter({"date": date(2022, 3, 1)})
+        with patch.object(self.queue, "put", side_effect=record_put):
+            Coordinator(self.queue).submit([archive_filter])
+        self.assertListEqual(submitted, [False])
+        self.assertTrue(self.queue.is_submitted())
+        self.assertFalse(self.queue.is_finished())
+
+
+@unittest.skipIf(
+    redis is None or REDIS_URL is None,
+    "redis is not installed or no test server is configured",
+)
+class TestRedisWorkQueue(TestWorkQueue):
+    def open_queue(self) -> workqueue.AnyWorkQueue:
+        return RedisWorkQueue(
+            str(REDIS_URL), name=f"test-{os.getpid()}", max_attempts=2
+        )
+
+    def tearDown(self) -> None:
+        client = self.queue.client  # type: ignore[union-attr]
+        keys = list(client.scan_iter(f"test-{os.getpid()}:*"))
+        if keys:
+            client.delete(*keys)
+        super().tearDown()
+
+
+class TestOpenWorkQueue(unittest.TestCase):
+    def test_sqlite_file(self) -> None:
+        with workqueue.open_work_queue(":memory:") as queue:
+            self.assertIsInstance(queue, WorkQueue)
+
+    @unittest.skipUnless(redis is None, "redis is installed")
+    def test_redis_url_without_redis(self) -> None:
+        with self.assertRaises(ImportError):
+            workqueue.open_work_queue("redis://localhost:6379/0")
+
+
+class TestCoordinatorAndWorkers(unittest.TestCase):
+    def setUp(self) -> None:
+        self.root_dir = "tests/tmp"
+        os.makedirs(self.root_dir, exist_ok=True)
+        self.db_name = os.path.join(self.root_dir, "queue.db")
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.root_dir)
+
+    def test_workers_share_units_without_duplicates(self) -> None:
+        processed = []
+
+        def run_worker(name: str) -> None:
+            session = Mock()
+            session.get.side_effect = get
+            with WorkQueue(self.db_name) as queue:
+                worker = Worker(
+                    queue,
+                    tagesschau.TagesschauScraper(session=session),
+                    worker_id=name,
+                    poll_interval=0.01,
+                )
+                processed.append(worker.run())
+
+        # Workers started before the coordinator wait for its units
+        workers = [
+            threading.Thread(target=run_worker, args=(f"worker-{i}",))
+            for i in range(3)
+        ]
+        for worker in workers:
+            worker.start()
+        with WorkQueue(self.db_name) as queue:
+            coordinator = Coordinator(queue)
+            archive_filter = tagesschau.ArchiveFilter(
+                {"date": date(2022, 3, 1), "category": "wirtschaft"}
+            )
+            time.sleep(0.05)
+            self.assertEqual(coordinator.submit([archive_filter]), 1)
+            self.assertEqual(coordinator.submit([archive_filter]), 0)
+            for worker in workers:
+                worker.join()
+            counts = coordinator.wait(poll_interval=0.01)
+            records = coordinator.collect()["records"]
+
+        self.assertEqual(counts["failed"], 0)
+        self.assertEqual(sum(processed), counts["done"])
+        self.assertGreater(len(records), 0)
+        self.assertEqual(len(records), counts["done"] - 1)
+        self.assertEqual(
+            len({record["id"] for record in records}), len(records)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()